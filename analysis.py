@@ -0,0 +1,144 @@
+"""One tokenization pass per document, shared by every consumer.
+
+Summaries, stats, keyword highlighting and the charts all read from a
+DocumentAnalysis instead of re-running their own regexes over the text.
+Running headers and footers are left out of the tokens (see dedup), but
+self.text and every character offset still refer to the original text.
+"""
+import re
+import time
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+
+import dedup
+import profiling
+
+STOP_WORDS = frozenset({'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and',
+                        'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by'})
+
+WORD_RE = re.compile(r'\b[a-z]+\b')
+SENTENCE_END_RE = re.compile(r'[.!?]+')
+MIN_SENTENCE_LENGTH = 20
+
+
+def iter_fragments(text):
+    # (start, end) of every piece between sentence terminators, whitespace trimmed
+    position = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        yield _trimmed_span(text, position, match.start())
+        position = match.end()
+    yield _trimmed_span(text, position, len(text))
+
+
+def _trimmed_span(text, start, end):
+    fragment = text[start:end]
+    stripped = fragment.lstrip()
+    start += len(fragment) - len(stripped)
+    return start, start + len(stripped.rstrip())
+
+
+class DocumentAnalysis:
+    def __init__(self, text, boilerplate=()):
+        # boilerplate: sorted (start, end) spans of text to leave out
+        started = time.perf_counter()
+        self.text = text
+        self.boilerplate_lines = len(boilerplate)
+        text = dedup.blank(text, boilerplate)
+        # Every token in document order, stop words included
+        self.tokens = []
+        # Sentences long enough to summarize: text, character span in
+        # self.text and the range of their tokens in self.tokens
+        self.sentences = []
+        self.sentence_spans = []
+        self.sentence_token_ranges = []
+        # Stop words removed
+        self.word_freq = Counter()
+        # Whitespace-separated words, as reported in the stats bar
+        self.word_count = len(text.split())
+
+        tokens = self.tokens
+        for start, end in iter_fragments(text):
+            first_token = len(tokens)
+            fragment = text[start:end]
+            fragment_tokens = WORD_RE.findall(fragment.lower())
+            tokens.extend(fragment_tokens)
+            self.word_freq.update(w for w in fragment_tokens if w not in STOP_WORDS)
+            if end - start > MIN_SENTENCE_LENGTH:
+                self.sentences.append(fragment)
+                self.sentence_spans.append((start, end))
+                self.sentence_token_ranges.append((first_token, len(tokens)))
+
+        self._sentence_tokens = None
+        self._duplicates = None
+        self._top_words = {}
+        profiling.record('tokenize', time.perf_counter() - started, len(text), 'chars')
+
+    @classmethod
+    def from_pages(cls, pages, text=None):
+        """Analyse the joined pages, without their running headers and footers.
+
+        Pass `text` if the pages were already joined, so self.text is that
+        same string.
+        """
+        keys = dedup.boilerplate_keys(page.text for page in pages)
+        spans = []
+        offset = 0
+        for page in pages:
+            spans.extend((offset + start, offset + end)
+                         for start, end in dedup.page_spans(page.text, keys))
+            offset += len(page.text)
+        if text is None:
+            text = "".join(page.text for page in pages)
+        return cls(text, spans)
+
+    @property
+    def sentence_tokens(self):
+        if self._sentence_tokens is None:
+            tokens = self.tokens
+            self._sentence_tokens = [tokens[a:b] for a, b in self.sentence_token_ranges]
+        return self._sentence_tokens
+
+    @property
+    def duplicates(self):
+        # Indices of sentences that repeat an earlier one, left out of scoring
+        if self._duplicates is None:
+            ranges = self.sentence_token_ranges
+            tokens = self.tokens
+            hashes = dedup.word_hashes(word for a, b in ranges for word in tokens[a:b])
+            offsets = [0, *accumulate(b - a for a, b in ranges)]
+            self._duplicates = dedup.duplicate_sentences(hashes, offsets)
+        return self._duplicates
+
+    def top_words(self, count, min_length=0):
+        # Most frequent non-stop words, optionally ignoring short ones
+        key = (count, min_length)
+        if key not in self._top_words:
+            if min_length:
+                ranked = [(w, c) for w, c in self.word_freq.most_common()
+                          if len(w) >= min_length][:count]
+            else:
+                ranked = self.word_freq.most_common(count)
+            self._top_words[key] = ranked
+        return self._top_words[key]
+
+    def page_word_counts(self, pages, words):
+        """How often each of `words` occurs on each page, and tokens per page.
+
+        `pages` are the Pages self.text was joined from. Counts come from
+        the summarizable sentences, each credited to the page it starts on.
+        """
+        ends = list(accumulate(len(page.text) for page in pages))
+        columns = {word: i for i, word in enumerate(words)}
+        counts = [[0] * len(words) for _ in pages]
+        totals = [0] * len(pages)
+        tokens = self.tokens
+        for (start, _), (first, last) in zip(self.sentence_spans, self.sentence_token_ranges):
+            page = min(bisect_right(ends, start), len(pages) - 1)
+            totals[page] += last - first
+            row = counts[page]
+            for word in tokens[first:last]:
+                column = columns.get(word)
+                if column is not None:
+                    row[column] += 1
+        return counts, totals
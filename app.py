@@ -1,577 +1,1433 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, scrolledtext, messagebox
-import PyPDF2
-from PIL import Image, ImageTk, ImageOps
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pyttsx3
-import threading
-import re
-from collections import Counter
-import math
-
-class SmartSummarizerPro:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Smart Summarizer Pro - Text Extractor & Voice Reader")
-        self.root.geometry("1200x800")
-        
-        # Theme colors
-        self.dark_mode = False
-        self.colors = {
-            'light_bg': '#f0f0f0',
-            'light_fg': '#000000',
-            'light_btn': '#4CAF50',
-            'light_text_bg': '#ffffff',
-            'dark_bg': '#2b2b2b',
-            'dark_fg': '#ffffff',
-            'dark_btn': '#45a049',
-            'dark_text_bg': '#1e1e1e'
-        }
-        
-        # Data storage
-        self.extracted_text = ""
-        self.summary_text = ""
-        self.current_image = None
-        self.image_label = None
-        
-        # Voice engine
-        self.engine = pyttsx3.init()
-        self.voice_speed = 150
-        self.voice_volume = 1.0
-        
-        self.setup_ui()
-        self.apply_theme()
-        
-    def setup_ui(self):
-        # Main container
-        main_frame = tk.Frame(self.root)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Top control panel
-        self.create_control_panel(main_frame)
-        
-        # Content area with three columns
-        content_frame = tk.Frame(main_frame)
-        content_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        # Left column - Upload & Image
-        self.create_left_panel(content_frame)
-        
-        # Middle column - Extracted Text
-        self.create_middle_panel(content_frame)
-        
-        # Right column - Summary & Stats
-        self.create_right_panel(content_frame)
-        
-        # Bottom control panel
-        self.create_bottom_panel(main_frame)
-        
-        # Floating help button
-        self.create_help_button()
-        
-    def create_control_panel(self, parent):
-        control_frame = tk.Frame(parent)
-        control_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # Title
-        title = tk.Label(control_frame, text="📚 Smart Summarizer Pro", 
-                        font=("Arial", 18, "bold"))
-        title.pack(side=tk.LEFT, padx=10)
-        
-        # Dark mode toggle
-        self.theme_btn = tk.Button(control_frame, text="🌙 Dark Mode", 
-                                   command=self.toggle_theme,
-                                   font=("Arial", 10), padx=15, pady=5)
-        self.theme_btn.pack(side=tk.RIGHT, padx=5)
-        
-    def create_left_panel(self, parent):
-        left_frame = tk.LabelFrame(parent, text="📁 Upload Files", 
-                                   font=("Arial", 11, "bold"), padx=10, pady=10)
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        # Upload buttons
-        self.pdf_btn = tk.Button(left_frame, text="📄 Upload PDF", 
-                                command=self.upload_pdf,
-                                font=("Arial", 10), pady=8)
-        self.pdf_btn.pack(fill=tk.X, pady=5)
-        
-        self.img_btn = tk.Button(left_frame, text="🖼️ Upload Image", 
-                                command=self.upload_image,
-                                font=("Arial", 10), pady=8)
-        self.img_btn.pack(fill=tk.X, pady=5)
-        
-        # Image preview area
-        preview_frame = tk.Frame(left_frame, bg='gray', width=300, height=400)
-        preview_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        preview_frame.pack_propagate(False)
-        
-        self.image_container = tk.Label(preview_frame, text="No Image Loaded", 
-                                       bg='gray', fg='white')
-        self.image_container.pack(expand=True)
-        
-        # Image controls
-        img_controls = tk.Frame(left_frame)
-        img_controls.pack(fill=tk.X)
-        
-        self.rotate_btn = tk.Button(img_controls, text="↻", 
-                                    command=self.rotate_image,
-                                    font=("Arial", 10), width=8)
-        self.rotate_btn.pack(side=tk.LEFT, padx=2)
-        
-        self.resize_btn = tk.Button(img_controls, text="⇔", 
-                                   command=self.resize_image,
-                                   font=("Arial", 10), width=8)
-        self.resize_btn.pack(side=tk.LEFT, padx=2)
-        
-    def create_middle_panel(self, parent):
-        middle_frame = tk.LabelFrame(parent, text="📝 Extracted Text", 
-                                     font=("Arial", 11, "bold"), padx=10, pady=10)
-        middle_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        
-        self.extracted_box = scrolledtext.ScrolledText(middle_frame, 
-                                                       wrap=tk.WORD,
-                                                       font=("Arial", 10),
-                                                       height=20)
-        self.extracted_box.pack(fill=tk.BOTH, expand=True)
-        
-    def create_right_panel(self, parent):
-        right_frame = tk.LabelFrame(parent, text="✨ Summary & Insights", 
-                                    font=("Arial", 11, "bold"), padx=10, pady=10)
-        right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
-        # Stats display
-        stats_frame = tk.Frame(right_frame)
-        stats_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        self.stats_label = tk.Label(stats_frame, 
-                                    text="📊 Words: 0 | Summary: 0 | Ratio: 0%",
-                                    font=("Arial", 9))
-        self.stats_label.pack()
-        
-        # Summary box
-        self.summary_box = scrolledtext.ScrolledText(right_frame, 
-                                                     wrap=tk.WORD,
-                                                     font=("Arial", 10),
-                                                     height=15)
-        self.summary_box.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        # Summary controls
-        summary_controls = tk.Frame(right_frame)
-        summary_controls.pack(fill=tk.X)
-        
-        self.copy_btn = tk.Button(summary_controls, text="📋 Copy", 
-                                 command=self.copy_summary,
-                                 font=("Arial", 9), width=10)
-        self.copy_btn.pack(side=tk.LEFT, padx=2)
-        
-        self.save_btn = tk.Button(summary_controls, text="💾 Save", 
-                                 command=self.save_summary,
-                                 font=("Arial", 9), width=10)
-        self.save_btn.pack(side=tk.LEFT, padx=2)
-        
-    def create_bottom_panel(self, parent):
-        bottom_frame = tk.Frame(parent)
-        bottom_frame.pack(fill=tk.X, pady=(10, 0))
-        
-        # Main action buttons
-        action_frame = tk.Frame(bottom_frame)
-        action_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        self.summarize_btn = tk.Button(action_frame, text="🎯 Generate Summary", 
-                                       command=self.generate_summary,
-                                       font=("Arial", 11, "bold"), pady=10)
-        self.summarize_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        self.speak_btn = tk.Button(action_frame, text="🔊 Speak Summary", 
-                                   command=self.speak_summary,
-                                   font=("Arial", 11, "bold"), pady=10)
-        self.speak_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        self.viz_btn = tk.Button(action_frame, text="📊 Visualize", 
-                                command=self.show_visualization,
-                                font=("Arial", 11, "bold"), pady=10)
-        self.viz_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        # Voice controls
-        voice_frame = tk.LabelFrame(bottom_frame, text="🎤 Voice Settings", 
-                                   font=("Arial", 9, "bold"), padx=10, pady=5)
-        voice_frame.pack(side=tk.RIGHT, padx=(10, 0))
-        
-        # Speed control
-        speed_frame = tk.Frame(voice_frame)
-        speed_frame.pack(side=tk.LEFT, padx=5)
-        tk.Label(speed_frame, text="Speed:", font=("Arial", 8)).pack()
-        self.speed_scale = tk.Scale(speed_frame, from_=50, to=250, 
-                                   orient=tk.HORIZONTAL, length=100,
-                                   command=self.update_speed)
-        self.speed_scale.set(150)
-        self.speed_scale.pack()
-        
-        # Volume control
-        volume_frame = tk.Frame(voice_frame)
-        volume_frame.pack(side=tk.LEFT, padx=5)
-        tk.Label(volume_frame, text="Volume:", font=("Arial", 8)).pack()
-        self.volume_scale = tk.Scale(volume_frame, from_=0, to=100, 
-                                    orient=tk.HORIZONTAL, length=100,
-                                    command=self.update_volume)
-        self.volume_scale.set(100)
-        self.volume_scale.pack()
-        
-    def create_help_button(self):
-        help_btn = tk.Button(self.root, text="❓", 
-                            command=self.show_help,
-                            font=("Arial", 12, "bold"),
-                            width=3, height=1)
-        help_btn.place(relx=0.98, rely=0.02, anchor='ne')
-        
-    def upload_pdf(self):
-        file_path = filedialog.askopenfilename(
-            filetypes=[("PDF files", "*.pdf")]
-        )
-        if file_path:
-            self.show_progress("Extracting PDF...")
-            threading.Thread(target=self.extract_pdf_text, 
-                           args=(file_path,), daemon=True).start()
-            
-    def extract_pdf_text(self, file_path):
-        try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                
-                self.extracted_text = text
-                self.root.after(0, self.display_extracted_text)
-                self.root.after(0, self.hide_progress)
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
-            self.root.after(0, self.hide_progress)
-            
-    def upload_image(self):
-        file_path = filedialog.askopenfilename(
-            filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")]
-        )
-        if file_path:
-            self.load_image(file_path)
-            
-    def load_image(self, file_path):
-        try:
-            self.current_image = Image.open(file_path)
-            self.display_image()
-            messagebox.showinfo("Success", "Image loaded! Use rotate/resize buttons.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-            
-    def display_image(self):
-        if self.current_image:
-            # Resize to fit preview
-            img_copy = self.current_image.copy()
-            img_copy.thumbnail((280, 380), Image.Resampling.LANCZOS)
-            
-            photo = ImageTk.PhotoImage(img_copy)
-            self.image_container.configure(image=photo, text="")
-            self.image_container.image = photo
-            
-    def rotate_image(self):
-        if self.current_image:
-            self.current_image = self.current_image.rotate(90, expand=True)
-            self.display_image()
-            
-    def resize_image(self):
-        if self.current_image:
-            width, height = self.current_image.size
-            new_size = (int(width * 0.8), int(height * 0.8))
-            self.current_image = self.current_image.resize(new_size)
-            self.display_image()
-            
-    def display_extracted_text(self):
-        self.extracted_box.delete(1.0, tk.END)
-        self.extracted_box.insert(1.0, self.extracted_text)
-        self.update_stats()
-        
-    def generate_summary(self):
-        if not self.extracted_text.strip():
-            messagebox.showwarning("Warning", "No text to summarize!")
-            return
-            
-        self.show_progress("Generating summary...")
-        threading.Thread(target=self.create_summary, daemon=True).start()
-        
-    def create_summary(self):
-        try:
-            # Simple extractive summarization
-            sentences = re.split(r'[.!?]+', self.extracted_text)
-            sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-            
-            if not sentences:
-                self.root.after(0, lambda: messagebox.showwarning(
-                    "Warning", "Not enough content to summarize!"))
-                self.root.after(0, self.hide_progress)
-                return
-            
-            # Calculate word frequencies
-            words = re.findall(r'\b[a-z]+\b', self.extracted_text.lower())
-            stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 
-                         'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by'}
-            words = [w for w in words if w not in stop_words]
-            word_freq = Counter(words)
-            
-            # Score sentences
-            sentence_scores = {}
-            for sentence in sentences:
-                score = 0
-                sentence_words = re.findall(r'\b[a-z]+\b', sentence.lower())
-                for word in sentence_words:
-                    if word in word_freq:
-                        score += word_freq[word]
-                if len(sentence_words) > 0:
-                    sentence_scores[sentence] = score / len(sentence_words)
-            
-            # Get top sentences
-            num_sentences = max(3, len(sentences) // 5)
-            top_sentences = sorted(sentence_scores.items(), 
-                                 key=lambda x: x[1], reverse=True)[:num_sentences]
-            
-            # Order by appearance
-            summary_sentences = sorted(top_sentences, 
-                                     key=lambda x: sentences.index(x[0]))
-            self.summary_text = '. '.join([s[0] for s in summary_sentences]) + '.'
-            
-            # Get keywords for highlighting
-            self.keywords = [word for word, count in word_freq.most_common(10)]
-            
-            self.root.after(0, self.display_summary)
-            self.root.after(0, self.hide_progress)
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
-            self.root.after(0, self.hide_progress)
-            
-    def display_summary(self):
-        self.summary_box.delete(1.0, tk.END)
-        self.summary_box.insert(1.0, self.summary_text)
-        
-        # Highlight keywords
-        self.summary_box.tag_configure("highlight", background="yellow", 
-                                      foreground="black")
-        
-        for keyword in self.keywords[:5]:  # Top 5 keywords
-            start_idx = '1.0'
-            while True:
-                start_idx = self.summary_box.search(keyword, start_idx, 
-                                                   stopindex=tk.END, nocase=True)
-                if not start_idx:
-                    break
-                end_idx = f"{start_idx}+{len(keyword)}c"
-                self.summary_box.tag_add("highlight", start_idx, end_idx)
-                start_idx = end_idx
-                
-        self.update_stats()
-        messagebox.showinfo("Success", "Summary generated with highlighted keywords!")
-        
-    def update_stats(self):
-        orig_words = len(self.extracted_text.split())
-        summ_words = len(self.summary_text.split()) if self.summary_text else 0
-        ratio = (summ_words / orig_words * 100) if orig_words > 0 else 0
-        
-        self.stats_label.config(
-            text=f"📊 Original: {orig_words} words | Summary: {summ_words} words | Compression: {ratio:.1f}%"
-        )
-        
-    def speak_summary(self):
-        if not self.summary_text.strip():
-            messagebox.showwarning("Warning", "No summary to speak!")
-            return
-            
-        threading.Thread(target=self.do_speak, daemon=True).start()
-        
-    def do_speak(self):
-        try:
-            self.engine.setProperty('rate', self.voice_speed)
-            self.engine.setProperty('volume', self.voice_volume)
-            self.engine.say(self.summary_text)
-            self.engine.runAndWait()
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
-            
-    def update_speed(self, val):
-        self.voice_speed = int(val)
-        
-    def update_volume(self, val):
-        self.voice_volume = float(val) / 100
-        
-    def copy_summary(self):
-        if self.summary_text:
-            self.root.clipboard_clear()
-            self.root.clipboard_append(self.summary_text)
-            messagebox.showinfo("Success", "Summary copied to clipboard!")
-        else:
-            messagebox.showwarning("Warning", "No summary to copy!")
-            
-    def save_summary(self):
-        if not self.summary_text:
-            messagebox.showwarning("Warning", "No summary to save!")
-            return
-            
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt")]
-        )
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.summary_text)
-                messagebox.showinfo("Success", "Summary saved successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-                
-    def show_visualization(self):
-        if not self.summary_text:
-            messagebox.showwarning("Warning", "Generate a summary first!")
-            return
-            
-        # Get top keywords
-        words = re.findall(r'\b[a-z]+\b', self.extracted_text.lower())
-        stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 
-                     'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by'}
-        words = [w for w in words if w not in stop_words and len(w) > 3]
-        word_freq = Counter(words).most_common(8)
-        
-        if not word_freq:
-            messagebox.showinfo("Info", "Not enough keywords to visualize!")
-            return
-            
-        # Create visualization window
-        viz_window = tk.Toplevel(self.root)
-        viz_window.title("📊 Keyword Frequency Analysis")
-        viz_window.geometry("700x500")
-        
-        fig, ax = plt.subplots(figsize=(8, 5))
-        keywords = [item[0] for item in word_freq]
-        frequencies = [item[1] for item in word_freq]
-        
-        bars = ax.bar(keywords, frequencies, color='#4CAF50', alpha=0.8)
-        ax.set_xlabel('Keywords', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Frequency', fontsize=12, fontweight='bold')
-        ax.set_title('Top Keywords in Your Document', fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45, ha='right')
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, viz_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-    def toggle_theme(self):
-        self.dark_mode = not self.dark_mode
-        self.apply_theme()
-        
-    def apply_theme(self):
-        if self.dark_mode:
-            bg = self.colors['dark_bg']
-            fg = self.colors['dark_fg']
-            btn_bg = self.colors['dark_btn']
-            text_bg = self.colors['dark_text_bg']
-            self.theme_btn.config(text="☀️ Light Mode")
-        else:
-            bg = self.colors['light_bg']
-            fg = self.colors['light_fg']
-            btn_bg = self.colors['light_btn']
-            text_bg = self.colors['light_text_bg']
-            self.theme_btn.config(text="🌙 Dark Mode")
-            
-        self.root.configure(bg=bg)
-        
-        # Update all widgets
-        for widget in self.root.winfo_children():
-            self.update_widget_theme(widget, bg, fg, btn_bg, text_bg)
-            
-    def update_widget_theme(self, widget, bg, fg, btn_bg, text_bg):
-        widget_type = widget.winfo_class()
-        
-        try:
-            if widget_type in ['Frame', 'Labelframe']:
-                widget.configure(bg=bg)
-                if widget_type == 'Labelframe':
-                    widget.configure(fg=fg)
-            elif widget_type == 'Label':
-                widget.configure(bg=bg, fg=fg)
-            elif widget_type == 'Button':
-                widget.configure(bg=btn_bg, fg='white', activebackground=btn_bg)
-            elif widget_type in ['Text', 'ScrolledText']:
-                widget.configure(bg=text_bg, fg=fg, insertbackground=fg)
-        except:
-            pass
-            
-        # Recursively update children
-        for child in widget.winfo_children():
-            self.update_widget_theme(child, bg, fg, btn_bg, text_bg)
-            
-    def show_progress(self, message):
-        # Simple progress indication
-        self.root.config(cursor="wait")
-        self.root.update()
-        
-    def hide_progress(self):
-        self.root.config(cursor="")
-        
-    def show_help(self):
-        help_text = """
-🎯 SMART SUMMARIZER PRO - HELP GUIDE
-
-📁 UPLOADING:
-• Click "Upload PDF" to load PDF documents
-• Click "Upload Image" to load and preview images
-• Extracted text appears in the middle panel
-
-✨ SUMMARIZATION:
-• Click "Generate Summary" to create an intelligent summary
-• Key terms are automatically highlighted in yellow
-• View word counts and compression ratio above summary
-
-🔊 VOICE FEATURES:
-• Click "Speak Summary" to hear the summary
-• Adjust speed (50-250) and volume (0-100) using sliders
-• Voice reads in real-time with your custom settings
-
-📊 VISUALIZATION:
-• Click "Visualize" to see top keyword frequencies
-• Bar chart shows most important terms
-
-🖼️ IMAGE TOOLS:
-• Use ↻ to rotate image 90 degrees
-• Use ⇔ to resize image smaller
-
-💾 SAVING & COPYING:
-• Click "Copy" to copy summary to clipboard
-• Click "Save" to export summary as text file
-
-🌙 THEME:
-• Toggle between Light and Dark mode anytime
-
-Enjoy your enhanced study experience! 🚀
-        """
-        
-        help_window = tk.Toplevel(self.root)
-        help_window.title("❓ Help & Instructions")
-        help_window.geometry("600x500")
-        
-        help_text_widget = scrolledtext.ScrolledText(help_window, 
-                                                     wrap=tk.WORD,
-                                                     font=("Arial", 10),
-                                                     padx=20, pady=20)
-        help_text_widget.pack(fill=tk.BOTH, expand=True)
-        help_text_widget.insert(1.0, help_text)
-        help_text_widget.configure(state='disabled')
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = SmartSummarizerPro(root)
+import tkinter as tk
+from tkinter import ttk, filedialog, scrolledtext, messagebox
+import math
+import os
+import time
+
+import engine
+import ocr
+import profiling
+import search
+import sections
+from analysis import DocumentAnalysis
+from batch import BatchRunner, DONE, FAILED
+from cache import DocumentCache, file_hash
+from docstore import STORE_MIN_CHARS, DocumentStore
+from extraction import Page, count_pages, iter_pdf_pages, join_pages
+from highlight import keyword_spans, tk_indices
+from incremental import IncrementalSummarizer
+from jobs import JobScheduler
+from speech import SpeechPlayer
+from textview import PagedTextView
+
+# Pillow, matplotlib, pyttsx3 and PyPDF2 are imported on first use so the
+# window comes up without paying for them (see benchmarks/startup.py).
+
+class SmartSummarizerPro:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Smart Summarizer Pro - Text Extractor & Voice Reader")
+        self.root.geometry("1200x800")
+        
+        # Theme colors
+        self.dark_mode = False
+        self.colors = {
+            'light_bg': '#f0f0f0',
+            'light_fg': '#000000',
+            'light_btn': '#4CAF50',
+            'light_text_bg': '#ffffff',
+            'dark_bg': '#2b2b2b',
+            'dark_fg': '#ffffff',
+            'dark_btn': '#45a049',
+            'dark_text_bg': '#1e1e1e'
+        }
+        
+        # Data storage
+        self.extracted_text = ""
+        self.summary_text = ""
+        self.pages = []
+        self.analysis = None
+        self.incremental = None
+        self.doc_hash = None
+        self.document_path = None
+        self.keywords = []
+        self.image_pipeline = None
+        self.image_label = None
+        
+        # Results cache shared across sessions
+        self.cache = DocumentCache()
+        self.summary_params = {'num_sentences': None, 'num_keywords': 10,
+                               'method': engine.DEFAULT_METHOD}
+        self.section_params = {'section_sentences': sections.DEFAULT_SECTION_SENTENCES,
+                               'overview_sentences': sections.DEFAULT_OVERVIEW_SENTENCES}
+        
+        # Background work: one job per group, a newer job cancels the older one
+        self.jobs = JobScheduler(lambda callback: self.root.after(0, callback),
+                                 max_workers=3, on_progress=self.update_progress)
+        
+        # Full-text index of every PDF opened or batch-summarized
+        self.search_index = None
+        self.search_window = None
+        self.search_hits = {}
+        
+        # Multi-document queue, created on first use
+        self.batch = None
+        self.batch_window = None
+        self.batch_rows = {}
+        
+        # One chart figure for the whole session, shown in a reusable window
+        self.charts = None
+        self.viz_window = None
+        self.viz_canvas = None
+        self.viz_analysis = None
+        
+        # Stage timings are always recorded; cProfile only on request
+        self.diagnostics_window = None
+        self.profile_capture = profiling.ProfileCapture()
+        
+        # Speech thread, started on the first Speak
+        self.speech = None
+        self.spoken_text = None
+        self.voice_speed = 150
+        self.voice_volume = 1.0
+        
+        self.setup_ui()
+        self.apply_theme()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def setup_ui(self):
+        # Main container
+        main_frame = tk.Frame(self.root)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Top control panel
+        self.create_control_panel(main_frame)
+        
+        # Content area with three columns
+        content_frame = tk.Frame(main_frame)
+        content_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        # Left column - Upload & Image
+        self.create_left_panel(content_frame)
+        
+        # Middle column - Extracted Text
+        self.create_middle_panel(content_frame)
+        
+        # Right column - Summary & Stats
+        self.create_right_panel(content_frame)
+        
+        # Bottom control panel
+        self.create_bottom_panel(main_frame)
+        
+        # Floating help button
+        self.create_help_button()
+        
+    def create_control_panel(self, parent):
+        control_frame = tk.Frame(parent)
+        control_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Title
+        title = tk.Label(control_frame, text="📚 Smart Summarizer Pro", 
+                        font=("Arial", 18, "bold"))
+        title.pack(side=tk.LEFT, padx=10)
+        
+        # Dark mode toggle
+        self.theme_btn = tk.Button(control_frame, text="🌙 Dark Mode", 
+                                   command=self.toggle_theme,
+                                   font=("Arial", 10), padx=15, pady=5)
+        self.theme_btn.pack(side=tk.RIGHT, padx=5)
+        
+        self.diagnostics_btn = tk.Button(control_frame, text="🩺 Diagnostics", 
+                                         command=self.open_diagnostics_window,
+                                         font=("Arial", 10), padx=10, pady=5)
+        self.diagnostics_btn.pack(side=tk.RIGHT, padx=5)
+        
+        # Background job progress
+        self.cancel_btn = tk.Button(control_frame, text="✖ Cancel", 
+                                    command=self.cancel_jobs,
+                                    font=("Arial", 9), state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar = ttk.Progressbar(control_frame, length=180, 
+                                            mode='determinate', maximum=1.0)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.status_label = tk.Label(control_frame, text="", font=("Arial", 9))
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+        
+    def create_left_panel(self, parent):
+        left_frame = tk.LabelFrame(parent, text="📁 Upload Files", 
+                                   font=("Arial", 11, "bold"), padx=10, pady=10)
+        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        # Upload buttons
+        self.pdf_btn = tk.Button(left_frame, text="📄 Upload PDF", 
+                                command=self.upload_pdf,
+                                font=("Arial", 10), pady=8)
+        self.pdf_btn.pack(fill=tk.X, pady=5)
+        
+        self.img_btn = tk.Button(left_frame, text="🖼️ Upload Image", 
+                                command=self.upload_image,
+                                font=("Arial", 10), pady=8)
+        self.img_btn.pack(fill=tk.X, pady=5)
+        
+        self.batch_btn = tk.Button(left_frame, text="📚 Batch Summarize", 
+                                  command=self.open_batch_window,
+                                  font=("Arial", 10), pady=8)
+        self.batch_btn.pack(fill=tk.X, pady=5)
+        
+        self.search_btn = tk.Button(left_frame, text="🔎 Search Documents", 
+                                   command=self.open_search_window,
+                                   font=("Arial", 10), pady=8)
+        self.search_btn.pack(fill=tk.X, pady=5)
+        
+        # Image preview area
+        preview_frame = tk.Frame(left_frame, bg='gray', width=300, height=400)
+        preview_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        preview_frame.pack_propagate(False)
+        
+        self.image_container = tk.Label(preview_frame, text="No Image Loaded", 
+                                       bg='gray', fg='white')
+        self.image_container.pack(expand=True)
+        
+        # Image controls
+        img_controls = tk.Frame(left_frame)
+        img_controls.pack(fill=tk.X)
+        
+        self.rotate_btn = tk.Button(img_controls, text="↻", 
+                                    command=self.rotate_image,
+                                    font=("Arial", 10), width=8)
+        self.rotate_btn.pack(side=tk.LEFT, padx=2)
+        
+        self.resize_btn = tk.Button(img_controls, text="⇔", 
+                                   command=self.resize_image,
+                                   font=("Arial", 10), width=8)
+        self.resize_btn.pack(side=tk.LEFT, padx=2)
+        
+        self.save_image_btn = tk.Button(img_controls, text="💾", 
+                                        command=self.export_image,
+                                        font=("Arial", 10), width=8)
+        self.save_image_btn.pack(side=tk.LEFT, padx=2)
+        
+    def create_middle_panel(self, parent):
+        middle_frame = tk.LabelFrame(parent, text="📝 Extracted Text", 
+                                     font=("Arial", 11, "bold"), padx=10, pady=10)
+        middle_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+        
+        self.extracted_box = scrolledtext.ScrolledText(middle_frame, 
+                                                       wrap=tk.WORD,
+                                                       font=("Arial", 10),
+                                                       height=20)
+        self.extracted_box.pack(fill=tk.BOTH, expand=True)
+        self.extracted_box.tag_configure("highlight", background="yellow", 
+                                        foreground="black")
+        
+        # Inserts pages progressively and pages very long documents
+        self.page_label = tk.Label(middle_frame, text="", font=("Arial", 8))
+        self.page_label.pack(fill=tk.X)
+        self.extracted_view = PagedTextView(self.extracted_box, 
+                                            scrollbar=self.extracted_box.vbar,
+                                            on_window_change=self.update_page_label)
+        
+    def create_right_panel(self, parent):
+        right_frame = tk.LabelFrame(parent, text="✨ Summary & Insights", 
+                                    font=("Arial", 11, "bold"), padx=10, pady=10)
+        right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        # Stats display
+        stats_frame = tk.Frame(right_frame)
+        stats_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.stats_label = tk.Label(stats_frame, 
+                                    text="📊 Words: 0 | Summary: 0 | Ratio: 0%",
+                                    font=("Arial", 9))
+        self.stats_label.pack()
+        
+        # Summary box
+        self.summary_box = scrolledtext.ScrolledText(right_frame, 
+                                                     wrap=tk.WORD,
+                                                     font=("Arial", 10),
+                                                     height=15)
+        self.summary_box.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        # Summary controls
+        summary_controls = tk.Frame(right_frame)
+        summary_controls.pack(fill=tk.X)
+        
+        self.copy_btn = tk.Button(summary_controls, text="📋 Copy", 
+                                 command=self.copy_summary,
+                                 font=("Arial", 9), width=10)
+        self.copy_btn.pack(side=tk.LEFT, padx=2)
+        
+        self.save_btn = tk.Button(summary_controls, text="💾 Save", 
+                                 command=self.save_summary,
+                                 font=("Arial", 9), width=10)
+        self.save_btn.pack(side=tk.LEFT, padx=2)
+        
+    def create_bottom_panel(self, parent):
+        bottom_frame = tk.Frame(parent)
+        bottom_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        # Main action buttons
+        action_frame = tk.Frame(bottom_frame)
+        action_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.summarize_btn = tk.Button(action_frame, text="🎯 Generate Summary", 
+                                       command=self.generate_summary,
+                                       font=("Arial", 11, "bold"), pady=10)
+        self.summarize_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        self.speak_btn = tk.Button(action_frame, text="🔊 Speak Summary", 
+                                   command=self.speak_summary,
+                                   font=("Arial", 11, "bold"), pady=10)
+        self.speak_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        self.viz_btn = tk.Button(action_frame, text="📊 Visualize", 
+                                command=self.show_visualization,
+                                font=("Arial", 11, "bold"), pady=10)
+        self.viz_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        # Voice controls
+        voice_frame = tk.LabelFrame(bottom_frame, text="🎤 Voice Settings", 
+                                   font=("Arial", 9, "bold"), padx=10, pady=5)
+        voice_frame.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Speed control
+        speed_frame = tk.Frame(voice_frame)
+        speed_frame.pack(side=tk.LEFT, padx=5)
+        tk.Label(speed_frame, text="Speed:", font=("Arial", 8)).pack()
+        self.speed_scale = tk.Scale(speed_frame, from_=50, to=250, 
+                                   orient=tk.HORIZONTAL, length=100,
+                                   command=self.update_speed)
+        self.speed_scale.set(150)
+        self.speed_scale.pack()
+        
+        # Volume control
+        volume_frame = tk.Frame(voice_frame)
+        volume_frame.pack(side=tk.LEFT, padx=5)
+        tk.Label(volume_frame, text="Volume:", font=("Arial", 8)).pack()
+        self.volume_scale = tk.Scale(volume_frame, from_=0, to=100, 
+                                    orient=tk.HORIZONTAL, length=100,
+                                    command=self.update_volume)
+        self.volume_scale.set(100)
+        self.volume_scale.pack()
+        
+        # Playback controls
+        playback_frame = tk.Frame(voice_frame)
+        playback_frame.pack(side=tk.LEFT, padx=5)
+        for text, command in (("⏮", lambda: self.skip_speech(-1)),
+                              ("⏯", self.pause_speech),
+                              ("⏹", self.stop_speech),
+                              ("⏭", lambda: self.skip_speech(1)),
+                              ("🎧", self.save_speech_audio)):
+            tk.Button(playback_frame, text=text, command=command,
+                      font=("Arial", 9), width=2).pack(side=tk.LEFT, padx=1)
+        
+        # Summarization method
+        method_frame = tk.LabelFrame(bottom_frame, text="🧠 Method", 
+                                    font=("Arial", 9, "bold"), padx=10, pady=5)
+        method_frame.pack(side=tk.RIGHT, padx=(10, 0))
+        self.method_var = tk.StringVar(value=engine.DEFAULT_METHOD)
+        self.method_box = ttk.Combobox(method_frame, textvariable=self.method_var,
+                                       values=list(engine.METHODS),
+                                       state='readonly', width=10)
+        self.method_box.pack(pady=8)
+        
+        # Section-by-section summary with its own sentence budgets
+        section_frame = tk.LabelFrame(bottom_frame, text="📑 Sections", 
+                                     font=("Arial", 9, "bold"), padx=10, pady=5)
+        section_frame.pack(side=tk.RIGHT, padx=(10, 0))
+        self.by_section_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(section_frame, text="By section", variable=self.by_section_var,
+                       font=("Arial", 8)).grid(row=0, column=0, columnspan=2, sticky='w')
+        self.section_budget = tk.Spinbox(section_frame, from_=1, to=sections.RANKED_DEPTH, 
+                                         width=3, font=("Arial", 8))
+        self.overview_budget = tk.Spinbox(section_frame, from_=0, to=50, 
+                                          width=3, font=("Arial", 8))
+        for row, (label, spinbox, value) in enumerate(
+                (("Each:", self.section_budget, self.section_params['section_sentences']),
+                 ("Overview:", self.overview_budget, self.section_params['overview_sentences'])), 1):
+            tk.Label(section_frame, text=label, font=("Arial", 8)).grid(row=row, column=0, sticky='w')
+            spinbox.delete(0, tk.END)
+            spinbox.insert(0, value)
+            spinbox.grid(row=row, column=1)
+        
+    def create_help_button(self):
+        help_btn = tk.Button(self.root, text="❓", 
+                            command=self.show_help,
+                            font=("Arial", 12, "bold"),
+                            width=3, height=1)
+        help_btn.place(relx=0.98, rely=0.02, anchor='ne')
+        
+    def upload_pdf(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("PDF files", "*.pdf")]
+        )
+        if file_path:
+            self.open_pdf(file_path)
+            
+    def open_pdf(self, file_path, page=None):
+        # Work on the previous document is no longer wanted
+        self.jobs.cancel('summary', 'highlight')
+        self.show_progress("Extracting PDF...")
+        self.jobs.submit('document', self.extract_pdf_text, file_path,
+                         on_done=lambda result: self.load_document(result, file_path, page),
+                         on_error=self.show_job_error)
+            
+    def extract_pdf_text(self, job, file_path):
+        # Runs on a worker thread; the result is applied by load_document
+        doc_hash = file_hash(file_path)
+        pages = self.cache.get_pages(doc_hash)
+        streamed = pages is None
+        incremental = None
+        if streamed:
+            # Scores sentences as pages land, so a summary is ready right away
+            incremental = IncrementalSummarizer()
+            job.post(self.begin_document, incremental)
+            total = count_pages(file_path)
+            pages = []
+            # Pages arrive in order while later ones are still being parsed
+            stream = iter_pdf_pages(file_path)
+            started = last = time.perf_counter()
+            try:
+                for page in stream:
+                    now = time.perf_counter()
+                    # Time waited for this page; workers parse several at once
+                    profiling.record('extract page', now - last, len(page.text), 'chars')
+                    last = now
+                    pages.append(page)
+                    incremental.set_page(page.number, page.text)
+                    job.post(self.append_extracted_page, page)
+                    job.progress(len(pages) / total,
+                                 f"Extracting page {page.number} of {total}...")
+            finally:
+                stream.close()  # stops the page workers if we were cancelled
+            profiling.record('extract pdf', time.perf_counter() - started, len(pages), 'pages')
+            scanned = any(ocr.needs_ocr(page) for page in pages)
+            if scanned and ocr.available():
+                # Scanned pages: read the text out of their images instead
+                job.progress(None, "Looking for scanned pages...")
+                with profiling.stage('ocr', len(pages), 'pages'):
+                    pages = ocr.ocr_pdf_pages(
+                        file_path, pages, cache=self.cache,
+                        progress=lambda done, total: job.progress(
+                            done / total, f"Running OCR on page {done} of {total}..."))
+                for page in pages:
+                    incremental.set_page(page.number, page.text)
+                # The view only has the pre-OCR text, so show everything again
+                streamed = False
+                scanned = False
+            if not scanned:
+                # Without OCR, scanned pages are extracted again next time
+                # in case Tesseract has been installed since
+                self.cache.put_pages(doc_hash, pages)
+        
+        job.progress(None, "Analyzing text...")
+        text = join_pages(pages)
+        analysis = self.analyze_text(text, pages)
+        if isinstance(analysis, DocumentStore):
+            incremental = None  # its per-page token lists are as big
+        return doc_hash, pages, text, analysis, incremental, streamed
+        
+    def analyze_text(self, text, pages):
+        # Tokenize here rather than on the main thread's first stats refresh.
+        # Token and sentence lists cost several times the size of the text,
+        # so very long documents keep them as ID arrays over a mapped file.
+        if len(text) >= STORE_MIN_CHARS:
+            return DocumentStore.from_pages(pages)
+        return DocumentAnalysis.from_pages(pages, text)
+        
+    def extract_image_text(self, job, file_path):
+        if not ocr.available():
+            return None
+        doc_hash = file_hash(file_path)
+        pages = self.cache.get_pages(doc_hash)
+        if pages is None:
+            job.progress(None, "Running OCR on image...")
+            pages = [Page(1, ocr.ocr_image_file(file_path, cache=self.cache))]
+            self.cache.put_pages(doc_hash, pages)
+        text = join_pages(pages)
+        return doc_hash, pages, text, DocumentAnalysis.from_pages(pages, text), None, False
+        
+    def load_image_text(self, result):
+        if result is None:
+            self.hide_progress()
+            self.status_label.config(text="Install Tesseract and pytesseract to extract text from images")
+        elif not result[2].strip():
+            self.hide_progress()
+            self.status_label.config(text="No text found in the image")
+        else:
+            self.load_document(result)
+        
+    def begin_document(self, incremental):
+        self.clear_extracted_text()
+        self.incremental = incremental
+        
+    def set_analysis(self, analysis):
+        # A store keeps its temporary file and memory map until closed.
+        # Jobs still reading it were cancelled when the new document was
+        # opened, and their errors are dropped.
+        if isinstance(self.analysis, DocumentStore) and self.analysis is not analysis:
+            self.analysis.close()
+        self.analysis = analysis
+        
+    def load_document(self, result, file_path=None, page=None):
+        doc_hash, pages, text, analysis, incremental, streamed = result
+        self.doc_hash = doc_hash
+        self.document_path = file_path  # for the PDF outline, if any
+        self.pages = pages
+        self.extracted_text = text
+        self.set_analysis(analysis)
+        self.incremental = incremental
+        if streamed:
+            self.update_stats()
+        else:
+            # Cache hit: PyPDF2 was skipped, show everything at once
+            self.display_extracted_text()
+        self.hide_progress()
+        if page:
+            self.show_extracted_page(page)
+        if file_path:
+            self.index_document(file_path, doc_hash, pages, analysis)
+        
+    def show_job_error(self, error):
+        self.hide_progress()
+        if isinstance(error, engine.NotEnoughContent):
+            messagebox.showwarning("Warning", str(error))
+        else:
+            messagebox.showerror("Error", str(error))
+            
+    def upload_image(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")]
+        )
+        if file_path:
+            self.load_image(file_path)
+            
+    def load_image(self, file_path):
+        self.jobs.cancel('summary', 'highlight')
+        self.show_progress("Loading image...")
+        self.jobs.submit('image', self.open_image, file_path,
+                         on_done=self.show_loaded_image, on_error=self.show_job_error)
+        # Text found in the image goes through the same flow as a PDF's
+        self.jobs.submit('document', self.extract_image_text, file_path,
+                         on_done=self.load_image_text, on_error=self.show_job_error)
+        
+    def open_image(self, job, file_path):
+        # Decodes only a preview-sized level; the full image is read on export
+        from imaging import ImagePipeline
+        pipeline = ImagePipeline(file_path)
+        pipeline.preview()
+        return pipeline
+        
+    def show_loaded_image(self, pipeline):
+        self.hide_progress()
+        self.image_pipeline = pipeline
+        self.display_image()
+        width, height = pipeline.size
+        if self.jobs.running('document'):
+            self.show_progress("Running OCR on image...")
+        messagebox.showinfo("Success", f"Image loaded ({width}×{height})! "
+                            "Use rotate/resize buttons.")
+            
+    def display_image(self):
+        if self.image_pipeline:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(self.image_pipeline.preview())
+            self.image_container.configure(image=photo, text="")
+            self.image_container.image = photo
+            
+    def rotate_image(self):
+        if self.image_pipeline:
+            self.image_pipeline.rotate()
+            self.display_image()
+            
+    def resize_image(self):
+        if self.image_pipeline:
+            self.image_pipeline.scale(0.8)
+            self.display_image()
+            
+    def export_image(self):
+        if not self.image_pipeline:
+            messagebox.showwarning("Warning", "Please upload an image first!")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG", "*.png"), ("JPEG", "*.jpg *.jpeg"), ("All files", "*.*")]
+        )
+        if file_path:
+            width, height = self.image_pipeline.transformed_size()
+            self.show_progress(f"Saving {width}×{height} image...")
+            pipeline = self.image_pipeline
+            self.jobs.submit('image', lambda job: pipeline.export(file_path),
+                             on_done=self.image_exported, on_error=self.show_job_error)
+            
+    def image_exported(self, file_path):
+        self.hide_progress()
+        messagebox.showinfo("Success", f"Image saved to {file_path}")
+            
+    def get_analysis(self):
+        # Recomputed only when the extracted text has been replaced (a
+        # DocumentStore is always replaced along with the text)
+        if self.analysis is None or (isinstance(self.analysis, DocumentAnalysis)
+                                     and self.analysis.text is not self.extracted_text):
+            self.analysis = DocumentAnalysis.from_pages(self.pages, self.extracted_text)
+        return self.analysis
+        
+    def display_extracted_text(self):
+        self.extracted_view.set_pages(self.pages)
+        self.update_stats()
+        
+    def clear_extracted_text(self):
+        self.extracted_view.clear()
+        
+    def append_extracted_page(self, page):
+        self.extracted_view.append_page(page)
+        
+    def update_page_label(self, first, last, total):
+        if not total:
+            self.page_label.config(text="")
+        elif self.extracted_view.virtual:
+            self.page_label.config(text=f"Showing pages {first + 1}-{last} of {total} (scroll to load more)")
+        else:
+            self.page_label.config(text=f"{total} pages")
+        
+    def generate_summary(self):
+        self.summary_params['method'] = self.method_var.get()
+        if self.jobs.running('document') and self.incremental is not None \
+                and self.incremental.pages:
+            # Still extracting: summarize the pages that have arrived so far
+            self.jobs.submit('summary', self.create_summary, None, None, None,
+                             dict(self.summary_params), self.incremental,
+                             on_done=lambda summary: self.show_summary_result(summary, provisional=True),
+                             on_error=self.show_job_error)
+            return
+            
+        if not self.extracted_text.strip():
+            messagebox.showwarning("Warning", "No text to summarize!")
+            return
+            
+        if self.by_section_var.get():
+            self.generate_section_summary()
+            return
+            
+        if self.doc_hash:
+            cached = self.cache.get_summary(self.doc_hash, self.summary_params)
+            if cached is not None:
+                self.summary_text = cached.text
+                self.keywords = cached.keywords
+                self.show_skipped(cached)
+                self.display_summary()
+                return
+            
+        self.show_progress("Generating summary...")
+        self.jobs.submit('summary', self.create_summary, self.extracted_text,
+                         self.analysis, self.doc_hash, dict(self.summary_params),
+                         self.incremental,
+                         on_done=self.show_summary_result, on_error=self.show_job_error)
+        
+    def create_summary(self, job, text, analysis, doc_hash, params, incremental=None):
+        if incremental is not None:
+            # Sentences are already tokenized and scored page by page
+            summary = incremental.summary(**params)
+        else:
+            if analysis is None or (isinstance(analysis, DocumentAnalysis)
+                                    and analysis.text is not text):
+                analysis = DocumentAnalysis(text)
+            job.check()
+            summary = engine.summarize(text, analysis=analysis, **params)
+        if doc_hash:
+            self.cache.put_summary(doc_hash, summary, params)
+        return summary
+        
+    def generate_section_summary(self):
+        try:
+            self.section_params['section_sentences'] = max(1, int(self.section_budget.get()))
+            self.section_params['overview_sentences'] = max(0, int(self.overview_budget.get()))
+        except ValueError:
+            messagebox.showwarning("Warning", "Sentence budgets must be whole numbers!")
+            return
+        params = dict(self.section_params, method=self.summary_params['method'],
+                      num_keywords=self.summary_params['num_keywords'])
+        self.show_progress("Summarizing sections...")
+        self.jobs.submit('summary', self.create_section_summary, self.pages,
+                         self.document_path, params,
+                         on_done=self.show_summary_result, on_error=self.show_job_error)
+        
+    def create_section_summary(self, job, pages, file_path, params):
+        # Section rankings are cached by text, so only a new document or
+        # method rescores; budget changes just reassemble the summary
+        outline = sections.outline_starts(file_path) if file_path else None
+        parts = sections.split_sections(pages, outline)
+        job.check()
+        
+        def progress(done, total):
+            job.check()  # stops the section workers when cancelled
+            job.progress(done / total, f"Summarized {done} of {total} sections...")
+        
+        return sections.summarize_sections(parts, cache=self.cache, progress=progress,
+                                           **params)
+        
+    def show_summary_result(self, summary, provisional=False):
+        self.summary_text = summary.text
+        self.keywords = summary.keywords
+        if provisional:
+            # Extraction is still running and owns the progress bar
+            self.display_summary(notify=False)
+            self.status_label.config(text="Provisional summary of the pages extracted so far")
+            return
+        self.hide_progress()
+        self.show_skipped(summary)
+        self.display_summary()
+        index = self.get_search_index()
+        if index is not None and self.doc_hash and self.document_path:
+            doc_hash = self.doc_hash
+            self.jobs.submit('index summary',
+                             lambda job: index.set_summary(doc_hash, summary.keywords, summary.text))
+        
+    def show_skipped(self, summary):
+        # What was left out before scoring
+        skipped = []
+        if summary.dropped_sentences:
+            skipped.append(f"{summary.dropped_sentences} repeated sentences")
+        if summary.boilerplate_lines:
+            skipped.append(f"{summary.boilerplate_lines} header/footer lines")
+        self.status_label.config(text="Skipped " + " and ".join(skipped) if skipped else "")
+        
+    def display_summary(self, notify=True):
+        with profiling.stage('insert summary', len(self.summary_text), 'chars'):
+            self.summary_box.delete(1.0, tk.END)
+            self.summary_box.insert(1.0, self.summary_text)
+        
+        # Highlight keywords
+        self.summary_box.tag_configure("highlight", background="yellow", 
+                                      foreground="black")
+        
+        with profiling.stage('highlight summary', len(self.summary_text), 'chars'):
+            spans = keyword_spans(self.summary_text, self.keywords[:5])  # Top 5 keywords
+            indices = tk_indices(self.summary_text, spans)
+            if indices:
+                self.summary_box.tag_add("highlight", *indices)
+        if not self.jobs.running('document'):
+            self.highlight_extracted_text()
+                
+        self.update_stats()
+        if notify:
+            messagebox.showinfo("Success", "Summary generated with highlighted keywords!")
+        
+    def open_batch_window(self):
+        if self.batch_window is not None and self.batch_window.winfo_exists():
+            self.batch_window.lift()
+            return
+        if self.batch is None:
+            index = self.get_search_index()
+            self.batch = BatchRunner(lambda callback: self.root.after(0, callback),
+                                     on_update=self.update_batch_item,
+                                     cache_dir=self.cache.directory,
+                                     index_path=index.path if index is not None else None)
+            
+        self.batch_window = tk.Toplevel(self.root)
+        self.batch_window.title("📚 Batch Summarize")
+        self.batch_window.geometry("750x450")
+        
+        controls = tk.Frame(self.batch_window)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        for text, command in [("📄 Add PDFs", self.add_batch_files),
+                              ("📂 Add Folder", self.add_batch_folder),
+                              ("👁 Open Selected", self.open_batch_selection),
+                              ("💾 Export All", self.export_batch),
+                              ("✖ Cancel Pending", self.batch.cancel)]:
+            tk.Button(controls, text=text, command=command,
+                      font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+            
+        self.batch_status = tk.Label(self.batch_window, text="", font=("Arial", 9))
+        self.batch_status.pack(fill=tk.X, padx=10)
+        
+        self.batch_tree = ttk.Treeview(self.batch_window, 
+                                       columns=('status', 'pages', 'words'))
+        self.batch_tree.heading('#0', text="Document")
+        self.batch_tree.heading('status', text="Status")
+        self.batch_tree.heading('pages', text="Pages")
+        self.batch_tree.heading('words', text="Summary words")
+        self.batch_tree.column('#0', width=360)
+        for column in ('status', 'pages', 'words'):
+            self.batch_tree.column(column, width=110, anchor='center')
+        self.batch_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.batch_tree.bind("<Double-1>", lambda event: self.open_batch_selection())
+        
+        # Results from an earlier session of the window are still there
+        self.batch_rows = {}
+        for item in self.batch.items:
+            self.insert_batch_row(item)
+        self.update_batch_status()
+        self.apply_theme()
+        
+    def add_batch_files(self):
+        paths = filedialog.askopenfilenames(
+            parent=self.batch_window,
+            filetypes=[("PDF files", "*.pdf")]
+        )
+        self.queue_batch(paths)
+        
+    def add_batch_folder(self):
+        directory = filedialog.askdirectory(parent=self.batch_window)
+        if directory:
+            self.queue_batch(engine.find_pdfs(directory))
+            
+    def queue_batch(self, paths):
+        if not paths:
+            return
+        params = dict(self.summary_params, method=self.method_var.get())
+        for item in self.batch.add(paths, params):
+            iid = str(id(item))
+            if iid in self.batch_rows:
+                # A failed or cancelled file queued again keeps its row
+                self.refresh_batch_row(iid, item)
+            else:
+                self.insert_batch_row(item)
+        self.update_batch_status()
+        
+    def insert_batch_row(self, item):
+        iid = str(id(item))
+        self.batch_rows[iid] = item
+        self.batch_tree.insert('', tk.END, iid=iid, text=item.name)
+        self.refresh_batch_row(iid, item)
+        
+    def refresh_batch_row(self, iid, item):
+        pages = words = ""
+        status = item.status
+        if item.status == DONE:
+            pages = len(item.result.pages)
+            words = len(item.result.summary.text.split())
+        elif item.status == FAILED:
+            status = f"failed: {item.error}"
+        self.batch_tree.item(iid, values=(status, pages, words))
+        
+    def update_batch_item(self, item):
+        iid = str(id(item))
+        if self.batch_window is not None and self.batch_window.winfo_exists() \
+                and iid in self.batch_rows:
+            self.refresh_batch_row(iid, item)
+            self.update_batch_status()
+            
+    def update_batch_status(self):
+        counts = self.batch.counts()
+        total = len(self.batch.items)
+        done = counts.get(DONE, 0)
+        text = f"{done}/{total} summarized"
+        if counts.get(FAILED):
+            text += f" | {counts[FAILED]} failed"
+        self.batch_status.config(text=text)
+        
+    def open_batch_selection(self):
+        selection = self.batch_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Select a finished document first!",
+                                   parent=self.batch_window)
+            return
+        item = self.batch_rows[selection[0]]
+        if item.status != DONE:
+            messagebox.showwarning("Warning", f"{item.name} is not finished yet!",
+                                   parent=self.batch_window)
+            return
+            
+        # Extraction and summary are already done; only the analysis used
+        # for stats and highlighting is rebuilt, off the main thread.
+        result = item.result
+        text = join_pages(result.pages)
+        self.jobs.cancel('summary', 'highlight')
+        self.show_progress(f"Opening {item.name}...")
+        self.jobs.submit('document', lambda job: self.analyze_text(text, result.pages),
+                         on_done=lambda analysis: self.show_batch_result(result, text, analysis),
+                         on_error=self.show_job_error)
+        
+    def show_batch_result(self, result, text, analysis):
+        self.doc_hash = result.doc_hash
+        self.document_path = result.path
+        self.pages = result.pages
+        self.extracted_text = text
+        self.set_analysis(analysis)
+        self.incremental = None
+        self.summary_text = result.summary.text
+        self.keywords = result.summary.keywords
+        self.hide_progress()
+        self.display_extracted_text()
+        self.display_summary(notify=False)
+        
+    def export_batch(self):
+        if not self.batch.finished():
+            messagebox.showwarning("Warning", "No finished summaries to export!",
+                                   parent=self.batch_window)
+            return
+        directory = filedialog.askdirectory(parent=self.batch_window)
+        if directory:
+            try:
+                written = self.batch.export(directory)
+                messagebox.showinfo("Success", f"Exported {len(written)} summaries!",
+                                    parent=self.batch_window)
+            except Exception as e:
+                messagebox.showerror("Error", str(e), parent=self.batch_window)
+        
+    def get_search_index(self):
+        # None when this Python's SQLite has no FTS5
+        if self.search_index is None and search.available():
+            self.search_index = search.SearchIndex(search.default_index_path(self.cache.directory))
+        return self.search_index
+        
+    def index_document(self, file_path, doc_hash, pages, analysis):
+        index = self.get_search_index()
+        if index is None:
+            return
+        
+        def add(job):
+            keywords = [word for word, _ in analysis.word_freq.most_common(search.NUM_KEYWORDS)]
+            # Returns at once if this file's content is already indexed
+            index.add_document(file_path, doc_hash, pages, keywords)
+        
+        self.jobs.submit('index', add, on_done=lambda result: self.update_search_status())
+        
+    def open_search_window(self):
+        if self.get_search_index() is None:
+            messagebox.showwarning("Warning", "Search needs SQLite with FTS5, which this Python lacks.")
+            return
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            return
+            
+        self.search_window = tk.Toplevel(self.root)
+        self.search_window.title("🔎 Search Documents")
+        self.search_window.geometry("800x500")
+        
+        controls = tk.Frame(self.search_window)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        self.search_entry = tk.Entry(controls, font=("Arial", 10))
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.search_entry.bind("<Return>", lambda event: self.run_search())
+        for text, command in [("🔎 Search", self.run_search),
+                              ("📂 Index Folder", self.index_search_folder)]:
+            tk.Button(controls, text=text, command=command,
+                      font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+            
+        self.search_status = tk.Label(self.search_window, text="", font=("Arial", 9))
+        self.search_status.pack(fill=tk.X, padx=10)
+        
+        self.search_tree = ttk.Treeview(self.search_window, columns=('match',))
+        self.search_tree.heading('#0', text="Document / page")
+        self.search_tree.heading('match', text="Match")
+        self.search_tree.column('#0', width=220)
+        self.search_tree.column('match', width=540)
+        self.search_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.search_tree.bind("<Double-1>", lambda event: self.open_search_selection())
+        
+        self.search_hits = {}
+        self.update_search_status()
+        self.apply_theme()
+        self.search_entry.focus_set()
+        
+    def update_search_status(self, message=""):
+        if self.search_window is None or not self.search_window.winfo_exists():
+            return
+        documents, pages = self.search_index.counts()
+        text = f"{documents} documents, {pages} pages indexed"
+        self.search_status.config(text=f"{message} | {text}" if message else text)
+        
+    def run_search(self):
+        query = self.search_entry.get()
+        if query.strip():
+            self.jobs.submit('search', self.search_documents, query,
+                             on_done=self.show_search_results, on_error=self.show_job_error)
+            
+    def search_documents(self, job, query):
+        started = time.perf_counter()
+        with profiling.stage('search index'):
+            hits = self.search_index.search(query)
+        return hits, time.perf_counter() - started
+        
+    def show_search_results(self, result):
+        if self.search_window is None or not self.search_window.winfo_exists():
+            return
+        hits, seconds = result
+        self.search_tree.delete(*self.search_tree.get_children())
+        self.search_hits = {}
+        # Pages grouped under their document, best match first
+        parents = {}
+        for hit in hits:
+            parent = parents.get(hit.path)
+            if parent is None:
+                parent = parents[hit.path] = self.search_tree.insert(
+                    '', tk.END, text=os.path.basename(hit.path),
+                    values=(", ".join(hit.keywords[:5]),), open=True)
+                self.search_hits[parent] = (hit.path, None)
+            iid = self.search_tree.insert(parent, tk.END, text=f"p. {hit.page}",
+                                          values=(hit.snippet,))
+            self.search_hits[iid] = (hit.path, hit.page)
+        self.update_search_status(f"{len(hits)} pages in {len(parents)} documents "
+                                  f"({seconds * 1000:.0f} ms)")
+        
+    def open_search_selection(self):
+        selection = self.search_tree.selection()
+        if not selection:
+            return
+        path, page = self.search_hits[selection[0]]
+        if not os.path.exists(path):
+            messagebox.showwarning("Warning", f"{os.path.basename(path)} no longer exists!",
+                                   parent=self.search_window)
+        elif self.document_path and os.path.abspath(self.document_path) == path:
+            if page:
+                self.show_extracted_page(page)
+        else:
+            self.open_pdf(path, page)
+            
+    def show_extracted_page(self, number, pages=None):
+        # The view ignores jumps while it is still inserting pages
+        if pages is None:
+            pages = self.pages
+        if pages is not self.pages:
+            return  # another document was opened meanwhile
+        if self.extracted_view.busy:
+            self.root.after(100, lambda: self.show_extracted_page(number, pages))
+        else:
+            self.extracted_view.show_page(number)
+            
+    def index_search_folder(self):
+        directory = filedialog.askdirectory(parent=self.search_window)
+        if directory:
+            self.show_progress("Indexing folder...")
+            self.jobs.submit('index folder', self.index_folder, directory,
+                             on_done=self.search_folder_indexed, on_error=self.show_job_error)
+            
+    def index_folder(self, job, directory):
+        # Unchanged files are skipped without being read
+        return search.index_folder(
+            self.search_index, directory, cache=self.cache,
+            progress=lambda done, total, path: job.progress(
+                done / total, f"Indexing {os.path.basename(path)} ({done} of {total})..."))
+        
+    def search_folder_indexed(self, counts):
+        self.hide_progress()
+        indexed, unchanged, failed = counts
+        self.update_search_status(f"{indexed} indexed, {unchanged} unchanged, {failed} failed")
+        
+    def highlight_extracted_text(self):
+        # The extracted text can be megabytes long: find the spans off the
+        # main thread and let the view tag the pages it is showing.
+        text = self.extracted_text
+        keywords = self.keywords[:5]
+        self.jobs.submit('highlight', self.find_highlights, text, keywords,
+                         on_done=lambda spans: self.apply_extracted_highlights(text, spans))
+        
+    def find_highlights(self, job, text, keywords):
+        with profiling.stage('highlight find', len(text), 'chars'):
+            return keyword_spans(text, keywords)
+        
+    def apply_extracted_highlights(self, text, spans):
+        if text is self.extracted_text:  # skip if a new document replaced it
+            self.extracted_view.set_highlights(spans)
+        
+    def update_stats(self):
+        orig_words = self.get_analysis().word_count
+        summ_words = len(self.summary_text.split()) if self.summary_text else 0
+        ratio = (summ_words / orig_words * 100) if orig_words > 0 else 0
+        
+        self.stats_label.config(
+            text=f"📊 Original: {orig_words} words | Summary: {summ_words} words | Compression: {ratio:.1f}%"
+        )
+        self.update_visualization()
+        
+    def speak_summary(self):
+        if not self.summary_text.strip():
+            messagebox.showwarning("Warning", "No summary to speak!")
+            return
+        # Starts over from the first sentence if already speaking
+        self.spoken_text = self.summary_text
+        self.get_speech_player().play(self.summary_text)
+        
+    def get_speech_player(self):
+        if self.speech is None:
+            self.speech = SpeechPlayer(lambda callback: self.root.after(0, callback),
+                                       on_chunk=self.show_spoken_chunk,
+                                       on_error=self.show_job_error)
+            self.speech.set_rate(self.voice_speed)
+            self.speech.set_volume(self.voice_volume)
+        return self.speech
+        
+    def show_spoken_chunk(self, chunk):
+        self.summary_box.tag_remove("speaking", "1.0", tk.END)
+        # Skip if a new summary replaced the one being read
+        if chunk is None or self.spoken_text is not self.summary_text:
+            return
+        start = f"1.0+{chunk.start}c"
+        self.summary_box.tag_configure("speaking", background="#cce5ff", foreground="black")
+        self.summary_box.tag_lower("speaking")  # keyword highlights stay on top
+        self.summary_box.tag_add("speaking", start, f"1.0+{chunk.end}c")
+        self.summary_box.see(start)
+        
+    def pause_speech(self):
+        if self.speech is not None:
+            self.speech.toggle_pause()
+            
+    def stop_speech(self):
+        if self.speech is not None:
+            self.speech.stop()
+            
+    def skip_speech(self, count):
+        if self.speech is not None:
+            self.speech.skip(count)
+            
+    def save_speech_audio(self):
+        if not self.summary_text.strip():
+            messagebox.showwarning("Warning", "No summary to save!")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".wav",
+            filetypes=[("WAV audio", "*.wav"), ("AIFF audio", "*.aiff"),
+                       ("MP3 audio", "*.mp3"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.status_label.config(text="Rendering audio in the background...")
+            self.get_speech_player().save_to_file(
+                self.summary_text, file_path,
+                on_done=self.speech_audio_saved, on_error=self.show_job_error)
+            
+    def speech_audio_saved(self, file_path):
+        self.status_label.config(text="")
+        messagebox.showinfo("Success", f"Audio saved to {file_path}")
+            
+    def update_speed(self, val):
+        self.voice_speed = int(val)
+        # Applied from the next sentence on
+        if self.speech is not None:
+            self.speech.set_rate(self.voice_speed)
+        
+    def update_volume(self, val):
+        self.voice_volume = float(val) / 100
+        if self.speech is not None:
+            self.speech.set_volume(self.voice_volume)
+        
+    def copy_summary(self):
+        if self.summary_text:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(self.summary_text)
+            messagebox.showinfo("Success", "Summary copied to clipboard!")
+        else:
+            messagebox.showwarning("Warning", "No summary to copy!")
+            
+    def save_summary(self):
+        if not self.summary_text:
+            messagebox.showwarning("Warning", "No summary to save!")
+            return
+            
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt")]
+        )
+        if file_path:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(self.summary_text)
+                messagebox.showinfo("Success", "Summary saved successfully!")
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                
+    def show_visualization(self):
+        if not self.summary_text:
+            messagebox.showwarning("Warning", "Generate a summary first!")
+            return
+            
+        if not self.get_analysis().top_words(1, min_length=4):
+            messagebox.showinfo("Info", "Not enough keywords to visualize!")
+            return
+            
+        if self.viz_window is not None and self.viz_window.winfo_exists():
+            self.viz_window.lift()
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from charts import KeywordCharts
+            
+            if self.charts is None:
+                self.charts = KeywordCharts()
+            self.viz_window = tk.Toplevel(self.root)
+            self.viz_window.title("📊 Keyword Frequency Analysis")
+            self.viz_window.geometry("700x650")
+            self.viz_canvas = FigureCanvasTkAgg(self.charts.figure, self.viz_window)
+            self.viz_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.viz_analysis = None
+        self.update_visualization()
+        
+    def update_visualization(self):
+        # Runs on every stats refresh; only a new analysis changes the charts
+        if self.viz_window is None or not self.viz_window.winfo_exists():
+            return
+        analysis = self.get_analysis()
+        if analysis is self.viz_analysis:
+            return
+        self.viz_analysis = analysis
+        from charts import DENSITY_KEYWORDS, TOP_KEYWORDS
+        
+        # Frequencies were counted when the document was analysed
+        top_words = analysis.top_words(TOP_KEYWORDS, min_length=4)
+        self.charts.show_keywords(top_words)
+        self.charts.clear_density()
+        self.viz_canvas.draw_idle()
+        
+        pages = self.pages
+        words = [word for word, _ in top_words[:DENSITY_KEYWORDS]]
+        if pages and words:
+            self.jobs.submit('chart', lambda job: analysis.page_word_counts(pages, words),
+                             on_done=lambda result: self.show_density(analysis, pages, words, result))
+            
+    def show_density(self, analysis, pages, words, result):
+        if analysis is not self.viz_analysis or not self.viz_window.winfo_exists():
+            return
+        counts, totals = result
+        self.charts.show_density([page.number for page in pages], words, counts, totals)
+        self.viz_canvas.draw_idle()
+        
+    def open_diagnostics_window(self):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        self.diagnostics_window = tk.Toplevel(self.root)
+        self.diagnostics_window.title("🩺 Diagnostics")
+        self.diagnostics_window.geometry("780x520")
+        
+        columns = ("count", "total", "mean", "max", "size", "cache")
+        self.diagnostics_tree = ttk.Treeview(self.diagnostics_window, columns=columns)
+        self.diagnostics_tree.heading("#0", text="Stage")
+        self.diagnostics_tree.column("#0", width=170)
+        for column, title, width in (("count", "Runs", 60), ("total", "Total ms", 90),
+                                     ("mean", "Mean ms", 90), ("max", "Max ms", 90),
+                                     ("size", "Processed", 130), ("cache", "Cache hit/miss", 110)):
+            self.diagnostics_tree.heading(column, text=title)
+            self.diagnostics_tree.column(column, width=width, anchor=tk.E)
+        self.diagnostics_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        controls = tk.Frame(self.diagnostics_window)
+        controls.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.profile_btn = tk.Button(controls, command=self.toggle_profiling,
+                                     font=("Arial", 9), width=16)
+        self.profile_btn.pack(side=tk.LEFT, padx=2)
+        tk.Button(controls, text="Export JSON", font=("Arial", 9),
+                  command=lambda: self.export_diagnostics('json')).pack(side=tk.RIGHT, padx=2)
+        tk.Button(controls, text="Export CSV", font=("Arial", 9),
+                  command=lambda: self.export_diagnostics('csv')).pack(side=tk.RIGHT, padx=2)
+        tk.Button(controls, text="Clear", font=("Arial", 9),
+                  command=profiling.recorder.clear).pack(side=tk.RIGHT, padx=2)
+        self.refresh_diagnostics()
+        
+    def refresh_diagnostics(self):
+        if self.diagnostics_window is None or not self.diagnostics_window.winfo_exists():
+            return
+        self.update_profile_button()
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        for row in profiling.recorder.summary():
+            size = f"{row['size']:,} {row['unit']}" if row['unit'] else ""
+            cache = f"{row['hits']}/{row['misses']}" if row['hits'] or row['misses'] else ""
+            self.diagnostics_tree.insert("", tk.END, text=row['stage'], values=(
+                row['count'], f"{row['total'] * 1000:.1f}", f"{row['mean'] * 1000:.2f}",
+                f"{row['max'] * 1000:.1f}", size, cache))
+        self.diagnostics_window.after(1000, self.refresh_diagnostics)
+        
+    def update_profile_button(self):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.profile_btn.config(text="⏹ Stop Profiling" if self.profile_capture.active
+                                    else "⏺ Profile a Run")
+        
+    def export_diagnostics(self, kind):
+        file_path = filedialog.asksaveasfilename(
+            parent=self.diagnostics_window, defaultextension="." + kind,
+            filetypes=[(kind.upper(), "*." + kind), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                if kind == 'json':
+                    profiling.recorder.export_json(file_path)
+                else:
+                    profiling.recorder.export_csv(file_path)
+                messagebox.showinfo("Success", f"Diagnostics saved to {file_path}",
+                                    parent=self.diagnostics_window)
+            except Exception as e:
+                messagebox.showerror("Error", str(e), parent=self.diagnostics_window)
+                
+    def toggle_profiling(self):
+        if not self.profile_capture.active:
+            # Covers the main thread and every job until stopped
+            self.profile_capture.start()
+            self.jobs.profile = self.profile_capture
+            self.update_profile_button()
+            return
+        self.jobs.profile = None
+        file_path = filedialog.asksaveasfilename(
+            parent=self.diagnostics_window, defaultextension=".prof",
+            filetypes=[("cProfile stats", "*.prof"), ("All files", "*.*")]
+        )
+        report = self.profile_capture.stop(file_path or None)
+        self.update_profile_button()
+        
+        report_window = tk.Toplevel(self.root)
+        report_window.title("⏱ Profile")
+        report_window.geometry("900x600")
+        report_box = scrolledtext.ScrolledText(report_window, wrap=tk.NONE,
+                                               font=("Courier", 9))
+        report_box.pack(fill=tk.BOTH, expand=True)
+        report_box.insert(1.0, report)
+        report_box.config(state=tk.DISABLED)
+        
+    def toggle_theme(self):
+        self.dark_mode = not self.dark_mode
+        self.apply_theme()
+        
+    def apply_theme(self):
+        if self.dark_mode:
+            bg = self.colors['dark_bg']
+            fg = self.colors['dark_fg']
+            btn_bg = self.colors['dark_btn']
+            text_bg = self.colors['dark_text_bg']
+            self.theme_btn.config(text="☀️ Light Mode")
+        else:
+            bg = self.colors['light_bg']
+            fg = self.colors['light_fg']
+            btn_bg = self.colors['light_btn']
+            text_bg = self.colors['light_text_bg']
+            self.theme_btn.config(text="🌙 Dark Mode")
+            
+        self.root.configure(bg=bg)
+        
+        # Update all widgets
+        for widget in self.root.winfo_children():
+            self.update_widget_theme(widget, bg, fg, btn_bg, text_bg)
+            
+    def update_widget_theme(self, widget, bg, fg, btn_bg, text_bg):
+        widget_type = widget.winfo_class()
+        
+        try:
+            if widget_type in ['Frame', 'Labelframe']:
+                widget.configure(bg=bg)
+                if widget_type == 'Labelframe':
+                    widget.configure(fg=fg)
+            elif widget_type == 'Label':
+                widget.configure(bg=bg, fg=fg)
+            elif widget_type == 'Button':
+                widget.configure(bg=btn_bg, fg='white', activebackground=btn_bg)
+            elif widget_type in ['Text', 'ScrolledText']:
+                widget.configure(bg=text_bg, fg=fg, insertbackground=fg)
+        except:
+            pass
+            
+        # Recursively update children
+        for child in widget.winfo_children():
+            self.update_widget_theme(child, bg, fg, btn_bg, text_bg)
+            
+    def show_progress(self, message):
+        self.status_label.config(text=message)
+        self.progress_bar.config(mode='indeterminate')
+        self.progress_bar.start(15)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        
+    def update_progress(self, job, fraction, message):
+        if message:
+            self.status_label.config(text=message)
+        if fraction is None:
+            if str(self.progress_bar.cget('mode')) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(15)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=fraction)
+        
+    def hide_progress(self):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', value=0)
+        self.status_label.config(text="")
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.root.config(cursor="")
+        
+    def cancel_jobs(self):
+        self.jobs.cancel('document', 'summary', 'highlight')
+        self.hide_progress()
+        
+    def on_close(self):
+        self.jobs.shutdown()
+        if self.batch is not None:
+            self.batch.shutdown()
+        if self.speech is not None:
+            self.speech.stop()
+            self.speech.shutdown()
+        self.root.destroy()
+        
+    def show_help(self):
+        help_text = """
+🎯 SMART SUMMARIZER PRO - HELP GUIDE
+
+📁 UPLOADING:
+• Click "Upload PDF" to load PDF documents
+• Click "Upload Image" to load and preview images
+• Text in images and scanned PDF pages is read with OCR (needs Tesseract)
+• Click "Batch Summarize" to queue many PDFs or a whole folder
+• Click "Search Documents" to find words in every PDF opened so far;
+  "Index Folder" adds a whole folder, skipping files already indexed
+• Double-click a result to open the document at that page
+• Extracted text appears in the middle panel
+
+✨ SUMMARIZATION:
+• Click "Generate Summary" to create an intelligent summary
+• Key terms are automatically highlighted in yellow
+• Click it while a PDF is still loading for a provisional summary
+• View word counts and compression ratio above summary
+• Pick a Method: fast (word frequency), tfidf or textrank
+• Tick "By section" to summarize each chapter (found from the PDF's
+  bookmarks or headings), then the whole document in an overview
+• "Each" and "Overview" set how many sentences each part gets
+• Running headers, footers, page numbers and repeated sentences are
+  skipped; the status bar says how many
+
+🔊 VOICE FEATURES:
+• Click "Speak Summary" to hear the summary
+• The sentence being read is highlighted in blue
+• ⏮ ⏯ ⏹ ⏭ go back, pause/resume, stop and skip a sentence
+• 🎧 saves the spoken summary to an audio file
+• Adjust speed (50-250) and volume (0-100) using sliders
+• Speed and volume changes apply from the next sentence
+
+📊 VISUALIZATION:
+• Click "Visualize" to see top keyword frequencies
+• Bar chart shows most important terms
+• The line chart shows how often the top terms appear on each page
+• The chart window stays open and follows the loaded document
+
+🖼️ IMAGE TOOLS:
+• Use ↻ to rotate image 90 degrees
+• Use ⇔ to resize image smaller
+• Use 💾 to save the edited image at full resolution
+
+🩺 DIAGNOSTICS:
+• Click "Diagnostics" to see how long each stage took and cache hits
+• Export the timings as JSON or CSV to attach to a bug report
+• "Profile a Run" records a cProfile capture until you stop it
+
+💾 SAVING & COPYING:
+• Click "Copy" to copy summary to clipboard
+• Click "Save" to export summary as text file
+
+🌙 THEME:
+• Toggle between Light and Dark mode anytime
+
+Enjoy your enhanced study experience! 🚀
+        """
+        
+        help_window = tk.Toplevel(self.root)
+        help_window.title("❓ Help & Instructions")
+        help_window.geometry("600x500")
+        
+        help_text_widget = scrolledtext.ScrolledText(help_window, 
+                                                     wrap=tk.WORD,
+                                                     font=("Arial", 10),
+                                                     padx=20, pady=20)
+        help_text_widget.pack(fill=tk.BOTH, expand=True)
+        help_text_widget.insert(1.0, help_text)
+        help_text_widget.configure(state='disabled')
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = SmartSummarizerPro(root)
     root.mainloop()
\ No newline at end of file
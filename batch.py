@@ -0,0 +1,159 @@
+"""Summarize many documents at once on a process pool.
+
+Used by the app's batch window. Each worker extracts and summarizes one
+file end to end, going through the shared DocumentCache so files that
+were already processed come back straight from disk.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import engine
+import ocr
+from cache import DocumentCache, file_hash
+from extraction import extract_pdf_pages
+from search import SearchIndex
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class DocumentResult:
+    path: str
+    doc_hash: str
+    pages: list
+    summary: engine.Summary
+
+
+@dataclass
+class BatchItem:
+    path: str
+    status: str = QUEUED
+    result: DocumentResult = None
+    error: str = ""
+    future: object = field(default=None, repr=False)
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+
+def load_pages(path, cache, doc_hash, workers=1):
+    pages = cache.get_pages(doc_hash)
+    if pages is None:
+        # workers=1: the batch already keeps every core busy with whole files
+        pages = extract_pdf_pages(path, workers=workers)
+        if any(ocr.needs_ocr(page) for page in pages):
+            if not ocr.available():
+                # Not cached, so OCR runs once Tesseract is installed
+                return pages
+            pages = ocr.ocr_pdf_pages(path, pages, workers=workers, cache=cache)
+        cache.put_pages(doc_hash, pages)
+    return pages
+
+
+def process_document(path, params, cache_dir=None, index_path=None):
+    cache = DocumentCache(cache_dir)
+    doc_hash = file_hash(path)
+    pages = load_pages(path, cache, doc_hash)
+    summary = cache.get_summary(doc_hash, params)
+    if summary is None:
+        summary = engine.summarize_pages(pages, **params)
+        cache.put_summary(doc_hash, summary, params)
+    if index_path is not None:
+        SearchIndex(index_path).add_document(path, doc_hash, pages, summary.keywords,
+                                             summary.text)
+    return DocumentResult(path, doc_hash, pages, summary)
+
+
+class BatchRunner:
+    def __init__(self, dispatch, on_update=None, workers=None, cache_dir=None,
+                 index_path=None):
+        # on_update(item) runs through dispatch whenever an item changes state
+        self.dispatch = dispatch
+        self.on_update = on_update
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        # Finished documents are added to this search index, if given
+        self.index_path = index_path
+        self.items = []
+        self._pool = None
+
+    def add(self, paths, params):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Failed and cancelled files are queued again in place, so each
+        # path has one item and counts() doesn't keep the old failure
+        known = {item.path: item for item in self.items}
+        added = []
+        for path in paths:
+            item = known.get(path)
+            if item is None:
+                item = known[path] = BatchItem(path)
+                self.items.append(item)
+            elif item.status in (FAILED, CANCELLED):
+                item.status = QUEUED
+                item.result = None
+                item.error = ""
+            else:
+                continue
+            item.future = self._pool.submit(process_document, path, dict(params),
+                                            self.cache_dir, self.index_path)
+            item.future.add_done_callback(lambda future, item=item: self._done(item, future))
+            added.append(item)
+        return added
+
+    def _done(self, item, future):
+        # Called on a pool thread; hand the state change to the main thread
+        def apply():
+            if item.future is not future:
+                return  # queued again since; the new future reports instead
+            if future.cancelled():
+                item.status = CANCELLED
+            elif future.exception() is not None:
+                item.status = FAILED
+                item.error = str(future.exception())
+            else:
+                item.status = DONE
+                item.result = future.result()
+            if self.on_update is not None:
+                self.on_update(item)
+        self.dispatch(apply)
+
+    def counts(self):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+
+    def finished(self):
+        return [item for item in self.items if item.status == DONE]
+
+    def cancel(self):
+        for item in self.items:
+            if item.future is not None:
+                item.future.cancel()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def export(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for item in self.finished():
+            base = os.path.splitext(item.name)[0]
+            out_path = os.path.join(directory, base + '.summary.txt')
+            # Two inputs with the same file name shouldn't overwrite each other
+            suffix = 2
+            while out_path in written:
+                out_path = os.path.join(directory, f"{base}-{suffix}.summary.txt")
+                suffix += 1
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(engine.format_summary(item.result.summary))
+            written.append(out_path)
+        return written
@@ -0,0 +1,125 @@
+"""Synthetic documents for the benchmarks.
+
+Pages are made of lecture-style sentences drawn from a fixed vocabulary
+with a Zipf-like word distribution, so keyword counts and sentence
+scores behave like real notes. Output is deterministic for a given seed.
+The PDF writer needs nothing but the standard library:
+
+    python benchmarks/corpus.py out/ --sizes 1 10 100
+"""
+import argparse
+import os
+import random
+import sys
+
+VOCABULARY = (
+    "data model learning network system theory analysis result method student "
+    "course lecture memory process graph function value matrix vector signal "
+    "energy cell protein market price policy history language structure design "
+    "algorithm complexity proof example problem solution equation variable error "
+    "sample experiment hypothesis evidence source reference chapter section"
+).split()
+FILLER = ["the", "a", "of", "and", "to", "in", "is", "for", "with", "on", "by", "as"]
+
+SENTENCES_PER_PAGE = 24
+DEFAULT_SIZES = (1, 10, 100, 500, 2000)
+
+
+def make_pages(page_count, seed=0):
+    rng = random.Random(seed)
+    # Zipf-like weights so a few terms dominate, as in real documents
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    pages = []
+    for _ in range(page_count):
+        sentences = []
+        for _ in range(SENTENCES_PER_PAGE):
+            words = []
+            for _ in range(rng.randint(8, 18)):
+                if rng.random() < 0.35:
+                    words.append(rng.choice(FILLER))
+                else:
+                    words.append(rng.choices(VOCABULARY, weights)[0])
+            sentences.append(" ".join(words).capitalize() + rng.choice(".....?!"))
+        pages.append(" ".join(sentences))
+    return pages
+
+
+def _wrap(text, width=95):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def write_pdf(path, pages):
+    # One Helvetica text object per page; enough for PyPDF2 to extract
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " ".join("(%s) '" % line.replace("\\", "").replace("(", "").replace(")", "")
+                         for line in _wrap(text))
+        stream = f"BT /F1 9 Tf 40 800 Td 11 TL {lines} ET".encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                       % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def ensure_corpus(directory, sizes=DEFAULT_SIZES, seed=0):
+    """Write <n>pages.pdf and <n>pages.txt for each size unless present.
+
+    Returns {size: (pdf_path, txt_path)}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for size in sizes:
+        pdf_path = os.path.join(directory, f"{size}pages.pdf")
+        txt_path = os.path.join(directory, f"{size}pages.txt")
+        if not (os.path.exists(pdf_path) and os.path.exists(txt_path)):
+            pages = make_pages(size, seed=seed)
+            write_pdf(pdf_path, pages)
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                # One page per line; the incremental benchmark splits them apart again
+                f.write("\n".join(pages))
+        paths[size] = (pdf_path, txt_path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("directory")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="page counts to generate (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for size, (pdf_path, txt_path) in ensure_corpus(args.directory, args.sizes,
+                                                    args.seed).items():
+        print(f"{size:>6} pages  {pdf_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Per-stage benchmarks for extraction, summarization and the UI paths.
+
+Each (stage, size) runs in a fresh interpreter so peak RSS belongs to
+that stage alone. Documents come from benchmarks/corpus.py.
+
+    python benchmarks/pipeline.py --sizes 1 10 100 --save-baseline baseline.json
+    python benchmarks/pipeline.py --sizes 1 10 100 --compare baseline.json
+
+The gui stages need a display. Without one, --gui starts Xvfb if it is
+installed, or run everything under `xvfb-run -a`.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import DEFAULT_SIZES, ensure_corpus  # noqa: E402
+
+CORE_STAGES = ['extract', 'analyze', 'summarize-fast', 'summarize-tfidf',
+               'summarize-textrank', 'incremental', 'highlight']
+GUI_STAGES = ['gui-display-text', 'gui-display-summary', 'gui-visualize']
+
+# Slower than baseline by more than this fraction counts as a regression
+DEFAULT_TOLERANCE = 0.15
+
+
+# Child side -----------------------------------------------------------
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _load(txt_path):
+    from analysis import DocumentAnalysis
+    with open(txt_path, encoding='utf-8') as f:
+        text = f.read()
+    return text, DocumentAnalysis(text)
+
+
+def _pump(root, done):
+    # Let after() callbacks and worker results run until done() holds
+    while not done():
+        root.update()
+        time.sleep(0.001)
+
+
+def run_stage(stage, pdf_path, txt_path):
+    """Run one stage and return (seconds, sentences processed)."""
+    if stage == 'extract':
+        from extraction import extract_pdf_pages
+        start = time.perf_counter()
+        extract_pdf_pages(pdf_path)
+        return time.perf_counter() - start, None
+
+    text, analysis = _load(txt_path)
+    sentences = len(analysis.sentences)
+
+    if stage == 'analyze':
+        from analysis import DocumentAnalysis
+        start = time.perf_counter()
+        DocumentAnalysis(text)
+        return time.perf_counter() - start, sentences
+
+    if stage.startswith('summarize-'):
+        import engine
+        method = stage.split('-', 1)[1]
+        if method != 'fast':
+            import scoring  # noqa: F401  (NumPy/SciPy import isn't per-summary cost)
+        start = time.perf_counter()
+        # Same call create_summary makes, with the analysis already done
+        engine.summarize(text, analysis=analysis, method=method)
+        return time.perf_counter() - start, sentences
+
+    if stage == 'incremental':
+        from incremental import IncrementalSummarizer
+        with open(txt_path, encoding='utf-8') as f:
+            pages = f.read().split("\n")
+        start = time.perf_counter()
+        summarizer = IncrementalSummarizer()
+        for number, page in enumerate(pages, 1):
+            summarizer.set_page(number, page + ("\n" if number < len(pages) else ""))
+        summarizer.summary()
+        return time.perf_counter() - start, sentences
+
+    if stage == 'highlight':
+        import engine
+        from highlight import keyword_spans, tk_indices
+        summary = engine.summarize(text, analysis=analysis)
+        start = time.perf_counter()
+        tk_indices(summary.text, keyword_spans(summary.text, summary.keywords[:5]))
+        keyword_spans(text, summary.keywords[:5])
+        return time.perf_counter() - start, sentences
+
+    return run_gui_stage(stage, text, analysis)
+
+
+def run_gui_stage(stage, text, analysis):
+    import tkinter as tk
+
+    import app
+    import engine
+    from extraction import Page
+
+    root = tk.Tk()
+    window = app.SmartSummarizerPro(root)
+    root.update()
+    window.pages = [Page(number, page) for number, page in enumerate(text.split("\n"), 1)]
+    window.extracted_text = text
+    window.analysis = analysis
+    summary = engine.summarize(text, analysis=analysis)
+    window.summary_text = summary.text
+    window.keywords = summary.keywords
+    try:
+        start = time.perf_counter()
+        if stage == 'gui-display-text':
+            window.display_extracted_text()
+            _pump(root, lambda: not window.extracted_view.busy)
+        elif stage == 'gui-display-summary':
+            window.display_extracted_text()
+            _pump(root, lambda: not window.extracted_view.busy)
+            start = time.perf_counter()
+            window.display_summary(notify=False)
+            _pump(root, lambda: not window.jobs.running() and not window.extracted_view.busy)
+        elif stage == 'gui-visualize':
+            window.show_visualization()
+            root.update()
+        else:
+            raise ValueError(f"unknown stage {stage!r}")
+        seconds = time.perf_counter() - start
+    finally:
+        window.on_close()
+    return seconds, len(analysis.sentences)
+
+
+def child_main(stage, pdf_path, txt_path, pages):
+    seconds, sentences = run_stage(stage, pdf_path, txt_path)
+    print(json.dumps({'seconds': seconds, 'pages': pages, 'sentences': sentences,
+                      'peak_rss_mb': peak_rss_mb()}))
+    return 0
+
+
+# Parent side ----------------------------------------------------------
+
+def run_child(stage, size, paths, env):
+    pdf_path, txt_path = paths
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', stage, pdf_path, txt_path,
+         str(size)],
+        cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else "child process failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(stage, size, paths, repeat, env):
+    runs = [run_child(stage, size, paths, env) for _ in range(repeat)]
+    seconds = statistics.median(run['seconds'] for run in runs)
+    rss = [run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None]
+    sentences = runs[0]['sentences']
+    return {
+        'seconds': seconds,
+        'peak_rss_mb': max(rss) if rss else None,
+        'pages_per_sec': size / seconds if seconds else None,
+        'sentences_per_sec': sentences / seconds if sentences and seconds else None,
+    }
+
+
+def start_virtual_display():
+    # Returns (process, display) or (None, None) when Xvfb isn't installed
+    if not shutil.which('Xvfb'):
+        return None, None
+    for number in range(99, 120):
+        if not os.path.exists(f"/tmp/.X{number}-lock"):
+            display = f":{number}"
+            process = subprocess.Popen(['Xvfb', display, '-screen', '0', '1280x1024x24'],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            time.sleep(0.5)
+            return process, display
+    return None, None
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or not previous.get('seconds'):
+            continue
+        change = current['seconds'] / previous['seconds'] - 1
+        current['change'] = change
+        if change > tolerance:
+            regressions.append((key, change))
+    return regressions
+
+
+def format_rate(value):
+    return f"{value:>12.1f}" if value is not None else f"{'-':>12}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--child':
+        stage, pdf_path, txt_path, pages = argv[1:5]
+        return child_main(stage, pdf_path, txt_path, int(pages))
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="document sizes in pages (default: %(default)s)")
+    parser.add_argument("--stages", nargs='+', choices=CORE_STAGES + GUI_STAGES,
+                        help="stages to run (default: every core stage, plus gui with --gui)")
+    parser.add_argument("--gui", action="store_true",
+                        help="also run the Tk stages, starting Xvfb if there is no display")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="runs per measurement; the median time is reported")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(),
+                                                             'summarizer_pro_corpus'),
+                        help="where generated documents are kept between runs")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                        help="write the results as a baseline for later --compare")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare against a saved baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a stage counts as a regression "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    stages = args.stages or CORE_STAGES + (GUI_STAGES if args.gui else [])
+    corpus = ensure_corpus(args.corpus_dir, args.sizes)
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+
+    xvfb = None
+    if any(stage.startswith('gui') for stage in stages) and not os.environ.get('DISPLAY'):
+        xvfb, display = start_virtual_display()
+        if display:
+            env['DISPLAY'] = display
+
+    results = {}
+    print(f"{'stage':<22}{'pages':>7}{'time (ms)':>12}{'peak RSS MB':>13}"
+          f"{'pages/s':>12}{'sentences/s':>12}")
+    try:
+        for stage in stages:
+            for size in args.sizes:
+                try:
+                    result = measure(stage, size, corpus[size], args.repeat, env)
+                except RuntimeError as e:
+                    print(f"{stage:<22}{size:>7}  n/a ({e})")
+                    continue
+                results[f"{stage}/{size}"] = result
+                rss = result['peak_rss_mb']
+                print(f"{stage:<22}{size:>7}{result['seconds'] * 1000:>12.1f}"
+                      f"{rss if rss is not None else float('nan'):>13.1f}"
+                      f"{format_rate(result['pages_per_sec'])}"
+                      f"{format_rate(result['sentences_per_sec'])}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\ncompared with {args.compare} ({baseline.get('machine', 'unknown machine')})")
+        for key, change in regressions:
+            print(f"  slower: {key} {change:+.0%}")
+        if regressions:
+            status = 1
+        else:
+            print("  no regressions")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': f"{platform.node()} {platform.machine()} "
+                                  f"Python {platform.python_version()}",
+                       'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                       'results': results}, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
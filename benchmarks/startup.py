@@ -0,0 +1,120 @@
+"""Cold-start benchmark for the desktop app.
+
+Every measurement runs in a fresh interpreter so nothing is already in
+sys.modules:
+
+    python benchmarks/startup.py            # needs a display for the window timing
+    python benchmarks/startup.py --imports-only
+
+Time-to-first-window counts from just before the child process is
+spawned until the main window is mapped, so interpreter start-up is
+included the same way a user would feel it.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'tkinter',
+    'PyPDF2',
+    'PIL.Image',
+    'PIL.ImageTk',
+    'matplotlib.figure',
+    'matplotlib.backends.backend_tkagg',
+    'pyttsx3',
+    'numpy',
+    'scipy.sparse',
+    'engine',
+    'app',
+]
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+WINDOW_SNIPPET = """
+import time
+import tkinter as tk
+import app
+root = tk.Tk()
+app.SmartSummarizerPro(root)
+root.update()
+while not root.winfo_ismapped():
+    root.update()
+print(time.time())
+root.destroy()
+"""
+
+
+def run_child(snippet):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    started = time.time()
+    completed = subprocess.run([sys.executable, '-c', snippet], cwd=ROOT, env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else "child process failed")
+    return started, float(completed.stdout.strip().splitlines()[-1])
+
+
+def import_cost(module, repeat):
+    samples = []
+    for _ in range(repeat):
+        _, seconds = run_child(IMPORT_SNIPPET.format(module=module))
+        samples.append(seconds)
+    return statistics.median(samples)
+
+
+def time_to_first_window(repeat):
+    samples = []
+    for _ in range(repeat):
+        started, mapped_at = run_child(WINDOW_SNIPPET)
+        samples.append(mapped_at - started)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="runs per measurement; the median is reported")
+    parser.add_argument("--imports-only", action="store_true",
+                        help="skip the window timing (e.g. on a headless machine)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {'imports': {}, 'time_to_first_window': None}
+    print(f"{'module':<36}{'import (ms)':>12}")
+    for module in MODULES:
+        try:
+            seconds = import_cost(module, args.repeat)
+        except RuntimeError as e:
+            print(f"{module:<36}{'n/a':>12}  ({e})")
+            continue
+        results['imports'][module] = seconds
+        print(f"{module:<36}{seconds * 1000:>12.1f}")
+
+    if not args.imports_only:
+        try:
+            seconds = time_to_first_window(args.repeat)
+            results['time_to_first_window'] = seconds
+            print(f"\ntime to first window: {seconds * 1000:.0f} ms")
+        except RuntimeError as e:
+            print(f"\ntime to first window: n/a ({e})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
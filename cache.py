@@ -0,0 +1,188 @@
+"""On-disk cache for extracted pages, OCR text, word frequencies, section
+rankings and summaries.
+
+Entries are keyed by a hash of the document's content, so renaming or
+re-downloading a file still hits. Each entry is a small JSON file; reads
+refresh its mtime and writes evict the least recently used files once
+the directory grows past max_bytes.
+
+Summaries, section rankings and word counts are also keyed by
+CACHE_FORMAT. Bump it whenever what they hold changes, and entries
+written in the old format are never matched again.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import profiling
+from engine import Summary
+from extraction import Page
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 2: repeated sentences and running headers left out (dropped_sentences,
+#    boilerplate_lines); word counts in document order
+CACHE_FORMAT = 2
+# Eviction removes entries until the cache is this fraction of max_bytes
+EVICT_TO = 0.9
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'summarizer_pro')
+
+
+def file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def params_key(params):
+    encoded = json.dumps([CACHE_FORMAT, params or {}], sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class DocumentCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes in the directory as of the last scan plus what this
+        # instance wrote since; None until the first write scans it
+        self._total = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, doc_hash, kind):
+        return os.path.join(self.directory, f"{doc_hash}.{kind}.json")
+
+    def _read(self, doc_hash, kind):
+        path = self._path(doc_hash, kind)
+        start = time.perf_counter()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            data = None
+        # 'summary-<params>' entries are reported together
+        profiling.record('cache ' + kind.split('-')[0], time.perf_counter() - start,
+                         cache_hit=data is not None)
+        return data
+
+    def _write(self, doc_hash, kind, data):
+        path = self._path(doc_hash, kind)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        # Write to a temp file first so a crash never leaves half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        # The directory is only listed again once it may be over the limit
+        with self._lock:
+            if self._total is not None:
+                self._total += size - replaced
+            scan = self._total is None or self._total > self.max_bytes
+        if scan:
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            # Once over the limit, make room for a few writes before the next scan
+            target = self.max_bytes if total <= self.max_bytes \
+                else int(self.max_bytes * EVICT_TO)
+            entries.sort()
+            for mtime, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            self._total = total
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    os.remove(entry.path)
+            self._total = 0
+
+    def get_pages(self, doc_hash):
+        data = self._read(doc_hash, 'pages')
+        if data is None:
+            return None
+        return [Page(number, text) for number, text in data]
+
+    def put_pages(self, doc_hash, pages):
+        self._write(doc_hash, 'pages', [[page.number, page.text] for page in pages])
+
+    def get_ocr(self, image_hash):
+        data = self._read(image_hash, 'ocr')
+        return data['text'] if data is not None else None
+
+    def put_ocr(self, image_hash, text):
+        self._write(image_hash, 'ocr', {'text': text})
+
+    def get_section(self, section_hash, params=None):
+        # Keyed by the section's text, so it is shared between documents
+        return self._read(section_hash, 'section-' + params_key(params))
+
+    def put_section(self, section_hash, ranking, params=None):
+        self._write(section_hash, 'section-' + params_key(params), ranking)
+
+    def get_word_freq(self, doc_hash):
+        data = self._read(doc_hash, 'freq-' + params_key(None))
+        return Counter(data) if data is not None else None
+
+    def put_word_freq(self, doc_hash, word_freq):
+        self._write(doc_hash, 'freq-' + params_key(None), dict(word_freq))
+
+    def get_summary(self, doc_hash, params=None):
+        data = self._read(doc_hash, 'summary-' + params_key(params))
+        if data is None:
+            return None
+        word_freq = self.get_word_freq(doc_hash) or Counter()
+        return Summary(data['text'], data['keywords'], word_freq, data['sentence_count'],
+                       data['dropped_sentences'], data['boilerplate_lines'])
+
+    def put_summary(self, doc_hash, summary, params=None):
+        self._write(doc_hash, 'summary-' + params_key(params), {
+            'text': summary.text,
+            'keywords': summary.keywords,
+            'sentence_count': summary.sentence_count,
+            'dropped_sentences': summary.dropped_sentences,
+            'boilerplate_lines': summary.boilerplate_lines,
+        })
+        self.put_word_freq(doc_hash, summary.word_freq)
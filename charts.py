@@ -0,0 +1,96 @@
+"""Keyword charts drawn on one long-lived matplotlib Figure.
+
+pyplot keeps every figure it creates alive until it is closed, so a new
+plt.subplots() per Visualize click leaked. KeywordCharts builds a plain
+Figure once, with a fixed set of bar, label and line artists, and a new
+document only changes their data before the canvas redraws. Nothing in
+here imports tkinter or pyplot; the app attaches the figure to a
+FigureCanvasTkAgg and calls draw_idle() after each update.
+"""
+from matplotlib.figure import Figure
+
+TOP_KEYWORDS = 8
+# Lines in the per-page density chart
+DENSITY_KEYWORDS = 4
+# With fewer pages than this the density lines also get point markers
+MARKER_MAX_PAGES = 30
+
+BAR_COLOR = '#4CAF50'
+LINE_COLORS = ['#2e7d32', '#1565c0', '#ef6c00', '#6a1b9a']
+
+
+class KeywordCharts:
+    def __init__(self):
+        self.figure = Figure(figsize=(8, 7), constrained_layout=True)
+        self.bar_axes, self.density_axes = self.figure.subplots(
+            2, 1, gridspec_kw={'height_ratios': [3, 2]})
+
+        positions = list(range(TOP_KEYWORDS))
+        self.bars = self.bar_axes.bar(positions, [0] * TOP_KEYWORDS,
+                                      color=BAR_COLOR, alpha=0.8)
+        self.bar_labels = [self.bar_axes.text(x, 0, "", ha='center', va='bottom',
+                                              fontweight='bold')
+                           for x in positions]
+        self.bar_axes.set_xticks(positions)
+        self.bar_axes.set_xlabel('Keywords', fontsize=12, fontweight='bold')
+        self.bar_axes.set_ylabel('Frequency', fontsize=12, fontweight='bold')
+        self.bar_axes.set_title('Top Keywords in Your Document', fontsize=14,
+                                fontweight='bold')
+
+        self.lines = [self.density_axes.plot([], [], color=color)[0]
+                      for color in LINE_COLORS[:DENSITY_KEYWORDS]]
+        self.density_axes.set_xlabel('Page')
+        self.density_axes.set_ylabel('Per 1,000 words')
+        self.density_axes.set_title('Keyword Density by Page', fontweight='bold')
+
+    def show_keywords(self, top_words):
+        # top_words: (word, count) pairs, most frequent first
+        top_words = top_words[:TOP_KEYWORDS]
+        for i, (bar, label) in enumerate(zip(self.bars, self.bar_labels)):
+            visible = i < len(top_words)
+            bar.set_visible(visible)
+            label.set_visible(visible)
+            if visible:
+                count = top_words[i][1]
+                bar.set_height(count)
+                label.set_text(str(count))
+                label.set_y(count)
+        self.bar_axes.set_xticklabels([word for word, _ in top_words] +
+                                      [""] * (TOP_KEYWORDS - len(top_words)),
+                                      rotation=45, ha='right')
+        self.bar_axes.set_xlim(-0.5, max(len(top_words), 1) - 0.5)
+        highest = max((count for _, count in top_words), default=0)
+        # Headroom for the value labels
+        self.bar_axes.set_ylim(0, highest * 1.15 or 1)
+
+    def clear_density(self):
+        for line in self.lines:
+            line.set_data([], [])
+            line.set_visible(False)
+        legend = self.density_axes.get_legend()
+        if legend is not None:
+            legend.remove()
+
+    def show_density(self, page_numbers, words, counts, totals):
+        """Plot occurrences per 1,000 words of each word on each page.
+
+        counts[page][i] is how often words[i] occurs on that page and
+        totals[page] how many words the page has, as returned by
+        page_word_counts() on the document's analysis.
+        """
+        marker = 'o' if len(page_numbers) < MARKER_MAX_PAGES else ''
+        for i, line in enumerate(self.lines):
+            if i < len(words):
+                line.set_data(page_numbers, [row[i] * 1000 / total if total else 0
+                                             for row, total in zip(counts, totals)])
+                line.set_label(words[i])
+                line.set_marker(marker)
+                line.set_visible(True)
+            else:
+                line.set_data([], [])
+                line.set_visible(False)
+                line.set_label('_nolegend_')
+        self.density_axes.relim(visible_only=True)
+        self.density_axes.autoscale_view()
+        if words:
+            self.density_axes.legend(loc='upper right', fontsize=8)
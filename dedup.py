@@ -0,0 +1,328 @@
+"""Boilerplate and repeated-sentence removal ahead of scoring.
+
+Both passes are linear in the size of the document.
+
+Boilerplate: running headers, footers and page numbers sit in the first
+or last few lines of a page and repeat from page to page. Those edge
+lines are normalized (lowercased, digits folded, whitespace collapsed)
+and counted by how many pages they appear on. Lines found on
+MIN_REPEAT_PAGES pages or more are blanked with spaces of the same
+length, so offsets into the text stay valid for highlighting and page
+lookups.
+
+Repeated sentences: later copies of a sentence are dropped from
+scoring, as are near-copies whose word-bigram sets overlap by
+NEAR_DUPLICATE_JACCARD or more. Candidates come from MinHash signatures
+cut into LSH bands, so only sentences sharing a band bucket are ever
+compared. Words are hashed with crc32 and the hash functions are fixed,
+so every process and every analysis type drops the same sentences.
+Documents of NUMPY_MIN_SENTENCES sentences or more, and any document
+once something else has imported NumPy, are checked with NumPy, which finds exact copies from a 64-bit digest per sentence and
+only builds Python shingle sets for the LSH candidates.
+"""
+import random
+import re
+import sys
+import zlib
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+# Lines at each end of a page that may be a header or footer
+EDGE_LINES = 3
+MIN_REPEAT_PAGES = 3
+MAX_BOILERPLATE_CHARS = 120
+
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+NEAR_DUPLICATE_JACCARD = 0.8
+# With fewer sentences, importing NumPy (about 0.06s) costs more than
+# it saves
+NUMPY_MIN_SENTENCES = 500
+# Distinct words whose crc32 is remembered between documents
+WORD_HASH_CACHE = 1 << 16
+
+_PRIME = (1 << 31) - 1
+_MASK = (1 << 64) - 1
+_DIGEST_BASE = 0x100000001b3
+_rng = random.Random(0)
+_A = [_rng.randrange(1, _PRIME) for _ in range(NUM_HASHES)]
+_B = [_rng.randrange(0, _PRIME) for _ in range(NUM_HASHES)]
+_AB = list(zip(_A, _B))
+
+LINE_RE = re.compile(r'^[ \t]*(\S[^\n]*?)[ \t]*$', re.MULTILINE)
+DIGITS_RE = re.compile(r'\d+')
+
+
+# Boilerplate ----------------------------------------------------------
+
+def _edge_lines(text):
+    matches = list(LINE_RE.finditer(text))
+    if len(matches) > 2 * EDGE_LINES:
+        matches = matches[:EDGE_LINES] + matches[-EDGE_LINES:]
+    return matches
+
+
+def _line_key(line):
+    if len(line) > MAX_BOILERPLATE_CHARS:
+        return None
+    return " ".join(DIGITS_RE.sub('#', line.lower()).split())
+
+
+def edge_keys(text):
+    """Normalized edge lines of one page that could be boilerplate."""
+    keys = {_line_key(match.group(1)) for match in _edge_lines(text)}
+    keys.discard(None)
+    return keys
+
+
+def boilerplate_keys(texts):
+    """Normalized edge lines that repeat across the given page texts."""
+    pages_with = Counter()
+    for text in texts:
+        pages_with.update(edge_keys(text))
+    return frozenset(key for key, count in pages_with.items() if count >= MIN_REPEAT_PAGES)
+
+
+def page_spans(text, keys):
+    # (start, end) of the lines in one page's text that are boilerplate
+    if not keys:
+        return []
+    return [match.span(1) for match in _edge_lines(text) if _line_key(match.group(1)) in keys]
+
+
+def blank(text, spans):
+    if not spans:
+        return text
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(text[position:start])
+        parts.append(" " * (end - start))
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def strip_boilerplate(pages):
+    """Return (pages with boilerplate blanked, lines blanked on each page)."""
+    keys = boilerplate_keys(page.text for page in pages)
+    cleaned = []
+    removed = []
+    for page in pages:
+        spans = page_spans(page.text, keys)
+        removed.append(len(spans))
+        cleaned.append(page._replace(text=blank(page.text, spans)) if spans else page)
+    return cleaned, removed
+
+
+# Repeated sentences ---------------------------------------------------
+
+def word_hash(word):
+    return zlib.crc32(word.encode('utf-8'))
+
+
+_cached_word_hash = lru_cache(maxsize=WORD_HASH_CACHE)(word_hash)
+
+
+def word_hashes(words):
+    return list(map(_cached_word_hash, words))
+
+
+def shingles(hashes):
+    """Word bigrams of one sentence's word_hashes(); a one-word sentence is its own shingle."""
+    if len(hashes) == 1:
+        return set(hashes)
+    return {(a * 1000003 ^ b) & 0xffffffff for a, b in zip(hashes, hashes[1:])}
+
+
+def _words(hashes, offsets, i):
+    words = hashes[offsets[i]:offsets[i + 1]]
+    return words.tolist() if hasattr(words, 'tolist') else list(words)
+
+
+def _numpy(sentence_count):
+    # NumPy, or None when it is missing or its import would cost more
+    # than the pure-Python loops. Once imported it is cheaper at any size.
+    if sentence_count < NUMPY_MIN_SENTENCES and 'numpy' not in sys.modules:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+def _exact_duplicates(hashes, offsets):
+    # (later copies, the non-empty sentences left) in document order
+    duplicates = set()
+    seen = set()
+    rest = []
+    for i in range(len(offsets) - 1):
+        words = tuple(_words(hashes, offsets, i))
+        if not words:
+            continue
+        if words in seen:
+            duplicates.add(i)
+        else:
+            seen.add(words)
+            rest.append(i)
+    return duplicates, rest
+
+
+def _exact_duplicates_numpy(np, words, bounds):
+    # As above, comparing a 64-bit digest and the length of each sentence
+    # instead of its words. The digest is a polynomial hash of the word
+    # hashes; uint64 arithmetic wraps, so it is taken modulo 2**64.
+    lengths = np.diff(bounds)
+    nonempty = np.flatnonzero(lengths)
+    position = np.arange(len(words), dtype=np.uint64) \
+        - np.repeat(bounds[:-1], lengths).astype(np.uint64)
+    powers = np.power(np.uint64(_DIGEST_BASE), position)
+    digests = np.add.reduceat(words * powers, bounds[:-1][nonempty]) if len(nonempty) \
+        else np.zeros(0, dtype=np.uint64)
+    del position, powers
+    # lexsort is stable, so each run of equal sentences starts with the first
+    order = np.lexsort((lengths[nonempty], digests))
+    digests = digests[order]
+    sorted_lengths = lengths[nonempty][order]
+    repeat = np.zeros(len(order), dtype=bool)
+    repeat[1:] = (digests[1:] == digests[:-1]) & (sorted_lengths[1:] == sorted_lengths[:-1])
+    duplicates = nonempty[order[repeat]]
+    rest = nonempty[np.sort(order[~repeat])]
+    return set(duplicates.tolist()), rest
+
+
+def _permuted(shingle):
+    return [(a * shingle + b) % _PRIME for a, b in _AB]
+
+
+def _signature_keys(words, permuted):
+    # One LSH key per band for a non-empty sentence: the band's MinHash
+    # values folded into 64 bits. `permuted` is _permuted, cached for one
+    # document, since common bigrams recur from sentence to sentence.
+    signature = list(map(min, zip(*map(permuted, shingles(words)))))
+    row = []
+    for band in range(BANDS):
+        key = 0
+        for value in signature[band * ROWS:(band + 1) * ROWS]:
+            key = (key * _PRIME + value) & _MASK
+        row.append(key)
+    return row
+
+
+def _band_keys(hashes, offsets, indices):
+    # (index, band keys) for the sentences in indices that share a band
+    # key with another one; the rest cannot be near-duplicates
+    permuted = lru_cache(maxsize=WORD_HASH_CACHE)(_permuted)
+    keys = [_signature_keys(_words(hashes, offsets, i), permuted) for i in indices]
+    shared = [Counter(column) for column in zip(*keys)]
+    return [(i, row) for i, row in zip(indices, keys)
+            if any(counts[key] > 1 for counts, key in zip(shared, row))]
+
+
+def _signature_keys_numpy(np, words, bounds, indices):
+    # Same arithmetic as _signature_keys, for every sentence at once
+    lengths = np.diff(bounds)
+    single = np.repeat(lengths == 1, lengths)
+    last = np.zeros(len(words), dtype=bool)
+    last[bounds[1:][lengths > 0] - 1] = True
+    bigrams = np.zeros(len(words), dtype=np.uint64)
+    bigrams[:-1] = (words[:-1] * np.uint64(1000003) ^ words[1:]) & np.uint64(0xffffffff)
+    values = np.where(single, words, bigrams)[single | ~last]
+    del single, last, bigrams
+    counts = np.where(lengths == 1, 1, np.maximum(lengths - 1, 0))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    nonempty = counts > 0
+
+    keys = np.zeros((len(indices), BANDS), dtype=np.uint64)
+    per_sentence = np.zeros(len(lengths), dtype=np.uint64)
+    permuted = np.empty_like(values)
+    for column, (a, b) in enumerate(zip(_A, _B)):
+        np.multiply(values, np.uint64(a), out=permuted)
+        np.add(permuted, np.uint64(b), out=permuted)
+        np.remainder(permuted, np.uint64(_PRIME), out=permuted)
+        per_sentence[nonempty] = np.minimum.reduceat(permuted, starts[nonempty])
+        band = column // ROWS
+        # uint64 arithmetic wraps, matching the & _MASK above
+        keys[:, band] = keys[:, band] * np.uint64(_PRIME) + per_sentence[indices]
+    return keys
+
+
+def _band_keys_numpy(np, words, bounds, indices):
+    keys = _signature_keys_numpy(np, words, bounds, indices)
+    colliding = np.zeros(len(indices), dtype=bool)
+    for band in range(BANDS):
+        _, inverse, counts = np.unique(keys[:, band], return_inverse=True, return_counts=True)
+        colliding |= counts[inverse] > 1
+    return list(zip(indices[colliding].tolist(), keys[colliding].tolist()))
+
+
+def duplicate_sentences(hashes, offsets):
+    """Indices of sentences that repeat an earlier kept sentence.
+
+    `hashes` holds the word_hashes() of every sentence back to back, as a
+    list, array or NumPy array; sentence i is hashes[offsets[i]:offsets[i + 1]].
+    """
+    np = _numpy(len(offsets) - 1)
+    if np is None:
+        duplicates, rest = _exact_duplicates(hashes, offsets)
+        candidates = _band_keys(hashes, offsets, rest)
+    else:
+        words = np.asarray(hashes, dtype=np.uint64)
+        bounds = np.asarray(offsets, dtype=np.int64)
+        duplicates, rest = _exact_duplicates_numpy(np, words, bounds)
+        candidates = _band_keys_numpy(np, words, bounds, rest)
+
+    # Only sentences that share a band key get their shingles built
+    built = {}
+
+    def shingles_of(i):
+        if i not in built:
+            built[i] = shingles(_words(hashes, offsets, i))
+        return built[i]
+
+    return duplicates | near_duplicates(candidates, shingles_of)
+
+
+def band_keys(sentences):
+    """One tuple of LSH band keys per non-empty list of word_hashes()."""
+    np = _numpy(len(sentences))
+    if np is None:
+        permuted = lru_cache(maxsize=WORD_HASH_CACHE)(_permuted)
+        return [tuple(_signature_keys(words, permuted)) for words in sentences]
+    words = np.fromiter(chain.from_iterable(sentences), dtype=np.uint64)
+    bounds = np.zeros(len(sentences) + 1, dtype=np.int64)
+    np.cumsum([len(words) for words in sentences], out=bounds[1:])
+    keys = _signature_keys_numpy(np, words, bounds, np.arange(len(sentences)))
+    return list(map(tuple, keys.tolist()))
+
+
+def near_duplicates(candidates, shingles_of):
+    """Indices of candidates that are near-copies of an earlier kept one.
+
+    `candidates` holds (index, band keys) in document order, exact copies
+    already left out. Any superset of the sentences that share a band key
+    gives the same result. `shingles_of(index)` returns a sentence's
+    word-bigram set.
+    """
+    buckets = [{} for _ in range(BANDS)]
+    duplicates = set()
+    for i, keys in candidates:
+        others = set()
+        for bucket, key in zip(buckets, keys):
+            others.update(bucket.get(key, ()))
+        if any(_similar(shingles_of(i), shingles_of(j)) for j in others):
+            duplicates.add(i)
+        else:
+            for bucket, key in zip(buckets, keys):
+                bucket.setdefault(key, []).append(i)
+    return duplicates
+
+
+def _similar(a, b):
+    # Jaccard can't reach the threshold if the sizes are too far apart
+    if min(len(a), len(b)) < NEAR_DUPLICATE_JACCARD * max(len(a), len(b)):
+        return False
+    return len(a & b) >= NEAR_DUPLICATE_JACCARD * len(a | b)
@@ -0,0 +1,299 @@
+"""Compact, disk-backed representation of very large documents.
+
+DocumentAnalysis keeps every token and sentence as a Python string,
+which costs many times the size of the document. DocumentStore is built
+page by page instead. The UTF-8 text goes to an unlinked temporary file
+that is memory-mapped, so the OS can page it out, and sentences are
+byte offsets into it. Tokens are integer IDs in one array('I') buffer,
+with an offsets array marking where each sentence's tokens start. The
+IDs come from a vocabulary shared by every store in the process, so
+each distinct word is kept once. Word counts live in an array indexed
+by ID.
+
+Sentence splitting, tokenization, word counting and boilerplate removal
+follow analysis.py exactly, so engine.summarize_store() picks the same
+sentences as engine.summarize() on the joined text.
+"""
+import mmap
+import tempfile
+import threading
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+
+import dedup
+import profiling
+from analysis import MIN_SENTENCE_LENGTH, SENTENCE_END_RE, STOP_WORDS, WORD_RE
+
+# Documents at least this long are summarized from a store
+STORE_MIN_CHARS = 8 * 1024 * 1024
+
+
+class Vocabulary:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids = {}
+        self.words = []
+        # Stop words get the lowest IDs, so "is a stop word" is id < stop_count
+        for word in sorted(STOP_WORDS):
+            self.ids[word] = len(self.words)
+            self.words.append(word)
+        self.stop_count = len(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def intern(self, words):
+        ids = self.ids
+        with self._lock:
+            result = []
+            for word in words:
+                word_id = ids.get(word)
+                if word_id is None:
+                    word_id = ids[word] = len(self.words)
+                    self.words.append(word)
+                result.append(word_id)
+            return result
+
+
+VOCABULARY = Vocabulary()
+
+
+class DocumentStore:
+    def __init__(self, directory=None, vocabulary=VOCABULARY):
+        self.vocabulary = vocabulary
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._map = None
+        self._bytes_written = 0
+
+        # Byte span of every sentence in the file
+        self.sentence_starts = array('q')
+        self.sentence_ends = array('q')
+        # Token IDs of all sentences back to back; sentence i owns
+        # tokens[token_offsets[i]:token_offsets[i + 1]]
+        self.tokens = array('I')
+        self.token_offsets = array('q', [0])
+        # Occurrences per word ID, stop words excluded, and the order in
+        # which words first appeared (Counter.most_common breaks ties by it)
+        self.counts = array('q')
+        self.first_seen = array('I')
+        self.word_count = 0
+        # Byte offset just past each appended page
+        self.page_ends = array('q')
+        self.boilerplate_lines = 0
+
+        # Text after the last sentence terminator, waiting for the next page
+        self._carry = []
+        self._carry_byte = 0
+        self._ends_in_word = False
+        self._word_freq = None
+        self._duplicates = None
+        self._top_words = {}
+
+    @classmethod
+    def from_pages(cls, pages, directory=None):
+        # Running headers and footers are blanked one page at a time, as
+        # in DocumentAnalysis.from_pages
+        store = cls(directory)
+        keys = dedup.boilerplate_keys(page.text for page in pages)
+        for page in pages:
+            spans = dedup.page_spans(page.text, keys)
+            store.boilerplate_lines += len(spans)
+            store.append(dedup.blank(page.text, spans))
+        store.finish()
+        return store
+
+    # Building -----------------------------------------------------------
+
+    def append(self, text):
+        if text:
+            with profiling.stage('store append', len(text), 'chars'):
+                self._append(text)
+        self.page_ends.append(self._bytes_written)
+
+    def _append(self, text):
+        encoded = text.encode('utf-8')
+        self._file.write(encoded)
+        self._bytes_written += len(encoded)
+
+        # Words split on whitespace, as the joined text would be; a word
+        # running over the page break is counted once
+        words = len(text.split())
+        if words and self._ends_in_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._ends_in_word = not text[-1].isspace()
+
+        matches = list(SENTENCE_END_RE.finditer(text))
+        if not matches:
+            self._carry.append(text)
+            return
+        # The fragment before the first terminator continues the carry
+        raw_byte = self._carry_byte
+        position = None
+        for match in matches:
+            if position is None:
+                raw = "".join(self._carry) + text[:match.start()]
+            else:
+                raw = text[position:match.start()]
+            raw_byte = self._add_fragment(raw, raw_byte) + len(match.group().encode('utf-8'))
+            position = match.end()
+        self._carry = [text[position:]]
+        self._carry_byte = raw_byte
+
+    def _add_fragment(self, raw, raw_byte):
+        # Returns the byte offset just past `raw`
+        encoded_length = len(raw.encode('utf-8'))
+        stripped = raw.lstrip()
+        start = raw_byte + len(raw[:len(raw) - len(stripped)].encode('utf-8'))
+        fragment = stripped.rstrip()
+        if fragment:
+            ids = self.vocabulary.intern(WORD_RE.findall(fragment.lower()))
+            counts = self.counts
+            stop_count = self.vocabulary.stop_count
+            for word_id in ids:
+                if word_id < stop_count:
+                    continue
+                if word_id >= len(counts):
+                    counts.extend([0] * (word_id + 1 - len(counts)))
+                if not counts[word_id]:
+                    self.first_seen.append(word_id)
+                counts[word_id] += 1
+            if len(fragment) > MIN_SENTENCE_LENGTH:
+                self.sentence_starts.append(start)
+                self.sentence_ends.append(start + len(fragment.encode('utf-8')))
+                self.tokens.extend(ids)
+                self.token_offsets.append(len(self.tokens))
+        return raw_byte + encoded_length
+
+    def finish(self):
+        self._add_fragment("".join(self._carry), self._carry_byte)
+        self._carry = []
+        # Every token ID can be looked up in counts
+        if len(self.counts) < len(self.vocabulary):
+            self.counts.extend([0] * (len(self.vocabulary) - len(self.counts)))
+        self._file.flush()
+        if self._bytes_written:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    # Reading ------------------------------------------------------------
+
+    @property
+    def sentence_count(self):
+        return len(self.sentence_starts)
+
+    def sentence(self, index):
+        return self._map[self.sentence_starts[index]:self.sentence_ends[index]].decode('utf-8')
+
+    @property
+    def word_freq(self):
+        if self._word_freq is None:
+            words = self.vocabulary.words
+            counts = self.counts
+            self._word_freq = Counter({words[i]: counts[i] for i in self.first_seen})
+        return self._word_freq
+
+    @property
+    def duplicates(self):
+        # Same sentences as DocumentAnalysis.duplicates
+        if self._duplicates is None:
+            words = self.vocabulary.words
+            try:
+                import numpy as np
+            except ImportError:
+                table = {}
+                for i in set(self.tokens):
+                    table[i] = dedup.word_hash(words[i])
+                hashes = array('I', map(table.__getitem__, self.tokens))
+            else:
+                # Each distinct word is hashed once
+                ids = np.frombuffer(self.tokens, dtype=np.uint32)
+                unique, inverse = np.unique(ids, return_inverse=True)
+                table = np.fromiter((dedup.word_hash(words[i]) for i in unique.tolist()),
+                                    dtype=np.uint64, count=len(unique))
+                hashes = table[inverse]
+                del ids, unique, inverse
+            self._duplicates = dedup.duplicate_sentences(hashes, self.token_offsets)
+        return self._duplicates
+
+    def top_words(self, count, min_length=0):
+        key = (count, min_length)
+        if key not in self._top_words:
+            if min_length:
+                ranked = [(w, c) for w, c in self.word_freq.most_common()
+                          if len(w) >= min_length][:count]
+            else:
+                ranked = self.word_freq.most_common(count)
+            self._top_words[key] = ranked
+        return self._top_words[key]
+
+    def frequency_scores(self):
+        # Same arithmetic as engine.frequency_scores: integer sums divided
+        # by the sentence length, so ties break identically
+        try:
+            import numpy as np
+        except ImportError:
+            counts, tokens, offsets = self.counts, self.tokens, self.token_offsets
+            scores = []
+            for i in range(self.sentence_count):
+                start, end = offsets[i], offsets[i + 1]
+                total = 0
+                for word_id in tokens[start:end]:
+                    total += counts[word_id]
+                scores.append(total / (end - start) if end > start else 0.0)
+            return scores
+
+        counts = np.frombuffer(self.counts, dtype=np.int64)
+        tokens = np.frombuffer(self.tokens, dtype=np.uint32)
+        offsets = np.frombuffer(self.token_offsets, dtype=np.int64)
+        running = np.concatenate(([0], np.cumsum(counts[tokens], dtype=np.int64)))
+        totals = running[offsets[1:]] - running[offsets[:-1]]
+        lengths = np.diff(offsets)
+        scores = np.divide(totals, lengths, out=np.zeros(len(lengths)), where=lengths > 0)
+        return scores.tolist()
+
+    def page_word_counts(self, pages, words):
+        # Same result as DocumentAnalysis.page_word_counts, with page
+        # boundaries in bytes to match the sentence offsets
+        if len(self.page_ends) == len(pages):
+            ends = self.page_ends.tolist()
+        else:
+            ends = list(accumulate(len(page.text.encode('utf-8')) for page in pages))
+        ids = self.vocabulary.ids
+        columns = {ids[word]: i for i, word in enumerate(words) if word in ids}
+        try:
+            import numpy as np
+        except ImportError:
+            counts = [[0] * len(words) for _ in pages]
+            totals = [0] * len(pages)
+            tokens, offsets = self.tokens, self.token_offsets
+            for i, start in enumerate(self.sentence_starts):
+                page = min(bisect_right(ends, start), len(pages) - 1)
+                totals[page] += offsets[i + 1] - offsets[i]
+                row = counts[page]
+                for word_id in tokens[offsets[i]:offsets[i + 1]]:
+                    column = columns.get(word_id)
+                    if column is not None:
+                        row[column] += 1
+            return counts, totals
+
+        starts = np.frombuffer(self.sentence_starts, dtype=np.int64)
+        page_of = np.minimum(np.searchsorted(np.asarray(ends), starts, side='right'),
+                             len(pages) - 1)
+        lengths = np.diff(np.frombuffer(self.token_offsets, dtype=np.int64))
+        totals = np.bincount(page_of, weights=lengths, minlength=len(pages))
+        tokens = np.frombuffer(self.tokens, dtype=np.uint32)
+        token_pages = np.repeat(page_of, lengths)
+        counts = np.zeros((len(pages), len(words)), dtype=np.int64)
+        for word_id, column in columns.items():
+            counts[:, column] = np.bincount(token_pages[tokens == word_id],
+                                            minlength=len(pages))
+        return counts.tolist(), totals.astype(np.int64).tolist()
@@ -0,0 +1,244 @@
+"""Headless summarization engine.
+
+Nothing in here touches tkinter, matplotlib or pyttsx3, so it can be
+imported by batch workers on machines without a display:
+
+    python -m engine lectures/ -o summaries/ --jobs 8
+"""
+import argparse
+import heapq
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import profiling
+from analysis import DocumentAnalysis
+from docstore import STORE_MIN_CHARS, DocumentStore
+from extraction import extract_pdf_pages
+
+
+class NotEnoughContent(ValueError):
+    pass
+
+
+def frequency_scores(sentence_tokens, word_freq):
+    # Average document frequency of the sentence's words
+    freq = word_freq.get
+    return [sum(freq(w, 0) for w in tokens) / len(tokens) if tokens else 0.0
+            for tokens in sentence_tokens]
+
+
+def tfidf_scores(sentence_tokens, word_freq):
+    from scoring import tfidf_scores
+    return tfidf_scores(sentence_tokens)
+
+
+def textrank_scores(sentence_tokens, word_freq):
+    from scoring import textrank_scores
+    return textrank_scores(sentence_tokens)
+
+
+# "fast" needs nothing beyond the standard library; the others use NumPy/SciPy
+METHODS = {
+    'fast': frequency_scores,
+    'tfidf': tfidf_scores,
+    'textrank': textrank_scores,
+}
+DEFAULT_METHOD = 'fast'
+
+
+def top_sentences(sentence_tokens, scores, count):
+    # Indices of the best `count` sentences, best first. nlargest keeps
+    # earlier sentences first on ties, like a stable sort, so the top n
+    # is always a prefix of the top n + 1.
+    candidates = [i for i, tokens in enumerate(sentence_tokens) if tokens]
+    return heapq.nlargest(count, candidates, key=scores.__getitem__)
+
+
+@dataclass
+class Summary:
+    text: str
+    keywords: list
+    word_freq: Counter
+    sentence_count: int
+    # Left out before scoring: repeated sentences and header/footer lines
+    dropped_sentences: int = 0
+    boilerplate_lines: int = 0
+
+
+def summarize(text, num_sentences=None, num_keywords=10, method=DEFAULT_METHOD,
+              analysis=None):
+    if method not in METHODS:
+        raise ValueError(f"Unknown summarization method: {method!r}")
+    if isinstance(analysis, DocumentStore):
+        return summarize_store(analysis, num_sentences, num_keywords, method)
+
+    # Callers that already analysed this text pass it in to skip tokenizing
+    if analysis is None:
+        analysis = DocumentAnalysis(text)
+    sentences = analysis.sentences
+    if not sentences:
+        raise NotEnoughContent("Not enough content to summarize!")
+    word_freq = analysis.word_freq
+
+    # Only the first copy of a repeated sentence is scored
+    with profiling.stage('dedup', len(sentences), 'sentences'):
+        duplicates = analysis.duplicates
+        kept = [i for i in range(len(sentences)) if i not in duplicates]
+        sentence_tokens = [analysis.sentence_tokens[i] for i in kept]
+
+    with profiling.stage('score', len(kept), 'sentences', detail=method):
+        scores = METHODS[method](sentence_tokens, word_freq)
+
+    # Partial selection of the top sentences, then back into document order
+    with profiling.stage('select', len(kept), 'sentences'):
+        if num_sentences is None:
+            num_sentences = max(3, len(kept) // 5)
+        top = sorted(kept[i] for i in top_sentences(sentence_tokens, scores, num_sentences))
+        summary_text = '. '.join(sentences[i] for i in top) + '.'
+
+    keywords = [word for word, count in word_freq.most_common(num_keywords)]
+    return Summary(summary_text, keywords, word_freq, len(sentences),
+                   len(duplicates), analysis.boilerplate_lines)
+
+
+def summarize_store(store, num_sentences=None, num_keywords=10, method=DEFAULT_METHOD):
+    # summarize() over a DocumentStore: scores come from the token ID
+    # arrays and only the chosen sentences are decoded
+    if method not in METHODS:
+        raise ValueError(f"Unknown summarization method: {method!r}")
+    count = store.sentence_count
+    if not count:
+        raise NotEnoughContent("Not enough content to summarize!")
+
+    with profiling.stage('dedup', count, 'sentences'):
+        duplicates = store.duplicates
+        kept = [i for i in range(count) if i not in duplicates]
+
+    with profiling.stage('score', len(kept), 'sentences', detail='store ' + method):
+        if method == 'fast':
+            scores = store.frequency_scores()
+            if duplicates:
+                scores = [scores[i] for i in kept]
+        else:
+            import scoring
+            counts, lengths = scoring.store_term_matrix(store, kept if duplicates else None)
+            if method == 'tfidf':
+                scores = scoring.matrix_tfidf_scores(counts, lengths)
+            else:
+                scores = scoring.matrix_textrank_scores(counts)
+
+    with profiling.stage('select', len(kept), 'sentences'):
+        offsets = store.token_offsets
+        candidates = (j for j, i in enumerate(kept) if offsets[i + 1] > offsets[i])
+        if num_sentences is None:
+            num_sentences = max(3, len(kept) // 5)
+        top = sorted(kept[j] for j in heapq.nlargest(num_sentences, candidates,
+                                                     key=scores.__getitem__))
+        summary_text = '. '.join(store.sentence(i) for i in top) + '.'
+
+    keywords = [word for word, _ in store.word_freq.most_common(num_keywords)]
+    return Summary(summary_text, keywords, store.word_freq, count,
+                   len(duplicates), store.boilerplate_lines)
+
+
+def summarize_pdf(file_path, num_sentences=None, workers=None, method=DEFAULT_METHOD):
+    pages = extract_pdf_pages(file_path, workers=workers)
+    if sum(len(page.text) for page in pages) >= STORE_MIN_CHARS:
+        store = DocumentStore.from_pages(pages)
+        del pages
+        try:
+            return summarize_store(store, num_sentences, method=method)
+        finally:
+            store.close()
+    return summarize(None, num_sentences=num_sentences, method=method,
+                     analysis=DocumentAnalysis.from_pages(pages))
+
+
+def summarize_pages(pages, num_sentences=None, num_keywords=10, method=DEFAULT_METHOD):
+    # summarize() on the joined pages, with their headers and footers left out
+    if sum(len(page.text) for page in pages) >= STORE_MIN_CHARS:
+        store = DocumentStore.from_pages(pages)
+        try:
+            return summarize_store(store, num_sentences, num_keywords, method)
+        finally:
+            store.close()
+    return summarize(None, num_sentences, num_keywords, method,
+                     analysis=DocumentAnalysis.from_pages(pages))
+
+
+def find_pdfs(directory, recursive=True):
+    if not recursive:
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.lower().endswith('.pdf'))
+    found = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        found.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                     if name.lower().endswith('.pdf'))
+    return found
+
+
+def format_summary(summary):
+    return f"{summary.text}\n\nKeywords: {', '.join(summary.keywords)}\n"
+
+
+def process_file(pdf_path, input_dir, output_dir, num_sentences=None,
+                 method=DEFAULT_METHOD):
+    relative = os.path.relpath(pdf_path, input_dir)
+    out_path = os.path.join(output_dir, os.path.splitext(relative)[0] + '.summary.txt')
+    # Files are already spread across processes, so each one is read serially
+    summary = summarize_pdf(pdf_path, num_sentences=num_sentences, workers=1,
+                            method=method)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(format_summary(summary))
+    return out_path
+
+
+def run_batch(input_dir, output_dir, jobs=None, recursive=True, num_sentences=None,
+              method=DEFAULT_METHOD):
+    pdfs = find_pdfs(input_dir, recursive=recursive)
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(process_file, path, input_dir, output_dir,
+                               num_sentences, method): path
+                   for path in pdfs}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                print(f"ok    {path} -> {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"error {path}: {e}", file=sys.stderr)
+    return len(pdfs), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine",
+        description="Summarize every PDF in a directory without starting the GUI.")
+    parser.add_argument("input_dir", help="directory containing PDF files")
+    parser.add_argument("-o", "--output-dir",
+                        help="where to write <name>.summary.txt files (default: input_dir)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("-n", "--sentences", type=int, default=None,
+                        help="sentences per summary (default: a fifth of the document, at least 3)")
+    parser.add_argument("-m", "--method", choices=sorted(METHODS), default=DEFAULT_METHOD,
+                        help="sentence scoring method (default: %(default)s)")
+    parser.add_argument("--no-recursive", action="store_true",
+                        help="only look at the top level of input_dir")
+    args = parser.parse_args(argv)
+
+    total, failures = run_batch(args.input_dir, args.output_dir or args.input_dir,
+                                jobs=args.jobs, recursive=not args.no_recursive,
+                                num_sentences=args.sentences, method=args.method)
+    print(f"{total - failures}/{total} PDFs summarized")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""PDF text extraction shared by the desktop app and the headless engine."""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# number is 1-based so it can be shown to the user as-is
+Page = namedtuple('Page', ['number', 'text'])
+
+# Below this many pages starting worker processes costs more than it saves
+PARALLEL_MIN_PAGES = 16
+
+
+def count_pages(file_path):
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _iter_range(file_path, start=0, stop=None):
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        if stop is None:
+            stop = len(reader.pages)
+        for i in range(start, stop):
+            yield Page(i + 1, reader.pages[i].extract_text() or "")
+
+
+def _extract_range(file_path, start, stop):
+    return list(_iter_range(file_path, start, stop))
+
+
+def _page_ranges(page_count, workers):
+    # Several chunks per worker keeps the pool busy when some pages are
+    # much slower than others and lets results stream back early.
+    chunk = max(1, page_count // (workers * 4))
+    return [(start, min(start + chunk, page_count))
+            for start in range(0, page_count, chunk)]
+
+
+def iter_pdf_pages(file_path, workers=None, ordered=True):
+    """Yield Page tuples while the document is still being parsed.
+
+    With ordered=False pages come back in completion order; otherwise each
+    page is released as soon as every page before it has finished.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from _iter_range(file_path)
+        return
+
+    page_count = count_pages(file_path)
+    if page_count < PARALLEL_MIN_PAGES:
+        yield from _iter_range(file_path, 0, page_count)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_extract_range, file_path, start, stop)
+                   for start, stop in _page_ranges(page_count, workers)]
+        if not ordered:
+            for future in as_completed(futures):
+                yield from future.result()
+            return
+
+        pending = {}
+        next_number = 1
+        for future in as_completed(futures):
+            for page in future.result():
+                pending[page.number] = page
+            while next_number in pending:
+                yield pending.pop(next_number)
+                next_number += 1
+    finally:
+        # Also reached when the caller stops iterating early
+        pool.shutdown(cancel_futures=True)
+
+
+def extract_pdf_pages(file_path, workers=None):
+    return list(iter_pdf_pages(file_path, workers=workers))
+
+
+def join_pages(pages):
+    return "".join(page.text for page in pages)
+
+
+def extract_pdf_text(file_path, workers=None):
+    return join_pages(iter_pdf_pages(file_path, workers=workers))
@@ -0,0 +1,42 @@
+"""Keyword spans computed in Python and turned into Tk text indices.
+
+One regex pass finds every whole-word keyword occurrence, so the text
+widget only has to apply tags instead of searching itself.
+"""
+import re
+from bisect import bisect_right
+
+
+def keyword_pattern(keywords):
+    # Longest first so one keyword can't shadow a longer one sharing a prefix
+    alternatives = sorted(set(keywords), key=len, reverse=True)
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, alternatives)) + r')\b',
+                      re.IGNORECASE)
+
+
+def keyword_spans(text, keywords):
+    if not keywords:
+        return []
+    return [match.span() for match in keyword_pattern(keywords).finditer(text)]
+
+
+def line_starts(text):
+    starts = [0]
+    find = text.find
+    newline = find('\n')
+    while newline != -1:
+        starts.append(newline + 1)
+        newline = find('\n', newline + 1)
+    return starts
+
+
+def tk_indices(text, spans):
+    # "line.column" indices resolve in the widget without walking the
+    # text character by character the way "1.0+Nc" does.
+    starts = line_starts(text)
+    indices = []
+    for span in spans:
+        for offset in span:
+            line = bisect_right(starts, offset) - 1
+            indices.append(f"{line + 1}.{offset - starts[line]}")
+    return indices
@@ -0,0 +1,132 @@
+"""Memory-bounded image preview and editing.
+
+ImagePipeline never keeps the full-resolution image around for the
+preview. JPEGs are decoded straight at a reduced scale with draft();
+other formats are decoded once and reduced into a small pyramid of
+power-of-two levels. Rotate and resize are only recorded. The preview
+applies them to a cached level that is just big enough, and export()
+applies them to the full image in a single pass: one resample
+no matter how many times resize was pressed, and 90-degree turns done
+as lossless transposes.
+"""
+from PIL import Image
+
+PREVIEW_SIZE = (280, 380)
+
+
+class ImagePipeline:
+    def __init__(self, path):
+        self.path = path
+        with Image.open(path) as image:
+            self.size = image.size
+            self.format = image.format
+            self.mode = image.mode
+        self.rotation = 0           # quarter turns counter-clockwise
+        self.scales = []            # resize factors, in the order applied
+        self._levels = {}           # power-of-two reduction factor -> image
+        self._preview_key = None
+        self._preview = None
+
+    # Transforms -------------------------------------------------------
+
+    def rotate(self, quarter_turns=1):
+        self.rotation = (self.rotation + quarter_turns) % 4
+
+    def scale(self, factor):
+        self.scales.append(factor)
+
+    def reset(self):
+        self.rotation = 0
+        self.scales = []
+
+    def transformed_size(self):
+        width, height = self.size
+        if self.rotation % 2:
+            width, height = height, width
+        # Same integer truncation as resizing step by step
+        for factor in self.scales:
+            width, height = max(1, int(width * factor)), max(1, int(height * factor))
+        return width, height
+
+    # Preview ----------------------------------------------------------
+
+    def preview(self, box=PREVIEW_SIZE):
+        width, height = self.transformed_size()
+        # Fit inside the box, never enlarging (like Image.thumbnail)
+        ratio = min(1.0, box[0] / width, box[1] / height)
+        display = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+
+        key = (self.rotation, display)
+        if key != self._preview_key:
+            needed = display if self.rotation % 2 == 0 else display[::-1]
+            level = self._level(self._factor_for(needed))
+            image = _transpose(level, self.rotation)
+            if image.size != display:
+                image = image.resize(display, Image.Resampling.LANCZOS)
+            self._preview_key, self._preview = key, image
+        return self._preview
+
+    def _factor_for(self, needed):
+        # Largest power-of-two reduction that still covers `needed` pixels
+        factor = 1
+        while (self.size[0] // (factor * 2) >= needed[0]
+               and self.size[1] // (factor * 2) >= needed[1]):
+            factor *= 2
+        return factor
+
+    def _level(self, factor):
+        if factor in self._levels:
+            return self._levels[factor]
+        target = (max(1, self.size[0] // factor), max(1, self.size[1] // factor))
+
+        # Start from an already decoded finer level when there is one
+        finer = [f for f in self._levels if f < factor and factor % f == 0]
+        if finer:
+            source = self._levels[max(finer)]
+        else:
+            image = Image.open(self.path)
+            if self.format == 'JPEG':
+                # Lets libjpeg decode at 1/2, 1/4 or 1/8 scale directly
+                image.draft(image.mode, target)
+            image.load()
+            source = image
+
+        if source.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            # reduce() and LANCZOS don't work on palette or bilevel images
+            has_alpha = 'A' in source.getbands() or 'transparency' in source.info
+            source = source.convert('RGBA' if has_alpha else 'RGB')
+        reduction = max(1, min(source.size[0] // target[0], source.size[1] // target[1]))
+        level = source.reduce(reduction) if reduction > 1 else source
+        self._levels[factor] = level
+        return level
+
+    # Export -----------------------------------------------------------
+
+    def render_full(self):
+        # Full resolution with every recorded transform, resampled once
+        size = self.transformed_size()
+        with Image.open(self.path) as image:
+            image.load()
+            result = _transpose(image, self.rotation)
+            if size != result.size:
+                result = result.resize(size, Image.Resampling.LANCZOS)
+            elif result is image:
+                result = image.copy()  # closing the file would free it otherwise
+        return result
+
+    def export(self, path):
+        image = self.render_full()
+        if image.mode in ('RGBA', 'LA', 'P') and path.lower().endswith(('.jpg', '.jpeg')):
+            image = image.convert('RGB')
+        image.save(path)
+        return path
+
+
+def _transpose(image, quarter_turns):
+    if quarter_turns == 1:
+        return image.transpose(Image.Transpose.ROTATE_90)
+    if quarter_turns == 2:
+        return image.transpose(Image.Transpose.ROTATE_180)
+    if quarter_turns == 3:
+        return image.transpose(Image.Transpose.ROTATE_270)
+    return image
@@ -0,0 +1,398 @@
+"""Summaries that are kept up to date as pages arrive or change.
+
+IncrementalSummarizer tokenizes each page once when it is added. It
+keeps running word frequencies and, for the default "fast" method, the
+per-sentence frequency sums used for scoring. A provisional summary can
+be taken at any time. Replacing a page only re-tokenizes that page and
+re-scores the sentences that share a word with it. Band keys for
+duplicate detection are kept per sentence, and only sentences that share
+a band bucket are compared at summary time. Once every page is in, the
+result matches engine.summarize() on DocumentAnalysis.from_pages.
+Running headers and footers are tracked as pages arrive. When a line
+starts or stops repeating on enough pages, only the pages that have it
+are blanked again.
+"""
+import bisect
+import heapq
+import threading
+from collections import Counter
+from itertools import chain
+
+import dedup
+import engine
+import profiling
+from analysis import MIN_SENTENCE_LENGTH, SENTENCE_END_RE, STOP_WORDS, WORD_RE
+
+
+class _Fragment:
+    __slots__ = ('text', 'tokens', 'counts', 'is_sentence', 'numerator',
+                 'key', 'bands', 'shared', 'shingles')
+
+    def __init__(self, raw):
+        self.text = raw.strip()
+        self.tokens = WORD_RE.findall(self.text.lower())
+        self.counts = Counter(w for w in self.tokens if w not in STOP_WORDS)
+        self.is_sentence = len(self.text) > MIN_SENTENCE_LENGTH
+        self.numerator = 0
+        # Word hashes and LSH band keys, set at the first summary that
+        # sees this fragment, and how many of its band buckets it shares;
+        # shingles only if it is ever compared
+        self.key = None
+        self.bands = None
+        self.shared = 0
+        self.shingles = None
+
+
+class _PageState:
+    def __init__(self, text):
+        self.text = text
+        matches = list(SENTENCE_END_RE.finditer(text))
+        self.has_terminator = bool(matches)
+        if matches:
+            # head and tail are joined with the neighbouring pages' text,
+            # the fragments in between are complete on their own
+            self.head = text[:matches[0].start()]
+            self.tail = text[matches[-1].end():]
+            self.fragments = [_Fragment(text[a.end():b.start()])
+                              for a, b in zip(matches, matches[1:])]
+        else:
+            self.head = self.tail = ""
+            self.fragments = []
+        # Distinct non-stop words of the fragments in first-seen order
+        self.words = list(dict.fromkeys(chain.from_iterable(
+            f.counts for f in self.fragments)))
+        # Fragment that ends at this page's first terminator (or, for the
+        # last page, at the end of the document)
+        self.boundary = None
+
+
+class IncrementalSummarizer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {}
+        # Page text as given, and how many boilerplate lines each had blanked
+        self._raw = {}
+        self._blanked = {}
+        # Normalized edge lines of each page, how many pages have each one
+        # and which of them repeat often enough to be boilerplate
+        self._edges = {}
+        self._pages_with = Counter()
+        self._boilerplate = set()
+        self.word_freq = Counter()
+        # band key -> the sentence with it, or a set once several share
+        # it, for sentences that have been through a summary. Those sharing
+        # a bucket are the only ones that can be (near-)duplicates.
+        self._buckets = [{} for _ in range(dedup.BANDS)]
+        self._candidates = set()
+        # Pages set or removed since boundaries were last refreshed
+        self._dirty = set()
+        # word -> {fragment: occurrences}, for sentences only
+        self._postings = {}
+        # Frequency changes not yet folded into the sentence numerators
+        self._pending = Counter()
+        self._token_total = 0
+        self._trailing = None
+
+    @property
+    def text(self):
+        return "".join(self.pages[number].text for number in sorted(self.pages))
+
+    def set_page(self, number, text):
+        with self._lock:
+            self._raw[number] = text
+            changed = self._set_edges(number, dedup.edge_keys(text))
+            self._set_page(number, text)
+            self._reblank(changed, number)
+
+    def _set_page(self, number, raw):
+        spans = dedup.page_spans(raw, self._boilerplate)
+        self._blanked[number] = len(spans)
+        text = dedup.blank(raw, spans)
+        old = self.pages.get(number)
+        if old is not None:
+            if old.text == text:
+                return
+            for fragment in old.fragments:
+                self._remove(fragment)
+        self._dirty.add(number)
+        page = _PageState(text)
+        if old is not None:
+            # Compared and replaced on the next boundary refresh
+            page.boundary = old.boundary
+        self.pages[number] = page
+        for fragment in page.fragments:
+            self._add(fragment)
+
+    def remove_page(self, number):
+        with self._lock:
+            self._raw.pop(number, None)
+            self._blanked.pop(number, None)
+            changed = self._set_edges(number, set())
+            self._reblank(changed, number)
+            page = self.pages.pop(number, None)
+            if page is not None:
+                self._dirty.add(number)
+                for fragment in page.fragments:
+                    self._remove(fragment)
+                if page.boundary is not None:
+                    self._remove(page.boundary)
+
+    def _add(self, fragment):
+        self._count(fragment.counts, 1)
+        if not fragment.is_sentence:
+            return
+        # Score against the frequencies the other numerators reflect;
+        # pending changes reach this fragment along with everything else.
+        applied = self.word_freq
+        pending = self._pending
+        occurrences = Counter(fragment.tokens)
+        fragment.numerator = sum((applied[w] - pending[w]) * c
+                                 for w, c in occurrences.items())
+        for word, count in occurrences.items():
+            self._postings.setdefault(word, {})[fragment] = count
+        self._token_total += len(fragment.tokens)
+
+    def _remove(self, fragment):
+        self._count(fragment.counts, -1)
+        if not fragment.is_sentence:
+            return
+        if fragment.bands is not None:
+            self._unregister(fragment)
+        for word in set(fragment.tokens):
+            postings = self._postings.get(word)
+            if postings is not None:
+                postings.pop(fragment, None)
+                if not postings:
+                    del self._postings[word]
+        self._token_total -= len(fragment.tokens)
+
+    def _count(self, counts, sign):
+        for word, count in counts.items():
+            self.word_freq[word] += sign * count
+            self._pending[word] += sign * count
+            if self.word_freq[word] <= 0:
+                del self.word_freq[word]
+
+    def _register(self, fragment):
+        for buckets, key in zip(self._buckets, fragment.bands):
+            members = buckets.get(key)
+            if members is None:
+                buckets[key] = fragment
+            elif members.__class__ is _Fragment:
+                buckets[key] = {members, fragment}
+                self._share(members, 1)
+                self._share(fragment, 1)
+            else:
+                members.add(fragment)
+                self._share(fragment, 1)
+
+    def _unregister(self, fragment):
+        for buckets, key in zip(self._buckets, fragment.bands):
+            members = buckets[key]
+            if members is fragment:
+                del buckets[key]
+                continue
+            members.discard(fragment)
+            self._share(fragment, -1)
+            if len(members) == 1:
+                other, = members
+                buckets[key] = other
+                self._share(other, -1)
+
+    def _share(self, fragment, delta):
+        fragment.shared += delta
+        if not fragment.shared:
+            self._candidates.discard(fragment)
+        elif delta > 0 and fragment.shared == 1:
+            self._candidates.add(fragment)
+
+    def _set_edges(self, number, keys):
+        # Returns the boilerplate keys that appeared or went away
+        old = self._edges.pop(number, set())
+        if keys:
+            self._edges[number] = keys
+        changed = set()
+        pages_with = self._pages_with
+        for key in old - keys:
+            pages_with[key] -= 1
+            if pages_with[key] == dedup.MIN_REPEAT_PAGES - 1:
+                self._boilerplate.discard(key)
+                changed.add(key)
+            if not pages_with[key]:
+                del pages_with[key]
+        for key in keys - old:
+            pages_with[key] += 1
+            if pages_with[key] == dedup.MIN_REPEAT_PAGES:
+                self._boilerplate.add(key)
+                changed.add(key)
+        return changed
+
+    def _reblank(self, changed, skip):
+        # Pages other than `skip` with an edge line that became or stopped
+        # being boilerplate
+        if not changed:
+            return
+        for number, keys in self._edges.items():
+            if number != skip and not keys.isdisjoint(changed):
+                self._set_page(number, self._raw[number])
+
+    def _refresh_boundaries(self):
+        # Text between the last terminator of one page and the first of a
+        # later one forms a fragment of its own. A changed page only moves
+        # the boundaries from the terminator before it to the one after it,
+        # and only the fragments whose text changed are re-scored.
+        if not self._dirty:
+            return
+        numbers = sorted(self.pages)
+        if not numbers:
+            self._trailing = self._replace(self._trailing, None)
+        done = 0
+        for changed in sorted(self._dirty):
+            index = bisect.bisect_left(numbers, changed)
+            if index < done:
+                continue
+            while index > 0 and not self.pages[numbers[index - 1]].has_terminator:
+                index -= 1
+            carried = self.pages[numbers[index - 1]].tail if index else ""
+            for index in range(index, len(numbers)):
+                page = self.pages[numbers[index]]
+                if not page.has_terminator:
+                    carried += page.text
+                    self._set_boundary(page, None)
+                    continue
+                self._set_boundary(page, carried + page.head)
+                carried = page.tail
+                if numbers[index] > changed:
+                    break
+            else:
+                self._trailing = self._replace(self._trailing, carried if numbers else None)
+                index = len(numbers)
+            done = index
+        self._dirty.clear()
+
+    def _set_boundary(self, page, raw):
+        page.boundary = self._replace(page.boundary, raw)
+
+    def _replace(self, fragment, raw):
+        if fragment is not None and raw is not None and fragment.text == raw.strip():
+            return fragment
+        if fragment is not None:
+            self._remove(fragment)
+        if raw is None:
+            return None
+        fragment = _Fragment(raw)
+        self._add(fragment)
+        return fragment
+
+    def _flush(self):
+        pending = {w: d for w, d in self._pending.items() if d}
+        self._pending.clear()
+        if not pending:
+            return
+        # Touching every posting of the changed words can cost more than
+        # re-scoring everything; pick whichever is cheaper.
+        work = sum(len(self._postings.get(w, ())) for w in pending)
+        if work > self._token_total:
+            freq = self.word_freq
+            for fragment in self._sentences():
+                fragment.numerator = sum(freq[w] for w in fragment.tokens)
+            return
+        for word, delta in pending.items():
+            for fragment, count in self._postings.get(word, {}).items():
+                fragment.numerator += delta * count
+
+    def _fragments(self):
+        # Every fragment in document order
+        for number in sorted(self.pages):
+            page = self.pages[number]
+            if page.boundary is not None:
+                yield page.boundary
+            yield from page.fragments
+        if self._trailing is not None:
+            yield self._trailing
+
+    def _sentences(self):
+        return [f for f in self._fragments() if f.is_sentence]
+
+    def _ordered_word_freq(self):
+        # self.word_freq is updated as fragments come and go, so its order
+        # is arbitrary. most_common() breaks ties by insertion order, which
+        # in DocumentAnalysis is the order words first appear in the text.
+        parts = []
+        for number in sorted(self.pages):
+            page = self.pages[number]
+            if page.boundary is not None:
+                parts.append(page.boundary.counts)
+            parts.append(page.words)
+        if self._trailing is not None:
+            parts.append(self._trailing.counts)
+        freq = self.word_freq
+        return Counter({w: freq[w] for w in dict.fromkeys(chain.from_iterable(parts))})
+
+    def _duplicates(self, sentences):
+        # Same result as dedup.duplicate_sentences over every sentence, but
+        # band keys are kept per fragment, so only new fragments are hashed
+        # and only those sharing a bucket are compared. Exact copies share
+        # every bucket, so they are among the candidates too.
+        new = [f for f in sentences if f.bands is None and f.tokens]
+        if new:
+            for fragment in new:
+                fragment.key = tuple(dedup.word_hashes(fragment.tokens))
+            for fragment, bands in zip(new, dedup.band_keys([f.key for f in new])):
+                fragment.bands = bands
+                self._register(fragment)
+        position = {f: i for i, f in enumerate(sentences)}
+        duplicates = set()
+        seen = set()
+        candidates = []
+        for i in sorted(position[f] for f in self._candidates):
+            fragment = sentences[i]
+            if fragment.key in seen:
+                duplicates.add(i)
+            else:
+                seen.add(fragment.key)
+                candidates.append((i, fragment.bands))
+
+        def shingles_of(i):
+            fragment = sentences[i]
+            if fragment.shingles is None:
+                fragment.shingles = dedup.shingles(fragment.key)
+            return fragment.shingles
+
+        return duplicates | dedup.near_duplicates(candidates, shingles_of)
+
+    def summary(self, num_sentences=None, num_keywords=10, method=engine.DEFAULT_METHOD):
+        if method not in engine.METHODS:
+            raise ValueError(f"Unknown summarization method: {method!r}")
+        with self._lock:
+            self._refresh_boundaries()
+            sentences = self._sentences()
+            if not sentences:
+                raise engine.NotEnoughContent("Not enough content to summarize!")
+
+            with profiling.stage('dedup', len(sentences), 'sentences'):
+                duplicates = self._duplicates(sentences)
+                kept = [f for i, f in enumerate(sentences) if i not in duplicates]
+
+            with profiling.stage('score', len(kept), 'sentences',
+                                 detail='incremental ' + method):
+                if method == 'fast':
+                    self._flush()
+                    scores = [f.numerator / len(f.tokens) if f.tokens else 0.0
+                              for f in kept]
+                else:
+                    scores = engine.METHODS[method]([f.tokens for f in kept],
+                                                    self.word_freq)
+
+            with profiling.stage('select', len(kept), 'sentences'):
+                candidates = [i for i, f in enumerate(kept) if f.tokens]
+                if num_sentences is None:
+                    num_sentences = max(3, len(kept) // 5)
+                top = sorted(heapq.nlargest(num_sentences, candidates,
+                                            key=scores.__getitem__))
+                summary_text = '. '.join(kept[i].text for i in top) + '.'
+            word_freq = self._ordered_word_freq()
+            keywords = [word for word, count in word_freq.most_common(num_keywords)]
+            return engine.Summary(summary_text, keywords, word_freq,
+                                  len(sentences), len(duplicates),
+                                  sum(self._blanked.values()))
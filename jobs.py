@@ -0,0 +1,140 @@
+"""Background jobs for the desktop app.
+
+Work runs on a small bounded thread pool. Each job has a CancelToken and
+belongs to a group; submitting a new job to a group cancels the one
+already running there, so re-uploading or re-summarizing never races an
+older run. Callbacks are handed to `dispatch` (root.after in the app) so
+they always run on the Tk main thread, and are dropped once the job has
+been cancelled.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+
+class Job:
+    def __init__(self, scheduler, job_id, group, name):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.group = group
+        self.name = name
+        self.token = CancelToken()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        self.token.raise_if_cancelled()
+
+    def post(self, callback, *args):
+        # Run callback on the main thread unless the job is cancelled by then
+        def run():
+            if not self.token.cancelled:
+                callback(*args)
+        self.scheduler.dispatch(run)
+
+    def progress(self, fraction=None, message=""):
+        # fraction in [0, 1], or None when the total amount of work is unknown
+        self.check()
+        if self.scheduler.on_progress is not None:
+            self.post(self.scheduler.on_progress, self, fraction, message)
+
+
+class JobScheduler:
+    def __init__(self, dispatch, max_workers=3, on_progress=None):
+        self.dispatch = dispatch
+        self.on_progress = on_progress
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active = {}
+        # A profiling.ProfileCapture while the user is profiling a run
+        self.profile = None
+
+    def submit(self, group, fn, *args, name="", on_done=None, on_error=None):
+        # fn(job, *args) runs on a worker thread; on_done(result) and
+        # on_error(exception) run on the main thread.
+        with self._lock:
+            previous = self._active.get(group)
+            job = Job(self, next(self._ids), group, name or group)
+            self._active[group] = job
+        if previous is not None:
+            previous.cancel()
+        job.future = self._executor.submit(self._run, job, fn, args, on_done, on_error)
+        return job
+
+    def _run(self, job, fn, args, on_done, on_error):
+        start = time.perf_counter()
+        try:
+            job.check()
+            if self.profile is not None:
+                result = self.profile.runcall(fn, job, *args)
+            else:
+                result = fn(job, *args)
+            job.check()
+        except Cancelled:
+            result = None
+        except Exception as e:
+            if on_error is not None:
+                job.post(on_error, e)
+        else:
+            if on_done is not None:
+                job.post(on_done, result)
+        finally:
+            profiling.record('job ' + job.group, time.perf_counter() - start,
+                             detail="cancelled" if job.cancelled else "")
+            self._finish(job)
+
+    def _finish(self, job):
+        with self._lock:
+            if self._active.get(job.group) is job:
+                del self._active[job.group]
+
+    def cancel(self, *groups):
+        with self._lock:
+            jobs = [job for group, job in self._active.items()
+                    if not groups or group in groups]
+        for job in jobs:
+            job.cancel()
+            self._finish(job)
+
+    def running(self, group=None):
+        with self._lock:
+            if group is None:
+                return bool(self._active)
+            return group in self._active
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,188 @@
+"""Offline OCR for images and scanned PDF pages.
+
+Text comes from a local Tesseract install through pytesseract; nothing
+leaves the machine. PDF pages only go through OCR when PyPDF2 found
+(almost) no text on them. Scanned pages are split between worker
+processes by page number; each worker opens the PDF and decodes its own
+pages' images, as extraction does for text. Results are cached by a hash
+of the image bytes, so the same scan is never recognised twice even
+inside a different file.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from extraction import Page
+
+# Pages with fewer non-blank characters than this are treated as scans
+MIN_TEXT_CHARS = 32
+DEFAULT_LANG = 'eng'
+
+_available = None
+
+
+def available():
+    global _available
+    if _available is None:
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            _available = True
+        except Exception:
+            _available = False
+    return _available
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def needs_ocr(page):
+    return len("".join(page.text.split())) < MIN_TEXT_CHARS
+
+
+def _limit_threads():
+    # Tesseract would otherwise start a thread per core in every worker
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def recognize(data, lang=DEFAULT_LANG):
+    import pytesseract
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, ValueError):
+        return ""  # an embedded format Pillow can't decode, e.g. JBIG2
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+def recognize_many(images, workers=None, lang=DEFAULT_LANG, cache=None, progress=None):
+    """Return OCR text for each bytes object in `images`, in order.
+
+    progress(done, total) is called as images that weren't cached finish.
+    """
+    hashes = [image_hash(data) for data in images]
+    results = {}
+    missing = {}
+    for digest, data in zip(hashes, images):
+        if digest in results or digest in missing:
+            continue
+        text = cache.get_ocr(digest) if cache is not None else None
+        if text is None:
+            missing[digest] = data
+        else:
+            results[digest] = text
+
+    workers = min(workers or os.cpu_count() or 1, len(missing))
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_limit_threads)
+        texts = pool.map(recognize, missing.values(), [lang] * len(missing))
+    else:
+        texts = (recognize(data, lang) for data in missing.values())
+    try:
+        for done, (digest, text) in enumerate(zip(missing, texts), 1):
+            results[digest] = text
+            if cache is not None:
+                cache.put_ocr(digest, text)
+            if progress is not None:
+                progress(done, len(missing))
+    finally:
+        if pool is not None:
+            # Also reached when progress() raises to cancel
+            pool.shutdown(cancel_futures=True)
+    return [results[digest] for digest in hashes]
+
+
+def iter_page_images(file_path, numbers):
+    """(page number, encoded images embedded in it) for the given 1-based pages."""
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for number in numbers:
+            try:
+                images = [image.data for image in reader.pages[number - 1].images]
+            except Exception:
+                images = []  # unsupported filter or broken image stream
+            yield number, images
+
+
+def _page_text(images, lang, cache):
+    texts = []
+    for data in images:
+        digest = image_hash(data)
+        text = cache.get_ocr(digest) if cache is not None else None
+        if text is None:
+            text = recognize(data, lang)
+            if cache is not None:
+                cache.put_ocr(digest, text)
+        texts.append(text.strip())
+    return "\n".join(texts)
+
+
+def _ocr_range(file_path, numbers, lang, cache_dir):
+    # Runs in a worker: it opens the PDF itself and decodes one page's
+    # images at a time, so no image is held for long or sent between processes
+    from cache import DocumentCache
+
+    cache = DocumentCache(cache_dir) if cache_dir is not None else None
+    return {number: _page_text(images, lang, cache)
+            for number, images in iter_page_images(file_path, numbers)}
+
+
+def _chunks(numbers, workers):
+    # Several chunks per worker, as in extraction._page_ranges
+    size = max(1, len(numbers) // (workers * 4))
+    return [numbers[start:start + size] for start in range(0, len(numbers), size)]
+
+
+def ocr_pdf_pages(file_path, pages, workers=None, lang=DEFAULT_LANG, cache=None,
+                  progress=None):
+    """Return `pages` with OCR text added to the ones that look scanned.
+
+    progress(done, total) is called as scanned pages finish.
+    """
+    sparse = [page.number for page in pages if needs_ocr(page)]
+    if not sparse:
+        return list(pages)
+
+    recognized = {}
+    workers = min(workers or os.cpu_count() or 1, len(sparse))
+    if workers > 1:
+        cache_dir = cache.directory if cache is not None else None
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_limit_threads)
+        try:
+            futures = [pool.submit(_ocr_range, file_path, numbers, lang, cache_dir)
+                       for numbers in _chunks(sparse, workers)]
+            for future in as_completed(futures):
+                recognized.update(future.result())
+                if progress is not None:
+                    progress(len(recognized), len(sparse))
+        finally:
+            # Also reached when progress() raises to cancel
+            pool.shutdown(cancel_futures=True)
+    else:
+        for number, images in iter_page_images(file_path, sparse):
+            recognized[number] = _page_text(images, lang, cache)
+            if progress is not None:
+                progress(len(recognized), len(sparse))
+
+    result = []
+    for page in pages:
+        extra = recognized.get(page.number, "").strip()
+        if extra:
+            page = Page(page.number, page.text + "\n" + extra if page.text.strip() else extra)
+        result.append(page)
+    return result
+
+
+def ocr_image_file(file_path, lang=DEFAULT_LANG, cache=None):
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return recognize_many([data], workers=1, lang=lang, cache=cache)[0]
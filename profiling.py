@@ -0,0 +1,152 @@
+"""Timings for each pipeline stage, and an opt-in cProfile capture.
+
+Code wraps its stages in `stage("name", size=..., unit=...)`. Each run
+records its duration, how much it processed and, for cache lookups,
+whether it hit. The records are kept in a bounded ring in this process.
+The app's diagnostics window shows them aggregated per stage and can
+export them as JSON or CSV. Recording is cheap enough to stay on all
+the time: one perf_counter pair and a deque append.
+
+Before Python 3.12, cProfile only sees the thread that enabled it, so
+ProfileCapture profiles the main thread directly and every background
+job through runcall() (JobScheduler uses it when set), then merges the
+results. From 3.12 one profiler sees every thread and a second one can't
+be enabled, so runcall() just runs the job under the main profiler.
+Work inside process pools (PDF pages, OCR, batch) is not included.
+"""
+import cProfile
+import csv
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_RECORDS = 20000
+# cProfile runs on sys.monitoring, which covers all threads
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+FIELDS = ['stage', 'started', 'seconds', 'size', 'unit', 'cache_hit', 'thread', 'detail']
+
+
+class Recorder:
+    def __init__(self, max_records=MAX_RECORDS):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, size=None, unit="", cache_hit=None, detail=""):
+        entry = {
+            'stage': name,
+            'started': time.time() - seconds,
+            'seconds': seconds,
+            'size': size,
+            'unit': unit,
+            'cache_hit': cache_hit,
+            'thread': threading.current_thread().name,
+            'detail': detail,
+        }
+        with self._lock:
+            self._records.append(entry)
+
+    @contextmanager
+    def stage(self, name, size=None, unit="", detail=""):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, size, unit, detail=detail)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def summary(self):
+        """Aggregate per stage, in the order stages were first seen."""
+        stages = {}
+        for entry in self.records():
+            row = stages.get(entry['stage'])
+            if row is None:
+                row = stages[entry['stage']] = {
+                    'stage': entry['stage'], 'count': 0, 'total': 0.0, 'max': 0.0,
+                    'size': 0, 'unit': entry['unit'], 'hits': 0, 'misses': 0,
+                }
+            row['count'] += 1
+            row['total'] += entry['seconds']
+            row['max'] = max(row['max'], entry['seconds'])
+            row['size'] += entry['size'] or 0
+            if entry['cache_hit'] is True:
+                row['hits'] += 1
+            elif entry['cache_hit'] is False:
+                row['misses'] += 1
+        for row in stages.values():
+            row['mean'] = row['total'] / row['count']
+        return list(stages.values())
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.summary(), 'records': self.records()}, f, indent=2)
+
+    def export_csv(self, path):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records())
+
+
+class ProfileCapture:
+    def __init__(self):
+        self._main = None
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._main is not None
+
+    def start(self):
+        self._profiles = []
+        self._main = cProfile.Profile()
+        self._main.enable()
+
+    def runcall(self, fn, *args):
+        # For worker threads; a no-op wrapper once the capture has stopped
+        if self._main is None or PROFILES_ALL_THREADS:
+            return fn(*args)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args)
+        finally:
+            with self._lock:
+                self._profiles.append(profile)
+
+    def stop(self, path=None, top=40):
+        """Stop capturing; dump to `path` if given and return a text report."""
+        self._main.disable()
+        with self._lock:
+            profiles = [self._main] + self._profiles
+        self._main = None
+        self._profiles = []
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiles[0], stream=report)
+        for profile in profiles[1:]:
+            # A profile that never ran anything has no stats to merge
+            profile.create_stats()
+            if profile.stats:
+                stats.add(profile)
+        if path:
+            stats.dump_stats(path)
+        stats.sort_stats('cumulative').print_stats(top)
+        return report.getvalue()
+
+
+recorder = Recorder()
+record = recorder.record
+stage = recorder.stage
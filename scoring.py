@@ -0,0 +1,116 @@
+"""Vectorized sentence scorers built on a sparse sentence x term matrix.
+
+Imported lazily by engine so the default "fast" method never needs
+NumPy or SciPy.
+"""
+import numpy as np
+from scipy import sparse
+
+from analysis import STOP_WORDS
+
+
+def term_matrix(sentence_tokens):
+    # Sentence x term count matrix, built once from the token lists.
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for tokens in sentence_tokens:
+        for word in tokens:
+            if word not in STOP_WORDS:
+                indices.append(vocabulary.setdefault(word, len(vocabulary)))
+        indptr.append(len(indices))
+
+    indices = np.asarray(indices, dtype=np.int64)
+    data = np.ones(len(indices), dtype=np.float64)
+    matrix = sparse.csr_matrix((data, indices, np.asarray(indptr, dtype=np.int64)),
+                               shape=(len(sentence_tokens), max(len(vocabulary), 1)))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def store_term_matrix(store, rows=None):
+    # The same matrix as term_matrix() for a docstore.DocumentStore, built
+    # from its token ID buffers. Columns are renumbered by first
+    # appearance so scores come out bit-for-bit the same. `rows` picks
+    # a subset of the sentences, in ascending order.
+    tokens = np.frombuffer(store.tokens, dtype=np.uint32)
+    offsets = np.frombuffer(store.token_offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    if rows is not None:
+        selected = np.zeros(len(lengths), dtype=bool)
+        selected[np.asarray(rows, dtype=np.int64)] = True
+        tokens = tokens[np.repeat(selected, lengths)]
+        lengths = lengths[selected]
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    keep = tokens >= store.vocabulary.stop_count
+    tokens, rows = tokens[keep], rows[keep]
+
+    unique, first = np.unique(tokens, return_index=True)
+    columns = np.empty(int(unique.max()) + 1 if len(unique) else 0, dtype=np.int64)
+    columns[unique[np.argsort(first)]] = np.arange(len(unique))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(lengths)))))
+
+    matrix = sparse.csr_matrix((np.ones(len(tokens)), columns[tokens], indptr),
+                               shape=(len(lengths), max(len(unique), 1)))
+    matrix.sum_duplicates()
+    return matrix, lengths.astype(np.float64)
+
+
+def _idf(counts):
+    n_sentences = counts.shape[0]
+    document_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    return np.log((1 + n_sentences) / (1 + document_freq)) + 1
+
+
+def tfidf_scores(sentence_tokens):
+    lengths = np.array([len(tokens) for tokens in sentence_tokens], dtype=np.float64)
+    return matrix_tfidf_scores(term_matrix(sentence_tokens), lengths)
+
+
+def matrix_tfidf_scores(counts, lengths):
+    # Terms weigh by how often they occur in the document, discounted by
+    # how many sentences they appear in; a sentence scores the average
+    # weight of its words.
+    term_weights = np.asarray(counts.sum(axis=0)).ravel() * _idf(counts)
+    totals = counts @ term_weights
+    scores = np.divide(totals, lengths, out=np.zeros_like(totals), where=lengths > 0)
+    return scores.tolist()
+
+
+def textrank_scores(sentence_tokens, damping=0.85, max_iter=100, tol=1e-6):
+    return matrix_textrank_scores(term_matrix(sentence_tokens), damping, max_iter, tol)
+
+
+def matrix_textrank_scores(counts, damping=0.85, max_iter=100, tol=1e-6):
+    n = counts.shape[0]
+    if n == 0:
+        return []
+
+    # L2-normalised TF-IDF rows, so X @ X.T is the cosine similarity.
+    weighted = counts.multiply(_idf(counts)).tocsr()
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    x = sparse.diags(inv_norms) @ weighted
+    xt = x.T.tocsr()
+
+    # The similarity graph is never materialised: S @ v is computed as
+    # X @ (X.T @ v), minus the self-similarity on the diagonal.
+    self_similarity = (norms > 0).astype(np.float64)
+
+    def similarity_dot(v):
+        return x @ (xt @ v) - self_similarity * v
+
+    degree = similarity_dot(np.ones(n))
+    dangling = degree <= 1e-12
+    inv_degree = np.divide(1.0, degree, out=np.zeros_like(degree), where=~dangling)
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = similarity_dot(rank * inv_degree)
+        leaked = rank[dangling].sum() / n
+        new_rank = (1 - damping) / n + damping * (spread + leaked)
+        converged = np.abs(new_rank - rank).sum() < tol
+        rank = new_rank
+        if converged:
+            break
+    return rank.tolist()
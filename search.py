@@ -0,0 +1,289 @@
+"""Full-text search over every document the app has processed.
+
+Pages go into an SQLite FTS5 table next to the result cache, one row per
+page, with the file's path, content hash, size, mtime and keywords kept
+alongside. The app indexes each PDF it opens and batch workers index the
+PDFs they summarize. Folders can also be indexed ahead of time:
+
+    python -m search index lectures/
+    python -m search query "gradient descent" -n 20
+
+A file is hashed again only when its size or mtime has changed since it
+was indexed, and its pages are replaced only when the hash changed.
+Pages come through the DocumentCache, so a copied or moved file is not
+parsed again. Queries are ranked with FTS5's bm25.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from cache import default_cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    doc_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    page_count INTEGER NOT NULL,
+    keywords TEXT NOT NULL DEFAULT '[]',
+    summary TEXT NOT NULL DEFAULT '',
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_doc_hash ON documents (doc_hash);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5 (
+    text, doc_id UNINDEXED, page UNINDEXED, tokenize = 'porter unicode61'
+);
+"""
+
+Hit = namedtuple('Hit', ['path', 'page', 'snippet', 'keywords'])
+
+# A page's rowid is doc_id << PAGE_BITS | page number, so a document's
+# pages can be deleted by rowid range instead of scanning the table
+PAGE_BITS = 20
+
+DEFAULT_LIMIT = 50
+# Keywords stored for documents indexed without a summary
+NUM_KEYWORDS = 10
+
+TERM_RE = re.compile(r'"[^"]*"|\S+')
+
+
+def available():
+    try:
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5 (text)")
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def default_index_path(cache_dir=None):
+    return os.path.join(cache_dir or default_cache_dir(), 'index.sqlite3')
+
+
+def match_query(text):
+    # User input as an FTS5 query: every word must appear, "quoted text"
+    # is a phrase and a trailing * matches prefixes. Quoting each term
+    # keeps FTS5 operators and punctuation from being parsed as syntax.
+    terms = []
+    for term in TERM_RE.findall(text):
+        prefix = term.endswith('*') and not term.startswith('"')
+        term = term.strip('"*')
+        if term:
+            terms.append('"%s"%s' % (term.replace('"', ''), '*' if prefix else ''))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as connection:
+            # Lets the app search while a batch worker is writing
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call, so any thread or process can use the index
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:  # commits, or rolls back on error
+                yield connection
+        finally:
+            connection.close()
+
+    def is_current(self, path):
+        """True if `path` was indexed and hasn't changed on disk since."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        with self._connect() as connection:
+            row = connection.execute("SELECT size, mtime FROM documents WHERE path = ?",
+                                     (os.path.abspath(path),)).fetchone()
+        return row is not None and row == (stat.st_size, stat.st_mtime)
+
+    def touch(self, path, doc_hash):
+        """Refresh the size and mtime of `path` if it is indexed with this content."""
+        stat = os.stat(path)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE documents SET size = ?, mtime = ? WHERE path = ? AND doc_hash = ?",
+                (stat.st_size, stat.st_mtime, os.path.abspath(path), doc_hash))
+        return cursor.rowcount > 0
+
+    def add_document(self, path, doc_hash, pages, keywords=None, summary=None):
+        """Index a document's pages; returns False if they were already indexed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._connect() as connection:
+            row = connection.execute("SELECT id, doc_hash FROM documents WHERE path = ?",
+                                     (path,)).fetchone()
+            if row is not None and row[1] == doc_hash:
+                # Same content: only the file's metadata may have changed
+                connection.execute("UPDATE documents SET size = ?, mtime = ? WHERE id = ?",
+                                   (stat.st_size, stat.st_mtime, row[0]))
+                if keywords is not None or summary is not None:
+                    self._set_summary(connection, "id = ?", row[0], keywords, summary)
+                return False
+            if row is not None:
+                self._delete(connection, row[0])
+            doc_id = connection.execute(
+                "INSERT INTO documents (path, doc_hash, size, mtime, page_count, keywords, "
+                "summary, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, doc_hash, stat.st_size, stat.st_mtime, len(pages),
+                 json.dumps(list(keywords or [])), summary or "", time.time())).lastrowid
+            connection.executemany(
+                "INSERT INTO pages (rowid, text, doc_id, page) VALUES (?, ?, ?, ?)",
+                ((doc_id << PAGE_BITS | page.number, page.text, doc_id, page.number)
+                 for page in pages if page.text.strip()))
+        return True
+
+    def set_summary(self, doc_hash, keywords=None, summary=None):
+        # Every indexed copy of the document gets the newest summary
+        with self._connect() as connection:
+            self._set_summary(connection, "doc_hash = ?", doc_hash, keywords, summary)
+
+    def _set_summary(self, connection, where, value, keywords, summary):
+        if keywords is not None:
+            connection.execute(f"UPDATE documents SET keywords = ? WHERE {where}",
+                               (json.dumps(list(keywords)), value))
+        if summary is not None:
+            connection.execute(f"UPDATE documents SET summary = ? WHERE {where}",
+                               (summary, value))
+
+    def _delete(self, connection, doc_id):
+        connection.execute("DELETE FROM pages WHERE rowid BETWEEN ? AND ?",
+                           (doc_id << PAGE_BITS, (doc_id + 1 << PAGE_BITS) - 1))
+        connection.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def remove(self, path):
+        with self._connect() as connection:
+            row = connection.execute("SELECT id FROM documents WHERE path = ?",
+                                     (os.path.abspath(path),)).fetchone()
+            if row is not None:
+                self._delete(connection, row[0])
+
+    def prune(self):
+        """Drop documents whose files no longer exist; returns how many."""
+        with self._connect() as connection:
+            paths = [path for (path,) in connection.execute("SELECT path FROM documents")]
+        missing = [path for path in paths if not os.path.exists(path)]
+        for path in missing:
+            self.remove(path)
+        return len(missing)
+
+    def counts(self):
+        with self._connect() as connection:
+            documents, pages = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(page_count), 0) FROM documents").fetchone()
+        return documents, pages
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Best matching pages first, as Hit tuples."""
+        match = match_query(query)
+        if not match:
+            return []
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT documents.path, pages.page, "
+                "snippet(pages, 0, '[', ']', '…', 12), documents.keywords "
+                "FROM pages JOIN documents ON documents.id = pages.doc_id "
+                "WHERE pages MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit)).fetchall()
+        return [Hit(path, page, " ".join(snippet.split()), json.loads(keywords))
+                for path, page, snippet, keywords in rows]
+
+
+def index_folder(index, directory, recursive=True, cache=None, progress=None):
+    """Index every new or changed PDF under directory.
+
+    Returns (indexed, unchanged, failed) counts. `progress(done, total,
+    path)` is called after each file.
+    """
+    # Imported here: batch imports this module to index what it summarizes
+    from analysis import DocumentAnalysis
+    from batch import load_pages
+    from cache import DocumentCache, file_hash
+    from engine import find_pdfs
+
+    cache = cache or DocumentCache()
+    paths = find_pdfs(directory, recursive=recursive)
+    indexed = unchanged = failed = 0
+    for done, path in enumerate(paths, 1):
+        try:
+            if index.is_current(path):
+                unchanged += 1
+            else:
+                doc_hash = file_hash(path)
+                # Touched or copied back unchanged: nothing to re-read
+                if index.touch(path, doc_hash):
+                    unchanged += 1
+                else:
+                    pages = load_pages(path, cache, doc_hash, workers=None)
+                    # Without running headers and footers, as in the app and engine
+                    word_freq = cache.get_word_freq(doc_hash) \
+                        or DocumentAnalysis.from_pages(pages).word_freq
+                    index.add_document(path, doc_hash, pages,
+                                       [word for word, _ in word_freq.most_common(NUM_KEYWORDS)])
+                    indexed += 1
+        except Exception as e:
+            failed += 1
+            print(f"error {path}: {e}", file=sys.stderr)
+        if progress is not None:
+            progress(done, len(paths), path)
+    return indexed, unchanged, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m search",
+        description="Index processed PDFs and search their text.")
+    parser.add_argument("--index", default=None,
+                        help="index file (default: index.sqlite3 in the app's cache directory)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index_parser = commands.add_parser("index", help="index new or changed PDFs in a directory")
+    index_parser.add_argument("directory")
+    index_parser.add_argument("--no-recursive", action="store_true",
+                              help="only look at the top level of directory")
+    query_parser = commands.add_parser("query", help="search the indexed pages")
+    query_parser.add_argument("terms", nargs='+')
+    query_parser.add_argument("-n", "--limit", type=int, default=20)
+    commands.add_parser("prune", help="forget documents whose files were deleted")
+    args = parser.parse_args(argv)
+
+    if not available():
+        print("This Python's SQLite was built without FTS5", file=sys.stderr)
+        return 1
+    index = SearchIndex(args.index)
+    if args.command == "index":
+        indexed, unchanged, failed = index_folder(index, args.directory,
+                                                  recursive=not args.no_recursive)
+        print(f"{indexed} indexed, {unchanged} unchanged, {failed} failed")
+        return 1 if failed else 0
+    if args.command == "prune":
+        print(f"{index.prune()} removed")
+        return 0
+
+    start = time.perf_counter()
+    hits = index.search(" ".join(args.terms), limit=args.limit)
+    for hit in hits:
+        print(f"{hit.path} p.{hit.page}: {hit.snippet}")
+    print(f"{len(hits)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
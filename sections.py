@@ -0,0 +1,304 @@
+"""Section-aware, two-level summaries for long documents.
+
+A flat summary of a whole book is either thousands of sentences long or
+misses most chapters. Here the document is split into sections, using
+the PDF outline (bookmarks) when it has one, otherwise headings found in
+the text, otherwise runs of PAGES_PER_SECTION pages. Each section is
+summarized on its own, on a process pool for long documents, and an
+overview is then drawn from the section summaries.
+
+A section's sentences are ranked once, RANKED_DEPTH deep, and the
+ranking is cached under a hash of the section's text. Any budget up to
+that depth is a prefix of the ranking, so changing either budget
+re-reads the cache instead of rescoring the document.
+"""
+import os
+import re
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import dedup
+import engine
+import profiling
+from analysis import DocumentAnalysis
+from cache import text_hash
+from extraction import extract_pdf_pages
+
+# first_page and last_page are 1-based page numbers, as in extraction.Page.
+# boilerplate_lines counts the header and footer lines blanked in text.
+Section = namedtuple('Section', ['title', 'first_page', 'last_page', 'text',
+                                 'boilerplate_lines'], defaults=[0])
+
+DEFAULT_SECTION_SENTENCES = 3
+DEFAULT_OVERVIEW_SENTENCES = 5
+# How many ranked sentences are cached per section
+RANKED_DEPTH = 50
+# Shorter sections are folded into a neighbour
+MIN_SECTION_CHARS = 1500
+# Used when the document has neither an outline nor headings
+PAGES_PER_SECTION = 10
+# Below this much text to rank, starting worker processes costs more than it saves
+PARALLEL_MIN_CHARS = 200_000
+
+LINE_RE = re.compile(r'^[ \t]*(\S[^\n]*?)[ \t]*$', re.MULTILINE)
+KEYWORD_HEADING_RE = re.compile(
+    r'(?:chapter|part|unit|lecture|appendix)\s+(?:\d+|[ivxlc]+|[a-z])\b[^.!?]{0,70}',
+    re.IGNORECASE)
+# Top-level numbering only: "3 Methods" or "3. Methods", not "3.2 Data"
+NUMBERED_HEADING_RE = re.compile(r'\d{1,2}\.?\s+[A-Z][^.!?]{2,60}')
+CAPS_HEADING_RE = re.compile(r"[A-Z][A-Z0-9 ,:&'-]{3,60}")
+
+
+# Splitting ------------------------------------------------------------
+
+def outline_starts(file_path):
+    """(title, page number) of each top-level entry in the PDF's outline."""
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        try:
+            entries = reader.outline
+        except Exception:  # a malformed outline is the same as none
+            return []
+        # Nested lists hold the children of the entry before them. A single
+        # top-level entry is usually the book's title; use its children.
+        while len(entries) == 2 and isinstance(entries[1], list):
+            entries = entries[1]
+        starts = []
+        for entry in entries:
+            if isinstance(entry, list):
+                continue
+            try:
+                index = reader.get_destination_page_number(entry)
+            except Exception:
+                continue
+            if index is not None and index >= 0:
+                starts.append((str(entry.title).strip(), index + 1))
+    starts.sort(key=lambda start: start[1])
+    return starts
+
+
+def is_heading(line):
+    if len(line) > 80:
+        return False
+    if KEYWORD_HEADING_RE.fullmatch(line) or NUMBERED_HEADING_RE.fullmatch(line):
+        return True
+    return bool(CAPS_HEADING_RE.fullmatch(line)) and sum(c.isalpha() for c in line) >= 4
+
+
+def heading_cuts(pages):
+    # (page index, offset in the page's text, title) for every heading line
+    found = []
+    pages_with = Counter()
+    for index, page in enumerate(pages):
+        seen = set()
+        for match in LINE_RE.finditer(page.text):
+            line = match.group(1)
+            if is_heading(line):
+                found.append((index, match.start(), line))
+                seen.add(line.lower())
+        pages_with.update(seen)
+    # Running heads and footers repeat on most pages
+    return [cut for cut in found if pages_with[cut[2].lower()] <= 2]
+
+
+def _cut(pages, cuts):
+    bounds = list(cuts)
+    if bounds[0][:2] != (0, 0):
+        bounds.insert(0, (0, 0, "Front matter"))
+    bounds.append((len(pages), 0, None))
+    sections = []
+    for (page, offset, title), (end_page, end_offset, _) in zip(bounds, bounds[1:]):
+        if page == end_page:
+            text = pages[page].text[offset:end_offset]
+            last = page
+        else:
+            parts = [pages[page].text[offset:]]
+            parts.extend(p.text for p in pages[page + 1:end_page])
+            last = end_page - 1
+            if end_offset:
+                parts.append(pages[end_page].text[:end_offset])
+                last = end_page
+            text = "".join(parts)
+        sections.append(Section(title, pages[page].number, pages[last].number, text))
+    return sections
+
+
+def _merge_small(sections):
+    merged = []
+    for section in sections:
+        if merged and len(section.text.strip()) < MIN_SECTION_CHARS:
+            previous = merged[-1]
+            merged[-1] = previous._replace(last_page=section.last_page,
+                                           text=previous.text + section.text)
+        elif len(merged) == 1 and len(merged[0].text.strip()) < MIN_SECTION_CHARS:
+            # A short opening (title page, front matter) joins the first real section
+            first = merged.pop()
+            merged.append(section._replace(first_page=first.first_page,
+                                           text=first.text + section.text))
+        else:
+            merged.append(section)
+    return merged
+
+
+def split_sections(pages, outline=None):
+    """Split pages into Sections.
+
+    `outline` is a list of (title, page number) pairs, as returned by
+    outline_starts(). Without one, or if it yields a single section,
+    headings in the text are tried, then fixed runs of pages. Section
+    text leaves out running headers and footers.
+    """
+    if not pages:
+        return []
+    # Headings are looked for in the original pages; blanking keeps the
+    # offsets of the cuts valid in the cleaned ones
+    cleaned, blanked = dedup.strip_boilerplate(pages)
+    index = {page.number: i for i, page in enumerate(pages)}
+    cuts = []
+    for title, number in outline or ():
+        # Several entries on one page: the first names the section
+        if number in index and (not cuts or cuts[-1][0] != index[number]):
+            cuts.append((index[number], 0, title))
+    sections = _merge_small(_cut(cleaned, cuts)) if cuts else []
+    if len(sections) < 2:
+        cuts = heading_cuts(pages)
+        sections = _merge_small(_cut(cleaned, cuts)) if cuts else []
+    if len(sections) < 2:
+        sections = []
+        for start in range(0, len(cleaned), PAGES_PER_SECTION):
+            run = cleaned[start:start + PAGES_PER_SECTION]
+            sections.append(Section(f"Pages {run[0].number}-{run[-1].number}",
+                                    run[0].number, run[-1].number,
+                                    "".join(page.text for page in run)))
+    return _count_boilerplate(sections, pages, blanked)
+
+
+def _count_boilerplate(sections, pages, blanked):
+    # Each page's blanked lines go to the section holding the page's start
+    counts = [0] * len(sections)
+    i = 0
+    for page, lines in zip(pages, blanked):
+        while sections[i].last_page < page.number:
+            i += 1
+        counts[i] += lines
+    return [section._replace(boilerplate_lines=count)
+            for section, count in zip(sections, counts)]
+
+
+# Summarizing ----------------------------------------------------------
+
+def rank_section(text, method=engine.DEFAULT_METHOD, depth=RANKED_DEPTH):
+    """The section's best `depth` sentences, best first, in cacheable form."""
+    analysis = DocumentAnalysis(text)
+    duplicates = analysis.duplicates
+    kept = [i for i in range(len(analysis.sentences)) if i not in duplicates]
+    ranked = []
+    if kept:
+        sentence_tokens = [analysis.sentence_tokens[i] for i in kept]
+        scores = engine.METHODS[method](sentence_tokens, analysis.word_freq)
+        ranked = [[kept[j], analysis.sentences[kept[j]]]
+                  for j in engine.top_sentences(sentence_tokens, scores, depth)]
+    return {
+        'ranked': ranked,
+        'depth': depth,
+        'sentence_count': len(analysis.sentences),
+        'dropped': len(duplicates),
+        'word_freq': dict(analysis.word_freq),
+    }
+
+
+def section_summary(ranking, count):
+    # The top `count` sentences, back in document order
+    chosen = sorted(ranking['ranked'][:count])
+    return '. '.join(sentence for _, sentence in chosen) + '.' if chosen else ""
+
+
+def section_heading(section):
+    if section.first_page == section.last_page:
+        return f"{section.title} (p. {section.first_page})"
+    return f"{section.title} (pp. {section.first_page}-{section.last_page})"
+
+
+def summarize_sections(sections, section_sentences=DEFAULT_SECTION_SENTENCES,
+                       overview_sentences=DEFAULT_OVERVIEW_SENTENCES, num_keywords=10,
+                       method=engine.DEFAULT_METHOD, cache=None, workers=None,
+                       progress=None):
+    """Summarize each section, then the section summaries.
+
+    Returns an engine.Summary whose text is the overview followed by each
+    section's summary under its heading. `progress(done, total)` is
+    called as uncached sections finish.
+    """
+    if method not in engine.METHODS:
+        raise ValueError(f"Unknown summarization method: {method!r}")
+    params = {'method': method}
+    keys = [text_hash(section.text) for section in sections]
+    rankings = [None] * len(sections)
+    missing = []
+    for i, key in enumerate(keys):
+        ranking = cache.get_section(key, params) if cache is not None else None
+        # A ranking shorter than its depth already holds every sentence
+        if ranking is not None and (
+                ranking['depth'] >= section_sentences
+                or len(ranking['ranked']) < ranking['depth']):
+            rankings[i] = ranking
+        else:
+            missing.append(i)
+
+    depth = max(RANKED_DEPTH, section_sentences)
+
+    def keep(done, i, ranking):
+        rankings[i] = ranking
+        if cache is not None:
+            cache.put_section(keys[i], ranking, params)
+        if progress is not None:
+            progress(done, len(missing))
+
+    workers = workers or os.cpu_count() or 1
+    size = sum(len(sections[i].text) for i in missing)
+    with profiling.stage('rank sections', len(missing), 'sections', detail=method):
+        if workers > 1 and len(missing) > 1 and size >= PARALLEL_MIN_CHARS:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(missing)))
+            try:
+                futures = {pool.submit(rank_section, sections[i].text, method, depth): i
+                           for i in missing}
+                for done, future in enumerate(as_completed(futures), 1):
+                    keep(done, futures[future], future.result())
+            finally:
+                # Also reached when progress() cancels the job
+                pool.shutdown(cancel_futures=True)
+        else:
+            for done, i in enumerate(missing, 1):
+                keep(done, i, rank_section(sections[i].text, method, depth))
+
+    parts = []
+    word_freq = Counter()
+    sentence_count = dropped = 0
+    for section, ranking in zip(sections, rankings):
+        word_freq.update(ranking['word_freq'])
+        sentence_count += ranking['sentence_count']
+        dropped += ranking['dropped']
+        text = section_summary(ranking, section_sentences)
+        if text:
+            parts.append((section, text))
+    if not parts:
+        raise engine.NotEnoughContent("Not enough content to summarize!")
+
+    blocks = []
+    if overview_sentences:
+        with profiling.stage('overview', len(parts), 'sections', detail=method):
+            overview = engine.summarize(" ".join(text for _, text in parts),
+                                        num_sentences=overview_sentences, method=method)
+        blocks.append(f"Overview\n{overview.text}")
+    blocks.extend(f"{section_heading(section)}\n{text}" for section, text in parts)
+    keywords = [word for word, _ in word_freq.most_common(num_keywords)]
+    return engine.Summary("\n\n".join(blocks), keywords, word_freq, sentence_count, dropped,
+                          sum(section.boilerplate_lines for section in sections))
+
+
+def summarize_pdf_sections(file_path, workers=None, cache=None, **params):
+    pages = extract_pdf_pages(file_path, workers=workers)
+    sections = split_sections(pages, outline_starts(file_path))
+    return summarize_sections(sections, cache=cache, workers=workers, **params)
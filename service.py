@@ -0,0 +1,429 @@
+"""Local HTTP summarization service.
+
+Runs the same extraction and summarization code as the desktop app for
+other tools on this machine, without a display:
+
+    python -m service --port 8765 --workers 4
+
+    curl --data-binary @notes.pdf 'http://127.0.0.1:8765/summarize/pdf?method=textrank'
+    curl -H 'Content-Type: application/json' -d '{"text": "..."}' \\
+         http://127.0.0.1:8765/summarize/text
+    curl 'http://127.0.0.1:8765/search?q=gradient+descent&limit=20'
+
+Requests are handled on threads but the work runs on a process pool.
+Requests that arrive close together are handed to a worker as one
+batch. The queue in front of the pool is bounded, and a full queue
+answers 503 with Retry-After rather than piling up work. Results go
+through the same on-disk DocumentCache as the app and batch mode, so a
+file the app has already summarized comes straight back. A small
+in-memory cache sits in front of it, and identical requests that are
+in flight share one computation. /search reads the app's full-text
+index (search.py) directly on the request thread.
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as ResultTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import engine
+import search
+from batch import process_document
+from cache import DocumentCache, params_key, text_hash
+
+MAX_BODY_BYTES = 100 * 1024 * 1024
+REQUEST_TIMEOUT = 300
+# A batch is sent early once its payloads add up to this much
+BATCH_MAX_BYTES = 1024 * 1024
+
+
+class Busy(Exception):
+    pass
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def summary_payload(summary, text, pages=None):
+    words = len(text.split())
+    summary_words = len(summary.text.split())
+    payload = {
+        'summary': summary.text,
+        'keywords': summary.keywords,
+        'sentence_count': summary.sentence_count,
+        'dropped_sentences': summary.dropped_sentences,
+        'boilerplate_lines': summary.boilerplate_lines,
+        'stats': {
+            'words': words,
+            'summary_words': summary_words,
+            'compression': round(summary_words / words * 100, 1) if words else 0.0,
+        },
+    }
+    if pages is not None:
+        payload['stats']['pages'] = pages
+    return payload
+
+
+def _summarize_text(text, params, cache):
+    doc_hash = text_hash(text)
+    summary = cache.get_summary(doc_hash, params)
+    cached = summary is not None
+    if not cached:
+        summary = engine.summarize(text, **params)
+        cache.put_summary(doc_hash, summary, params)
+    return summary_payload(summary, text), cached
+
+
+def _summarize_pdf(data, params, cache):
+    # The extraction code reads from a path; the hash matches file_hash()
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        cached = cache.get_summary(hashlib.sha256(data).hexdigest(), params) is not None
+        result = process_document(path, params, cache.directory)
+    finally:
+        os.remove(path)
+    text = "".join(page.text for page in result.pages)
+    return summary_payload(result.summary, text, pages=len(result.pages)), cached
+
+
+def process_batch(tasks, cache_dir=None):
+    # Runs in a worker process; one failing request doesn't sink the batch
+    cache = DocumentCache(cache_dir)
+    results = []
+    for kind, data, params in tasks:
+        try:
+            if kind == 'pdf':
+                payload, cached = _summarize_pdf(data, params, cache)
+            else:
+                payload, cached = _summarize_text(data, params, cache)
+        except engine.NotEnoughContent as e:
+            results.append(('error', 422, str(e)))
+        except Exception as e:
+            results.append(('error', 500, f"{type(e).__name__}: {e}"))
+        else:
+            payload['cached'] = cached
+            results.append(('ok', payload))
+    return results
+
+
+class SummaryService:
+    def __init__(self, workers=None, queue_size=64, batch_size=8, batch_wait=0.01,
+                 cache_dir=None, memory_entries=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.cache_dir = DocumentCache(cache_dir).directory
+        self.index = (search.SearchIndex(search.default_index_path(self.cache_dir))
+                      if search.available() else None)
+        self.memory_entries = memory_entries
+        self._queue = queue.Queue(maxsize=queue_size)
+        # One batch per worker in flight; the rest wait in the bounded queue
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._memory = OrderedDict()
+        self._pool = None
+        self._batcher = None
+        self.counters = {'requests': 0, 'memory_hits': 0, 'coalesced': 0,
+                         'rejected': 0, 'batches': 0}
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._batcher = threading.Thread(target=self._run_batches, name="batcher",
+                                         daemon=True)
+        self._batcher.start()
+        return self
+
+    def close(self):
+        self._queue.put(None)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind, data, params):
+        """Return a Future for the response payload; raises Busy when full."""
+        raw = data if kind == 'pdf' else data.encode('utf-8')
+        key = (hashlib.sha256(raw).hexdigest(), params_key(params))
+        with self._lock:
+            self.counters['requests'] += 1
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                future = Future()
+                future.set_result(dict(self._memory[key], cached=True))
+                return future
+            if key in self._inflight:
+                self.counters['coalesced'] += 1
+                return self._inflight[key]
+            future = Future()
+            try:
+                self._queue.put_nowait((key, kind, data, params, future))
+            except queue.Full:
+                self.counters['rejected'] += 1
+                raise Busy() from None
+            self._inflight[key] = future
+        return future
+
+    def status(self):
+        with self._lock:
+            return dict(self.counters, queued=self._queue.qsize(),
+                        in_flight=len(self._inflight), workers=self.workers)
+
+    def _run_batches(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            size = len(item[2])
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size and size < BATCH_MAX_BYTES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop once this batch is sent
+                    break
+                batch.append(item)
+                size += len(item[2])
+
+            self._slots.acquire()
+            try:
+                future = self._pool.submit(process_batch,
+                                           [(kind, data, params)
+                                            for key, kind, data, params, f in batch],
+                                           self.cache_dir)
+            except RuntimeError as e:  # pool shut down
+                self._slots.release()
+                self._finish(batch, None, e)
+                continue
+            with self._lock:
+                self.counters['batches'] += 1
+            future.add_done_callback(lambda done, batch=batch: self._batch_done(batch, done))
+
+    def _batch_done(self, batch, done):
+        self._slots.release()
+        if done.cancelled():
+            self._finish(batch, None, RuntimeError("service is shutting down"))
+        elif done.exception() is not None:
+            self._finish(batch, None, done.exception())
+        else:
+            self._finish(batch, done.result(), None)
+
+    def _finish(self, batch, results, error):
+        for index, (key, kind, data, params, future) in enumerate(batch):
+            with self._lock:
+                self._inflight.pop(key, None)
+            if error is not None:
+                future.set_exception(error)
+                continue
+            result = results[index]
+            if result[0] == 'ok':
+                with self._lock:
+                    self._memory[key] = result[1]
+                    while len(self._memory) > self.memory_entries:
+                        self._memory.popitem(last=False)
+                future.set_result(result[1])
+            else:
+                future.set_exception(RequestError(result[1], result[2]))
+
+
+def _int_param(values, name, default):
+    # Query strings give text, JSON bodies give numbers; accept whole numbers only
+    value = values.get(name)
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    elif isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise RequestError(400, f"{name} must be an integer")
+
+
+def parse_params(query, body=None):
+    # Query string first, JSON body fields override it
+    values = {name: items[-1] for name, items in parse_qs(query).items()}
+    values.update(body or {})
+    params = {
+        'num_sentences': _int_param(values, 'num_sentences', None),
+        'num_keywords': _int_param(values, 'num_keywords', 10),
+        'method': values.get('method', engine.DEFAULT_METHOD),
+    }
+    if not isinstance(params['method'], str) or params['method'] not in engine.METHODS:
+        raise RequestError(400, f"method must be one of: {', '.join(sorted(engine.METHODS))}")
+    if (params['num_sentences'] is not None and params['num_sentences'] < 1) \
+            or params['num_keywords'] < 0:
+        raise RequestError(400, "num_sentences must be positive and num_keywords not negative")
+    return params
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = "SummarizerPro"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self.send_json(200, dict(self.server.service.status(), status='ok'))
+        elif url.path == '/search':
+            self.send_search(url.query)
+        else:
+            self.send_json(404, {'error': "not found"})
+
+    def send_search(self, query):
+        values = {name: items[-1] for name, items in parse_qs(query).items()}
+        index = self.server.service.index
+        if index is None:
+            self.send_json(501, {'error': "search needs SQLite with FTS5"})
+            return
+        try:
+            limit = int(values.get('limit', search.DEFAULT_LIMIT))
+        except ValueError:
+            self.send_json(400, {'error': "limit must be an integer"})
+            return
+        hits = index.search(values.get('q', ''), limit=max(1, limit))
+        self.send_json(200, {'results': [hit._asdict() for hit in hits]})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == '/summarize/text':
+                kind, data, params = self.read_text_request(url.query)
+            elif url.path == '/summarize/pdf':
+                kind, data, params = 'pdf', self.read_body(), parse_params(url.query)
+                if not data.startswith(b'%PDF'):
+                    raise RequestError(415, "body is not a PDF file")
+            else:
+                self.discard_body()
+                raise RequestError(404, "not found")
+            future = self.server.service.submit(kind, data, params)
+            payload = future.result(timeout=REQUEST_TIMEOUT)
+        except RequestError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except Busy:
+            self.send_json(503, {'error': "too many requests queued, retry shortly"},
+                           headers={'Retry-After': '1'})
+        except ResultTimeout:
+            self.send_json(504, {'error': "summarization timed out"})
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+        else:
+            self.send_json(200, payload)
+
+    def read_body(self):
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            raise RequestError(411, "Content-Length required") from None
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise RequestError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+        return self.rfile.read(length)
+
+    def discard_body(self):
+        try:
+            self.read_body()
+        except RequestError:
+            self.close_connection = True
+
+    def read_text_request(self, query):
+        body = self.read_body()
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        try:
+            if content_type == 'application/json':
+                fields = json.loads(body)
+                if not isinstance(fields, dict) or not isinstance(fields.get('text'), str):
+                    raise RequestError(400, 'expected a JSON object with a "text" string')
+                text = fields.pop('text')
+                return 'text', text, parse_params(query, fields)
+            return 'text', body.decode('utf-8'), parse_params(query)
+        except (ValueError, UnicodeDecodeError):
+            raise RequestError(400, "body must be UTF-8 text or JSON") from None
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class SummaryServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of clients should reach the bounded queue and get a 503 from
+    # it, not have their connections refused by a short listen backlog
+    request_queue_size = 128
+
+
+def make_server(service, host='127.0.0.1', port=8765, verbose=False):
+    # port=0 picks a free port; see server.server_address
+    server = SummaryServer((host, port), RequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m service",
+        description="Serve PDF and text summarization over HTTP on this machine.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to bind (default: %(default)s, local only)")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="requests allowed to wait before answering 503 (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="most requests handed to a worker at once (default: %(default)s)")
+    parser.add_argument("--batch-wait", type=float, default=0.01,
+                        help="seconds to wait for a batch to fill (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="shared result cache (default: the app's cache directory)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    service = SummaryService(workers=args.workers, queue_size=args.queue_size,
+                             batch_size=args.batch_size, batch_wait=args.batch_wait,
+                             cache_dir=args.cache_dir).start()
+    server = make_server(service, args.host, args.port, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} with {service.workers} workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Text-to-speech playback that can be paused, stopped and skipped.
+
+pyttsx3 engines must stay on the thread that created them, and
+runAndWait() blocks until everything queued has been spoken. The
+SpeechPlayer therefore owns one engine on one dedicated thread and
+feeds it a sentence at a time. Between sentences it picks up new rate
+and volume settings and any pause, stop or skip; during a sentence the
+engine's word callback interrupts it as soon as one of those arrives.
+Rendering to an audio file goes through the same thread so the engine
+is never driven from two places at once.
+"""
+import threading
+from collections import namedtuple
+
+import profiling
+from analysis import SENTENCE_END_RE
+
+# start/end are character offsets into the text handed to play()
+Chunk = namedtuple('Chunk', ['index', 'start', 'end', 'text'])
+
+# Sentences longer than this are split at a space so skip stays useful
+MAX_CHUNK_CHARS = 400
+
+IDLE = "idle"
+PLAYING = "playing"
+PAUSED = "paused"
+
+
+def split_chunks(text):
+    spans = []
+    position = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        spans.extend(_split_long(text, position, match.end()))
+        position = match.end()
+    spans.extend(_split_long(text, position, len(text)))
+    return [Chunk(i, start, end, text[start:end]) for i, (start, end) in enumerate(spans)]
+
+
+def _split_long(text, start, end):
+    # Trimmed spans of text[start:end], none longer than MAX_CHUNK_CHARS
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    while end - start > MAX_CHUNK_CHARS:
+        cut = text.rfind(' ', start, start + MAX_CHUNK_CHARS)
+        if cut <= start:
+            cut = start + MAX_CHUNK_CHARS
+        yield start, cut
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    if end > start:
+        yield start, end
+
+
+def _default_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class SpeechPlayer:
+    def __init__(self, dispatch, on_chunk=None, on_error=None, engine_factory=None):
+        # on_chunk(chunk) runs through dispatch when a sentence starts, and
+        # with None once playback has finished or been stopped.
+        self.dispatch = dispatch
+        self.on_chunk = on_chunk
+        self.on_error = on_error
+        self.engine_factory = engine_factory or _default_engine
+        self.rate = 150
+        self.volume = 1.0
+        self.state = IDLE
+        self.chunks = []
+        self.index = 0
+        self._cond = threading.Condition()
+        # Bumped by every control action; a sentence whose generation is
+        # out of date gets interrupted and is not counted as spoken.
+        self._generation = 0
+        self._speaking = None
+        self._saves = []
+        self._closing = False
+        self._engine = None
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    # Controls (any thread) --------------------------------------------
+
+    def play(self, text, index=0):
+        with self._cond:
+            self.chunks = split_chunks(text)
+            self.index = max(0, min(index, len(self.chunks) - 1))
+            self._generation += 1
+            self.state = PLAYING if self.chunks else IDLE
+            self._cond.notify()
+
+    def pause(self):
+        with self._cond:
+            if self.state == PLAYING:
+                self.state = PAUSED
+                self._generation += 1
+
+    def resume(self):
+        with self._cond:
+            if self.state == PAUSED:
+                self.state = PLAYING
+                self._cond.notify()
+
+    def toggle_pause(self):
+        if self.state == PLAYING:
+            self.pause()
+        else:
+            self.resume()
+
+    def stop(self):
+        with self._cond:
+            was_active = self.state != IDLE
+            self.state = IDLE
+            self.chunks = []
+            self.index = 0
+            self._generation += 1
+        if was_active:
+            self._post(self.on_chunk, None)
+
+    def skip(self, count=1):
+        # Negative counts go back; the sentence is restarted from its beginning
+        with self._cond:
+            if self.state == IDLE:
+                return
+            self.index = max(0, min(self.index + count, len(self.chunks) - 1))
+            self._generation += 1
+            self._cond.notify()
+
+    def set_rate(self, rate):
+        self.rate = rate
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    @property
+    def active(self):
+        return self.state != IDLE
+
+    def save_to_file(self, text, path, on_done=None, on_error=None):
+        # Rendered once the sentence being spoken, if any, has finished;
+        # playback carries on afterwards.
+        with self._cond:
+            self._saves.append((text, path, on_done, on_error))
+            self._cond.notify()
+
+    def shutdown(self):
+        with self._cond:
+            self._closing = True
+            self._generation += 1
+            self._cond.notify()
+
+    # Speech thread ----------------------------------------------------
+
+    def _post(self, callback, *args):
+        if callback is not None:
+            self.dispatch(lambda: callback(*args))
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = self.engine_factory()
+            self._engine.connect('started-word', self._on_word)
+        return self._engine
+
+    def _on_word(self, name, location, length):
+        # Runs inside runAndWait on the speech thread
+        if self._speaking is not None and self._speaking != self._generation:
+            self._engine.stop()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._closing or self._saves or self.state == PLAYING):
+                    self._cond.wait()
+                if self._closing:
+                    return
+                if self._saves:
+                    save = self._saves.pop(0)
+                    self._speaking = None
+                else:
+                    save = None
+                    chunk = self.chunks[self.index]
+                    self._speaking = self._generation
+            try:
+                if save is not None:
+                    self._render(*save)
+                else:
+                    self._speak(chunk)
+            except Exception as e:
+                with self._cond:
+                    self.state = IDLE
+                    self.chunks = []
+                self._post(self.on_error, e)
+                self._post(self.on_chunk, None)
+
+    def _speak(self, chunk):
+        engine = self._get_engine()
+        self._post(self.on_chunk, chunk)
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        engine.say(chunk.text)
+        with profiling.stage('tts sentence', len(chunk.text), 'chars'):
+            engine.runAndWait()
+        with self._cond:
+            if self._speaking != self._generation or self.state != PLAYING:
+                return  # interrupted; the controls already moved things on
+            self.index += 1
+            if self.index < len(self.chunks):
+                return
+            self.state = IDLE
+            self.chunks = []
+            self.index = 0
+        self._post(self.on_chunk, None)
+
+    def _render(self, text, path, on_done, on_error):
+        try:
+            engine = self._get_engine()
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+            engine.save_to_file(text, path)
+            with profiling.stage('tts render', len(text), 'chars'):
+                engine.runAndWait()
+        except Exception as e:
+            self._post(on_error, e)
+        else:
+            self._post(on_done, path)
@@ -0,0 +1,81 @@
+import os
+import sys
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+from batch import CANCELLED, DONE, FAILED, QUEUED, BatchRunner  # noqa: E402
+
+
+class PendingPool:
+    # Stands in for the process pool: futures stay pending until a test
+    # settles them
+    def __init__(self, max_workers=None):
+        self.futures = []
+
+    def submit(self, function, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def make_runner(monkeypatch):
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', PendingPool)
+    return BatchRunner(lambda callback: callback())
+
+
+def test_cancelled_file_is_requeued_in_place(monkeypatch):
+    runner = make_runner(monkeypatch)
+    first, second = runner.add(['a.pdf', 'b.pdf'], {})
+    runner.cancel()
+    assert runner.counts() == {CANCELLED: 2}
+
+    assert runner.add(['a.pdf'], {}) == [first]
+    assert len(runner.items) == 2
+    assert first.status == QUEUED
+    assert runner.counts() == {QUEUED: 1, CANCELLED: 1}
+
+    first.future.set_result('result')
+    assert first.status == DONE
+    assert runner.counts() == {DONE: 1, CANCELLED: 1}
+    assert runner.finished() == [first]
+
+
+def test_failed_file_is_requeued_in_place(monkeypatch):
+    runner = make_runner(monkeypatch)
+    item, = runner.add(['a.pdf'], {})
+    item.future.set_exception(RuntimeError('broken'))
+    assert runner.counts() == {FAILED: 1}
+    assert item.error == 'broken'
+
+    assert runner.add(['a.pdf'], {}) == [item]
+    assert item.error == ''
+    item.future.set_result('result')
+    assert runner.counts() == {DONE: 1}
+
+
+def test_queued_and_done_files_are_not_added_again(monkeypatch):
+    runner = make_runner(monkeypatch)
+    item, = runner.add(['a.pdf', 'a.pdf'], {})
+    assert runner.add(['a.pdf'], {}) == []
+    item.future.set_result('result')
+    assert runner.add(['a.pdf'], {}) == []
+    assert len(runner.items) == 1
+
+
+def test_stale_callback_does_not_touch_requeued_item(monkeypatch):
+    # The cancel callback is only applied after the file was queued again
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', PendingPool)
+    pending = []
+    runner = BatchRunner(pending.append)
+    item, = runner.add(['a.pdf'], {})
+    runner.cancel()
+    item.status = CANCELLED
+    runner.add(['a.pdf'], {})
+    for apply in pending:
+        apply()
+    assert item.status == QUEUED
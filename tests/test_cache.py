@@ -0,0 +1,55 @@
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+from cache import DocumentCache  # noqa: E402
+from engine import Summary  # noqa: E402
+
+PARAMS = {'method': 'fast'}
+
+
+def make_summary():
+    return Summary("A summary.", ['word'], Counter(word=3), 4, 1, 2)
+
+
+def test_summary_round_trip(tmp_path):
+    store = DocumentCache(str(tmp_path))
+    store.put_summary('doc', make_summary(), PARAMS)
+    assert store.get_summary('doc', PARAMS) == make_summary()
+    assert store.get_summary('doc', {'method': 'tfidf'}) is None
+
+
+def test_entries_from_another_format_are_not_matched(tmp_path, monkeypatch):
+    store = DocumentCache(str(tmp_path))
+    store.put_summary('doc', make_summary(), PARAMS)
+    store.put_section('section', {'ranked': []}, PARAMS)
+    monkeypatch.setattr(cache, 'CACHE_FORMAT', cache.CACHE_FORMAT + 1)
+    assert store.get_summary('doc', PARAMS) is None
+    assert store.get_section('section', PARAMS) is None
+    assert store.get_word_freq('doc') is None
+
+
+def test_eviction_scans_only_when_over_the_limit(tmp_path, monkeypatch):
+    store = DocumentCache(str(tmp_path), max_bytes=20_000)
+    scans = []
+    monkeypatch.setattr(store, 'evict', lambda original=store.evict: (scans.append(1),
+                                                                       original()))
+    store.put_ocr('first', 'x' * 100)
+    assert len(scans) == 1  # the first write learns the directory's size
+    for i in range(10):
+        store.put_ocr(f'small{i}', 'x' * 100)
+    assert len(scans) == 1
+
+    for i in range(40):
+        store.put_ocr(f'large{i}', 'x' * 1000)
+    total = sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+    assert total <= 20_000
+    # Each scan frees room for the next few writes
+    assert 1 < len(scans) < 20
+    # Rewriting an entry only counts the difference in size
+    scans.clear()
+    store.put_ocr('large39', 'x' * 1000)
+    assert scans == []
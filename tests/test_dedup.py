@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import dedup  # noqa: E402
+from analysis import DocumentAnalysis  # noqa: E402
+from corpus import make_pages  # noqa: E402
+
+LONG = ("the lecture covers how the model learns a value function from sampled "
+        "experience and how the error in that estimate shrinks as more samples "
+        "arrive during training")
+
+
+def flatten(sentence_tokens):
+    hashes = []
+    offsets = [0]
+    for tokens in sentence_tokens:
+        hashes.extend(dedup.word_hashes(tokens))
+        offsets.append(len(hashes))
+    return hashes, offsets
+
+
+def duplicates(sentences):
+    return dedup.duplicate_sentences(*flatten(s.split() for s in sentences))
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def path(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(dedup, '_numpy', lambda sentence_count: None)
+    else:
+        pytest.importorskip('numpy')
+        monkeypatch.setattr(dedup, 'NUMPY_MIN_SENTENCES', 0)
+    return request.param
+
+
+def test_exact_and_near_copies_are_dropped(path):
+    near = LONG.replace("sampled", "recorded")
+    sentences = [LONG, "an unrelated sentence about protein structure and cells",
+                 LONG, near, "one", "one", ""]
+    assert duplicates(sentences) == {2, 3, 5}
+
+
+def test_rewordings_below_the_threshold_are_kept(path):
+    words = LONG.split()
+    # Every fourth word changed leaves well under 80% of the bigrams shared
+    changed = " ".join(w + "x" if i % 4 == 0 else w for i, w in enumerate(words))
+    assert duplicates([LONG, changed, " ".join(reversed(words))]) == set()
+
+
+def test_numpy_matches_pure_python(monkeypatch):
+    np = pytest.importorskip('numpy')
+    tokens = DocumentAnalysis(" ".join(make_pages(20, seed=7))).sentence_tokens
+    # Plant exact copies and copies with their last word changed
+    copies = tokens[::10]
+    near = [t[:-1] + ["changed"] for t in tokens[::7] if len(t) > 14]
+    start = len(tokens)
+    tokens = tokens + copies + near
+    hashes, offsets = flatten(tokens)
+
+    monkeypatch.setattr(dedup, '_numpy', lambda sentence_count: None)
+    expected = dedup.duplicate_sentences(hashes, offsets)
+    keys = dedup.band_keys([dedup.word_hashes(t) for t in tokens if t])
+    monkeypatch.undo()
+    monkeypatch.setattr(dedup, 'NUMPY_MIN_SENTENCES', 0)
+    assert set(range(start, start + len(copies))) <= expected
+    assert len(expected & set(range(start + len(copies), len(tokens)))) > len(near) // 2
+    assert dedup.duplicate_sentences(np.asarray(hashes, dtype=np.uint64), offsets) == expected
+    assert dedup.band_keys([dedup.word_hashes(t) for t in tokens if t]) == keys
+
+    # Every dropped sentence really is close to an earlier one
+    shingles = [dedup.shingles(dedup.word_hashes(t)) for t in tokens]
+    for i in expected:
+        assert any(dedup._similar(shingles[i], shingles[j]) for j in range(i))
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import engine  # noqa: E402
+from analysis import DocumentAnalysis  # noqa: E402
+from corpus import make_pages  # noqa: E402
+from docstore import DocumentStore  # noqa: E402
+from extraction import Page  # noqa: E402
+
+
+def make_document(rng):
+    # Running headers, repeated pages, pages cut mid-sentence or mid-word,
+    # a page with no terminator and text that is more than one byte a char
+    texts = make_pages(rng.randint(3, 8), seed=rng.randrange(1 << 30))
+    texts.insert(rng.randrange(len(texts)), texts[0])
+    pages = []
+    for number, text in enumerate(texts, 1):
+        roll = rng.random()
+        if roll < 0.3:
+            text = text[:rng.randrange(len(text))]
+        elif roll < 0.4:
+            text = "a café résumé naïve déjà vu page with no terminator at all "
+        pages.append(Page(number, f"Lecture notes — week 3\n{text}\nPage {number}\n"))
+    return pages
+
+
+@pytest.fixture(params=['numpy', 'stdlib'])
+def numpy_or_not(request, monkeypatch):
+    # The store has a pure-Python branch for every NumPy one
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_store_matches_analysis(seed, numpy_or_not):
+    pages = make_document(random.Random(seed))
+    analysis = DocumentAnalysis.from_pages(pages)
+    store = DocumentStore.from_pages(pages)
+    try:
+        words = store.vocabulary.words
+        offsets = store.token_offsets
+        assert [store.sentence(i) for i in range(store.sentence_count)] == analysis.sentences
+        assert [[words[t] for t in store.tokens[offsets[i]:offsets[i + 1]]]
+                for i in range(store.sentence_count)] == analysis.sentence_tokens
+        assert list(store.word_freq.items()) == list(analysis.word_freq.items())
+        assert store.word_count == analysis.word_count
+        assert store.boilerplate_lines == analysis.boilerplate_lines > 0
+        assert store.duplicates == analysis.duplicates
+        assert store.frequency_scores() == engine.frequency_scores(analysis.sentence_tokens,
+                                                                   analysis.word_freq)
+        top = [word for word, _ in analysis.top_words(5)]
+        assert store.page_word_counts(pages, top) == analysis.page_word_counts(pages, top)
+
+        for num_sentences in (None, 2):
+            expected = engine.summarize(None, num_sentences, analysis=analysis)
+            assert engine.summarize_store(store, num_sentences) == expected
+    finally:
+        store.close()
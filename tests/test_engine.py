@@ -0,0 +1,99 @@
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from analysis import DocumentAnalysis  # noqa: E402
+
+STOP_WORDS = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and',
+              'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by'}
+
+
+def reference_rank(sentences, word_freq, num_sentences):
+    # Scoring and selection from the original create_summary
+    sentence_scores = {}
+    for sentence in sentences:
+        score = 0
+        sentence_words = re.findall(r'\b[a-z]+\b', sentence.lower())
+        for word in sentence_words:
+            if word in word_freq:
+                score += word_freq[word]
+        if len(sentence_words) > 0:
+            sentence_scores[sentence] = score / len(sentence_words)
+    top_sentences = sorted(sentence_scores.items(),
+                           key=lambda x: x[1], reverse=True)[:num_sentences]
+    summary_sentences = sorted(top_sentences, key=lambda x: sentences.index(x[0]))
+    return [s[0] for s in summary_sentences]
+
+
+def reference_summary(text, num_sentences=None):
+    # The original create_summary, minus the Tk calls
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    words = re.findall(r'\b[a-z]+\b', text.lower())
+    word_freq = Counter(w for w in words if w not in STOP_WORDS)
+    if num_sentences is None:
+        num_sentences = max(3, len(sentences) // 5)
+    summary_text = '. '.join(reference_rank(sentences, word_freq, num_sentences)) + '.'
+    keywords = [word for word, count in word_freq.most_common(10)]
+    return summary_text, keywords
+
+
+def make_text(rng, sentence_count, vocabulary_size=400):
+    # Distinct sentences over a skewed vocabulary; the original kept one
+    # score per sentence text, so repeats are where the two may differ
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz')
+                          for _ in range(rng.randint(3, 9)))
+                  for _ in range(vocabulary_size)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+    stop_words = sorted(STOP_WORDS)
+    sentences = set()
+    ordered = []
+    while len(ordered) < sentence_count:
+        words = [rng.choice(stop_words) if rng.random() < 0.3
+                 else rng.choices(vocabulary, weights)[0]
+                 for _ in range(rng.randint(6, 16))]
+        sentence = ' '.join(words).capitalize()
+        if len(sentence) > 20 and sentence not in sentences:
+            sentences.add(sentence)
+            ordered.append(sentence)
+    return '. '.join(ordered) + '.'
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('num_sentences', [None, 1, 5])
+def test_summary_matches_original(seed, num_sentences):
+    rng = random.Random(seed)
+    text = make_text(rng, rng.randint(3, 120))
+    summary = engine.summarize(text, num_sentences=num_sentences)
+    assert summary.dropped_sentences == 0
+    assert (summary.text, summary.keywords) == reference_summary(text, num_sentences)
+
+
+@pytest.mark.slow
+def test_ranking_speedup_on_100k_sentences():
+    text = make_text(random.Random(0), 100_000)
+    analysis = DocumentAnalysis(text)
+    sentences = analysis.sentences
+    tokens = analysis.sentence_tokens
+    word_freq = analysis.word_freq
+    count = len(sentences) // 5
+
+    start = time.perf_counter()
+    scores = engine.frequency_scores(tokens, word_freq)
+    top = sorted(engine.top_sentences(tokens, scores, count))
+    current = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = reference_rank(sentences, word_freq, count)
+    original = time.perf_counter() - start
+
+    assert [sentences[i] for i in top] == expected
+    assert original > 5 * current, f"original {original:.2f}s, current {current:.2f}s"
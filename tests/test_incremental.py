@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import engine  # noqa: E402
+from corpus import make_pages  # noqa: E402
+from extraction import Page  # noqa: E402
+from incremental import IncrementalSummarizer  # noqa: E402
+
+
+def make_document(rng):
+    pages = make_pages(rng.randint(2, 8), seed=rng.randrange(1 << 30))
+    # A running header, and some pages cut mid-sentence
+    texts = []
+    for number, text in enumerate(pages, 1):
+        if rng.random() < 0.3:
+            text = text[:rng.randrange(len(text))]
+        texts.append(f"Lecture notes\n{text}\nPage {number}\n")
+    return texts
+
+
+def expected(texts, method='fast'):
+    pages = [Page(number, text) for number, text in enumerate(texts, 1)]
+    return engine.summarize_pages(pages, method=method)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_matches_engine_after_seeded_edits(seed):
+    rng = random.Random(seed)
+    texts = make_document(rng)
+    summarizer = IncrementalSummarizer()
+
+    # Pages arrive out of order, some are replaced and one is removed
+    order = list(range(len(texts)))
+    rng.shuffle(order)
+    for index in order:
+        summarizer.set_page(index + 1, texts[index])
+        if rng.random() < 0.3:
+            summarizer.summary()
+    for _ in range(3):
+        index = rng.randrange(len(texts))
+        texts[index] = make_document(rng)[0]
+        summarizer.set_page(index + 1, texts[index])
+        summarizer.summary()
+    summarizer.remove_page(len(texts))
+    texts.pop()
+
+    summary = summarizer.summary()
+    reference = expected(texts)
+    assert summary.text == reference.text
+    assert summary.keywords == reference.keywords
+    assert list(summary.word_freq.items()) == list(reference.word_freq.items())
+    assert summary.dropped_sentences == reference.dropped_sentences
+    assert summary.boilerplate_lines == reference.boilerplate_lines
+
+
+def test_edits_to_pages_without_terminators():
+    # Sentences run across several pages, so a changed page moves the
+    # boundaries up to the terminators on either side of it
+    texts = [f"{text}\n" for text in make_pages(6, seed=3)]
+    texts[1] = texts[2] = "no terminator on this page just words\n"
+    summarizer = IncrementalSummarizer()
+    for number, text in enumerate(texts, 1):
+        summarizer.set_page(number, text)
+    summarizer.summary()
+    for number, text in [(3, "and a sentence that ends here. Then more words\n"),
+                         (6, "the document ends without a terminator\n"),
+                         (2, texts[0])]:
+        texts[number - 1] = text
+        summarizer.set_page(number, text)
+        summary = summarizer.summary()
+        reference = expected(texts)
+        assert summary.text == reference.text
+        assert summary.dropped_sentences == reference.dropped_sentences
+    summarizer.remove_page(1)
+    assert summarizer.summary().text == expected(texts[1:]).text
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+import ocr  # noqa: E402
+from cache import DocumentCache  # noqa: E402
+from extraction import Page  # noqa: E402
+
+Image = pytest.importorskip('PIL.Image')
+pytest.importorskip('PyPDF2')
+
+
+def fake_recognize(data, lang=ocr.DEFAULT_LANG):
+    return f"scan of {len(data)} bytes\n"
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    images = [Image.new('L', (40 + 10 * i, 40), color=40 * i) for i in range(6)]
+    path = tmp_path / 'scan.pdf'
+    images[0].save(path, save_all=True, append_images=images[1:])
+    return str(path)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_scanned_pages_are_recognized_in_order(scanned_pdf, tmp_path, monkeypatch, workers):
+    # Worker processes are forked, so they see the patched recognize too
+    monkeypatch.setattr(ocr, 'recognize', fake_recognize)
+    pages = [Page(number, "" if number != 2 else "plenty of text on this page already, no OCR")
+             for number in range(1, 7)]
+    cache = DocumentCache(str(tmp_path / 'cache'))
+    done = []
+    result = ocr.ocr_pdf_pages(scanned_pdf, pages, workers=workers, cache=cache,
+                               progress=lambda count, total: done.append((count, total)))
+
+    expected = {number: images for number, images in
+                ocr.iter_page_images(scanned_pdf, range(1, 7))}
+    assert [page.number for page in result] == list(range(1, 7))
+    assert result[1] == pages[1]
+    for page in result[:1] + result[2:]:
+        assert page.text == f"scan of {len(expected[page.number][0])} bytes"
+    assert done[-1] == (5, 5)
+    # Worker results land in the shared cache directory
+    data = expected[1][0]
+    assert cache.get_ocr(ocr.image_hash(data)) == fake_recognize(data)
+
+
+def test_pages_without_ocr_are_not_cached(scanned_pdf, tmp_path, monkeypatch):
+    cache = DocumentCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(ocr, 'available', lambda: False)
+    pages = batch.load_pages(scanned_pdf, cache, 'scan')
+    assert all(ocr.needs_ocr(page) for page in pages)
+    assert cache.get_pages('scan') is None
+
+    # Once Tesseract is there, the scan is read and cached
+    monkeypatch.setattr(ocr, 'available', lambda: True)
+    monkeypatch.setattr(ocr, 'recognize', fake_recognize)
+    pages = batch.load_pages(scanned_pdf, cache, 'scan')
+    assert all(page.text.startswith("scan of") for page in pages)
+    assert cache.get_pages('scan') == pages
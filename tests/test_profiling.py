@@ -0,0 +1,43 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling  # noqa: E402
+from jobs import JobScheduler  # noqa: E402
+
+
+def profiled_job_work(job, count):
+    return sum(i * i for i in range(count))
+
+
+def test_jobs_run_and_are_profiled_under_capture():
+    finished = threading.Event()
+    results = []
+    errors = []
+
+    def done(result):
+        results.append(result)
+        finished.set()
+
+    def failed(error):
+        errors.append(error)
+        finished.set()
+
+    scheduler = JobScheduler(lambda callback: callback())
+    capture = profiling.ProfileCapture()
+    capture.start()
+    try:
+        scheduler.profile = capture
+        scheduler.submit('work', profiled_job_work, 1000, on_done=done, on_error=failed)
+        assert finished.wait(10)
+    finally:
+        scheduler.profile = None
+        report = capture.stop()
+        scheduler.shutdown()
+
+    assert errors == []
+    assert results == [sum(i * i for i in range(1000))]
+    assert 'profiled_job_work' in report
+    assert not capture.active
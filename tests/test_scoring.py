@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+
+import engine  # noqa: E402
+import scoring  # noqa: E402
+from analysis import DocumentAnalysis  # noqa: E402
+from corpus import make_pages  # noqa: E402
+from docstore import DocumentStore  # noqa: E402
+from extraction import Page  # noqa: E402
+
+
+@pytest.fixture
+def document():
+    # A repeated page gives the store path some duplicates to leave out
+    texts = make_pages(6, seed=5)
+    texts.insert(3, texts[1])
+    pages = [Page(number, text) for number, text in enumerate(texts, 1)]
+    store = DocumentStore.from_pages(pages)
+    yield DocumentAnalysis.from_pages(pages), store
+    store.close()
+
+
+def dense_textrank(sentence_tokens, damping=0.85, iterations=200):
+    # TextRank over an explicit cosine-similarity matrix
+    counts = scoring.term_matrix(sentence_tokens)
+    weighted = counts.toarray() * scoring._idf(counts)
+    norms = np.linalg.norm(weighted, axis=1)
+    unit = np.divide(weighted, norms[:, None], out=np.zeros_like(weighted),
+                     where=norms[:, None] > 0)
+    similarity = unit @ unit.T
+    np.fill_diagonal(similarity, 0)
+    n = len(similarity)
+    degree = similarity.sum(axis=1)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        spread = similarity @ np.divide(rank, degree, out=np.zeros(n), where=degree > 1e-12)
+        rank = (1 - damping) / n + damping * (spread + rank[degree <= 1e-12].sum() / n)
+    return rank
+
+
+def test_store_matrix_matches_token_lists(document):
+    analysis, store = document
+    tokens = analysis.sentence_tokens
+    rows = [i for i in range(len(tokens)) if i % 3]
+    for subset in (None, rows):
+        expected = tokens if subset is None else [tokens[i] for i in subset]
+        counts, lengths = scoring.store_term_matrix(store, subset)
+        assert (counts != scoring.term_matrix(expected)).nnz == 0
+        assert lengths.tolist() == [len(t) for t in expected]
+        assert scoring.matrix_tfidf_scores(counts, lengths) == scoring.tfidf_scores(expected)
+        assert scoring.matrix_textrank_scores(counts) == scoring.textrank_scores(expected)
+
+
+def test_textrank_matches_dense_similarity(document):
+    tokens = document[0].sentence_tokens
+    assert scoring.textrank_scores(tokens) == pytest.approx(dense_textrank(tokens).tolist(),
+                                                            abs=1e-6)
+
+
+@pytest.mark.parametrize('method', sorted(engine.METHODS))
+def test_store_summary_matches_analysis(document, method):
+    analysis, store = document
+    expected = engine.summarize(None, analysis=analysis, method=method)
+    summary = engine.summarize_store(store, method=method)
+    assert summary.dropped_sentences > 0
+    assert summary.text == expected.text
+    assert summary.keywords == expected.keywords
+    assert summary.dropped_sentences == expected.dropped_sentences
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import search  # noqa: E402
+from cache import DocumentCache, file_hash  # noqa: E402
+from corpus import make_pages  # noqa: E402
+from extraction import Page  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not search.available(), reason="SQLite without FTS5")
+
+
+def test_index_folder_leaves_out_running_headers(tmp_path):
+    folder = tmp_path / 'docs'
+    folder.mkdir()
+    path = folder / 'notes.pdf'
+    path.write_bytes(b'not parsed: the pages come from the cache')
+    cache = DocumentCache(str(tmp_path / 'cache'))
+    # Counted as text, the header would be one of the top keywords
+    header = " ".join(["Zyzzyva"] * 12)
+    cache.put_pages(file_hash(str(path)), [
+        Page(number, f"{header}\n{text}\nPage {number}\n")
+        for number, text in enumerate(make_pages(5), 1)])
+
+    index = search.SearchIndex(str(tmp_path / 'index.sqlite3'))
+    assert search.index_folder(index, str(folder), cache=cache) == (1, 0, 0)
+    hits = index.search("zyzzyva")
+    assert hits
+    assert 'zyzzyva' not in hits[0].keywords
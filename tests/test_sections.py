@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import engine  # noqa: E402
+import sections  # noqa: E402
+from corpus import make_pages  # noqa: E402
+from extraction import Page  # noqa: E402
+
+
+@pytest.mark.parametrize('outline', [None, [("Part one", 1), ("Part two", 9)]])
+def test_summary_counts_blanked_header_lines(outline):
+    pages = [Page(number, f"Course notes\n{text}\n{number}\n")
+             for number, text in enumerate(make_pages(25), 1)]
+    parts = sections.split_sections(pages, outline)
+    assert len(parts) > 1
+    summary = sections.summarize_sections(parts, workers=1)
+    assert summary.boilerplate_lines == engine.summarize_pages(pages).boilerplate_lines
+    assert summary.boilerplate_lines == 2 * len(pages)
@@ -0,0 +1,57 @@
+import http.client
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import service  # noqa: E402
+from service import RequestError, parse_params  # noqa: E402
+
+
+def test_parse_params_from_query_and_body():
+    assert parse_params("num_sentences=3&method=tfidf") == {
+        'num_sentences': 3, 'num_keywords': 10, 'method': 'tfidf'}
+    assert parse_params("num_sentences=3", {'num_sentences': 5, 'num_keywords': 0}) == {
+        'num_sentences': 5, 'num_keywords': 0, 'method': 'fast'}
+
+
+@pytest.mark.parametrize('body', [
+    {'method': ['x']},
+    {'method': {'a': 1}},
+    {'method': 3},
+    {'method': 'nope'},
+    {'num_sentences': [1]},
+    {'num_sentences': 2.5},
+    {'num_sentences': True},
+    {'num_keywords': {'a': 1}},
+    {'num_keywords': 'ten'},
+    {'num_sentences': 0},
+])
+def test_parse_params_rejects_bad_fields(body):
+    with pytest.raises(RequestError) as error:
+        parse_params("", body)
+    assert error.value.status == 400
+
+
+def test_bad_method_type_is_a_400(tmp_path):
+    summarizer = service.SummaryService(workers=1, cache_dir=str(tmp_path)).start()
+    server = service.make_server(summarizer, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+        connection.request('POST', '/summarize/text',
+                           json.dumps({'text': "Some text.", 'method': ['x']}),
+                           {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        assert response.status == 400
+        assert 'method' in json.loads(response.read())['error']
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        summarizer.close()
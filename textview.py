@@ -0,0 +1,236 @@
+"""Progressive and paged display of long documents in a Tk text widget.
+
+Text is inserted a chunk at a time from after() callbacks so the window
+keeps repainting while pages stream in. Past VIRTUALIZE_CHARS the widget
+only holds a sliding window of pages; scrolling near either edge swaps
+pages in and out.
+"""
+from bisect import bisect_left, bisect_right
+import time
+import tkinter as tk
+
+import profiling
+from highlight import line_starts
+
+# Characters inserted per main-loop turn
+CHUNK_CHARS = 64 * 1024
+# Documents longer than this are shown a window of pages at a time
+VIRTUALIZE_CHARS = 1_000_000
+WINDOW_PAGES = 20
+# Highlight spans tagged per main-loop turn
+HIGHLIGHT_BATCH = 500
+# How close to the top/bottom (as a fraction of the view) triggers paging
+EDGE = 0.05
+
+
+class PagedTextView:
+    def __init__(self, text_widget, scrollbar=None, tag="highlight",
+                 window_pages=WINDOW_PAGES, on_window_change=None):
+        self.text = text_widget
+        self.scrollbar = scrollbar
+        self.tag = tag
+        self.window_pages = window_pages
+        self.on_window_change = on_window_change
+        self.text.configure(yscrollcommand=self._on_scroll)
+        self._reset()
+
+    def _reset(self):
+        self.pages = []
+        self.page_starts = [0]      # document offset of each page, plus the end
+        self.page_lines = [0]       # newlines before each page, plus the total
+        self.page_columns = []      # column (in its line) where each page starts
+        self._end_column = 0
+        self.first = 0              # pages[first:last] are in (or queued for) the widget
+        self.last = 0
+        self.virtual = False
+        self.spans = []
+        self._queue = []            # (page index, characters already inserted)
+        self._pump_id = None
+        self._highlight_generation = 0
+
+    @property
+    def length(self):
+        return self.page_starts[-1]
+
+    @property
+    def busy(self):
+        return bool(self._queue)
+
+    def clear(self):
+        if self._pump_id is not None:
+            self.text.after_cancel(self._pump_id)
+        self._reset()
+        self.text.delete(1.0, tk.END)
+        self._notify()
+
+    def set_pages(self, pages):
+        self.clear()
+        for page in pages:
+            self.append_page(page)
+
+    def append_page(self, page):
+        text = page.text
+        self.pages.append(text)
+        self.page_starts.append(self.page_starts[-1] + len(text))
+        self.page_lines.append(self.page_lines[-1] + text.count('\n'))
+        self.page_columns.append(self._end_column)
+        last_newline = text.rfind('\n')
+        if last_newline == -1:
+            self._end_column += len(text)
+        else:
+            self._end_column = len(text) - last_newline - 1
+        if not self.virtual and self.length > VIRTUALIZE_CHARS:
+            self.virtual = True
+
+        # Pages past a full window wait until the user scrolls to them
+        if self.virtual and self.last - self.first >= self.window_pages:
+            self._notify()
+            return
+        self._queue.append([len(self.pages) - 1, 0])
+        self.last = len(self.pages)
+        if self._pump_id is None:
+            self._pump_id = self.text.after(0, self._pump)
+
+    def _pump(self):
+        started = time.perf_counter()
+        budget = CHUNK_CHARS
+        while self._queue and budget > 0:
+            item = self._queue[0]
+            page_text = self.pages[item[0]]
+            piece = page_text[item[1]:item[1] + budget]
+            self.text.insert(tk.END, piece)
+            item[1] += len(piece)
+            budget -= len(piece)
+            if item[1] >= len(page_text):
+                self._queue.pop(0)
+                self._apply_highlights(item[0], item[0] + 1)
+        profiling.record('insert text', time.perf_counter() - started,
+                         CHUNK_CHARS - budget, 'chars')
+
+        if self._queue:
+            self._pump_id = self.text.after(1, self._pump)
+        else:
+            self._pump_id = None
+            self._notify()
+
+    def _notify(self):
+        if self.on_window_change:
+            self.on_window_change(self.first, self.last, len(self.pages))
+
+    def window_text(self):
+        return "".join(self.pages[self.first:self.last])
+
+    def _on_scroll(self, top, bottom):
+        if self.scrollbar is not None:
+            self.scrollbar.set(top, bottom)
+        if not self.virtual or self.busy:
+            return
+        if float(bottom) >= 1 - EDGE and self.last < len(self.pages):
+            self.text.after_idle(self.scroll_forward)
+        elif float(top) <= EDGE and self.first > 0:
+            self.text.after_idle(self.scroll_back)
+
+    def _top_offset(self):
+        counted = self.text.count("1.0", "@0,0", "chars")
+        return counted[0] if counted else 0
+
+    def scroll_forward(self):
+        if self.busy or self.last >= len(self.pages):
+            return
+        top = self._top_offset()
+        self.text.insert(tk.END, self.pages[self.last])
+        self.last += 1
+        self._apply_highlights(self.last - 1, self.last)
+        if self.last - self.first > self.window_pages:
+            dropped = len(self.pages[self.first])
+            self.text.delete(1.0, f"1.0+{dropped}c")
+            self.first += 1
+            self.text.yview(f"1.0+{max(top - dropped, 0)}c")
+        self._notify()
+
+    def scroll_back(self):
+        if self.busy or self.first <= 0:
+            return
+        top = self._top_offset()
+        self.first -= 1
+        added = len(self.pages[self.first])
+        self.text.insert(1.0, self.pages[self.first])
+        if self.last - self.first > self.window_pages:
+            self.last -= 1
+            self.text.delete(f"1.0+{self.page_starts[self.last] - self.page_starts[self.first]}c",
+                             tk.END)
+        # Offsets inside the widget moved, so re-tag the whole window
+        self._apply_highlights(self.first, self.last, replace=True)
+        self.text.yview(f"1.0+{top + added}c")
+        self._notify()
+
+    def show_page(self, number):
+        # Bring a 1-based page number into the window and scroll to it
+        index = min(max(number - 1, 0), len(self.pages) - 1)
+        if index < 0 or self.busy:
+            return
+        if not (self.first <= index < self.last):
+            self.first = max(0, index - self.window_pages // 2)
+            self.last = min(len(self.pages), self.first + self.window_pages)
+            self.text.delete(1.0, tk.END)
+            self.text.insert(1.0, self.window_text())
+            self._apply_highlights(self.first, self.last, replace=True)
+        offset = self.page_starts[index] - self.page_starts[self.first]
+        self.text.yview(f"1.0+{offset}c")
+        self._notify()
+
+    def set_highlights(self, spans):
+        # spans are (start, end) offsets into the whole document, sorted.
+        # Pages still queued are tagged by the pump once they're inserted.
+        self.spans = spans
+        self._apply_highlights(self.first, self.last - len(self._queue), replace=True)
+
+    def _apply_highlights(self, first_page, last_page, replace=False):
+        if replace:
+            self._highlight_generation += 1
+            self.text.tag_remove(self.tag, 1.0, tk.END)
+        if not self.spans:
+            return
+        start = self.page_starts[first_page]
+        end = self.page_starts[last_page]
+        lo = bisect_left(self.spans, (start, start))
+        hi = bisect_right(self.spans, (end, end))
+        if lo >= hi:
+            return
+
+        line_cache = {}
+        indices = []
+        for span in self.spans[lo:hi]:
+            for offset in span:
+                indices.append(self._index(offset, line_cache))
+        self._tag_batches(self._highlight_generation, indices, 0)
+
+    def _index(self, offset, line_cache):
+        # "line.column" in the widget for a document offset inside the window.
+        # Only the page holding the offset is scanned for line breaks.
+        page = min(bisect_right(self.page_starts, offset), len(self.pages)) - 1
+        starts = line_cache.get(page)
+        if starts is None:
+            starts = line_cache[page] = line_starts(self.pages[page])
+        within = offset - self.page_starts[page]
+        line_in_page = bisect_right(starts, within) - 1
+
+        line = self.page_lines[page] - self.page_lines[self.first] + line_in_page + 1
+        if line_in_page:
+            column = within - starts[line_in_page]
+        else:
+            column = self.page_columns[page] + within
+            if line == 1:
+                column -= self.page_columns[self.first]
+        return f"{line}.{column}"
+
+    def _tag_batches(self, generation, indices, position):
+        if generation != self._highlight_generation:
+            return  # the window was re-tagged since this pass started
+        batch = indices[position:position + 2 * HIGHLIGHT_BATCH]
+        if batch:
+            with profiling.stage('highlight tags', len(batch) // 2, 'spans'):
+                self.text.tag_add(self.tag, *batch)
+        position += len(batch)
+        if position < len(indices):
+            self.text.after(1, self._tag_batches, generation, indices, position)